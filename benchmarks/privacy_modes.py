@@ -0,0 +1,61 @@
+"""Anonimleştirme kiplerinin kare başına maliyeti.
+
+Kullanım: `python benchmarks/privacy_modes.py --faces 4 16 --face-size 240 --level 45`
+"baseline" satırı eski yoldur: her iz için ayrı `gaussian_blur_face` çağrısı.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.privacy import ANONYMIZERS, anonymize, gaussian_blur_face
+
+
+def synthetic_boxes(n_faces: int, size: int, width: int, height: int, seed: int = 0):
+    """Kısmen örtüşen yüz kutuları (yakın plan kalabalık sahne)."""
+    rng = np.random.default_rng(seed)
+    xs = rng.integers(0, width - size, n_faces)
+    ys = rng.integers(0, height - size, n_faces)
+    return [(int(x), int(y), int(x) + size, int(y) + size) for x, y in zip(xs, ys)]
+
+
+def bench(mode: str, n_faces: int, size: int, level: int, frames: int, width: int = 1920, height: int = 1080) -> dict:
+    rng = np.random.default_rng(1)
+    frame = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    boxes = synthetic_boxes(n_faces, size, width, height)
+    lat = np.empty(frames, dtype=np.float64)
+    for i in range(frames):
+        img = frame.copy()
+        t = time.perf_counter()
+        if mode == "baseline":
+            for b in boxes:
+                gaussian_blur_face(img, b, ksize=level)
+        else:
+            anonymize(img, boxes, mode=mode, level=level)
+        lat[i] = (time.perf_counter() - t) * 1000.0
+    return {"mode": mode, "faces": n_faces, "mean_ms": float(lat.mean()), "p95_ms": float(np.percentile(lat, 95))}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--faces", type=int, nargs="+", default=[4, 16])
+    ap.add_argument("--face-size", type=int, default=240)
+    ap.add_argument("--level", type=int, default=45)
+    ap.add_argument("--frames", type=int, default=50)
+    args = ap.parse_args()
+    print(f"{'mode':>10} {'faces':>6} {'mean ms':>9} {'p95 ms':>9}")
+    for n in args.faces:
+        for mode in ["baseline", *ANONYMIZERS]:
+            r = bench(mode, n, args.face_size, args.level, args.frames)
+            print(f"{r['mode']:>10} {r['faces']:>6} {r['mean_ms']:>9.3f} {r['p95_ms']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
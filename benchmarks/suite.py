@@ -0,0 +1,324 @@
+"""Çevrimdışı performans paketi: sentetik yüz videolarıyla aşama ve uçtan uca ölçüm.
+
+Kullanım:
+  `python benchmarks/suite.py --out bench.json`                      tüm ölçümler
+  `python benchmarks/suite.py --quick --only detect track`           hızlı, seçili aşamalar
+  `python benchmarks/suite.py --out yeni.json --compare eski.json`   gerileme kontrolü (çıkış kodu 1)
+
+Sonuçlar commit, sürüm ve makine bilgisiyle JSON'a yazılır; `--compare` her ölçümü anahtarına
+(ölçüm adı + parametreler) göre eşleştirir ve ortalama süresi `--threshold` oranından fazla
+artanları gerileme sayar. Videolar `SyntheticScene` ile üretilir (seed'li, ağ gerekmez).
+"""
+from __future__ import annotations
+import argparse
+import dataclasses
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import cv2
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from loguru import logger
+
+from src.detectors.base import haar_detect_array
+from src.pipeline import PipelineConfig, process_video
+from src.trackers.base import SimpleSORT
+from src.utils.boxes import iou_matrix
+from src.utils.heatmap import HeatmapAccumulator
+from src.utils.privacy import ANONYMIZERS, anonymize
+from src.utils.synthetic import SyntheticScene, load_face_images, write_synthetic_video
+from src.utils.video_io import open_writer
+
+BENCHES = ("detect", "track", "heatmap", "blur", "encode", "pipeline")
+
+
+def _stats(lat_s: np.ndarray) -> Dict[str, float]:
+    ms = np.asarray(lat_s, dtype=np.float64) * 1000.0
+    return {
+        "n": int(len(ms)),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "fps": round(1000.0 / float(ms.mean()), 2) if ms.mean() > 0 else 0.0,
+    }
+
+
+def _timeit(fn: Callable[[int], None], n: int, warmup: int = 2) -> np.ndarray:
+    for i in range(min(warmup, n)):
+        fn(i)
+    lat = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        t = time.perf_counter()
+        fn(i)
+        lat[i] = time.perf_counter() - t
+    return lat
+
+
+def _res(spec: str):
+    w, h = spec.lower().split("x")
+    return int(w), int(h)
+
+
+def _scene_frames(args, width: int, height: int, n: int):
+    scene = SyntheticScene(width, height, faces=args.faces, seed=args.seed, face_images=args.face_images)
+    return [(frame, boxes) for _, frame, boxes in scene.frames(n)]
+
+
+def bench_detect(args) -> List[Dict]:
+    out = []
+    for spec in args.resolutions:
+        w, h = _res(spec)
+        frames = _scene_frames(args, w, h, args.det_frames)
+        for scale in args.scales:
+            procs = [f if scale == 1.0 else cv2.resize(f, (int(w * scale), int(h * scale))) for f, _ in frames]
+            dets = [None] * len(procs)
+
+            def run(i):
+                dets[i % len(procs)] = haar_detect_array(procs[i % len(procs)], args.min_face)
+
+            lat = _timeit(run, len(procs))
+            # Duyarlılık: gerçek kutuların IoU>0.3 ile bulunan oranı (dedektör doğruluğu gerilemesi için)
+            hit = total = 0
+            for (_, gt), d in zip(frames, dets):
+                total += len(gt)
+                if len(d):
+                    hit += int((iou_matrix(gt * scale, d[:, :4]).max(1) > 0.3).sum())
+            out.append({"bench": "detect", "params": {"res": spec, "scale": scale}, **_stats(lat), "recall": round(hit / max(1, total), 3)})
+    return out
+
+
+def bench_track(args) -> List[Dict]:
+    out = []
+    for n_faces in args.track_faces:
+        scene = SyntheticScene(3840, 2160, faces=n_faces, face_size=(24, 64), seed=args.seed)
+        dets = [np.column_stack([scene.step(), np.full(n_faces, 0.9)]) for _ in range(args.frames)]
+        tracker = SimpleSORT(max_age=10, iou_threshold=0.3)
+        tracker.update_array(dets[0])  # ilk kare yalnızca iz oluşturur
+        lat = _timeit(lambda i: tracker.update_array(dets[i]), len(dets), warmup=0)
+        out.append({"bench": "track", "params": {"faces": n_faces}, **_stats(lat), "ids": tracker._next_id - 1})
+    return out
+
+
+def bench_heatmap(args) -> List[Dict]:
+    out = []
+    for spec in args.resolutions:
+        w, h = _res(spec)
+        for n_faces in args.track_faces:
+            scene = SyntheticScene(w, h, faces=n_faces, face_size=(24, 64), seed=args.seed)
+            boxes = [scene.step() for _ in range(args.frames)]
+            hm = HeatmapAccumulator(h, w, stride=4)
+            lat = _timeit(lambda i: hm.add_bboxes(boxes[i]), len(boxes))
+            t = time.perf_counter()
+            hm.to_color()
+            out.append({"bench": "heatmap", "params": {"res": spec, "faces": n_faces}, **_stats(lat), "render_ms": round((time.perf_counter() - t) * 1000.0, 3)})
+    return out
+
+
+def bench_blur(args) -> List[Dict]:
+    out = []
+    for spec in args.resolutions:
+        w, h = _res(spec)
+        frames = _scene_frames(args, w, h, min(args.frames, 20))
+        for mode in ANONYMIZERS:
+            lat = np.empty(args.frames, dtype=np.float64)
+            for i in range(args.frames):
+                f, boxes = frames[i % len(frames)]
+                img = f.copy()  # yerinde çalıştığı için her seferinde temiz kare; kopya ölçüme katılmaz
+                t = time.perf_counter()
+                anonymize(img, boxes, mode=mode, level=args.blur_level)
+                lat[i] = time.perf_counter() - t
+            out.append({"bench": "blur", "params": {"res": spec, "mode": mode, "level": args.blur_level}, **_stats(lat)})
+    return out
+
+
+def bench_encode(args, tmp: str) -> List[Dict]:
+    out = []
+    backends = ["cv2", "ffmpeg"]
+    for spec in args.resolutions:
+        w, h = _res(spec)
+        frames = [f for f, _ in _scene_frames(args, w, h, min(args.frames, 50))]
+        for backend in backends:
+            path = os.path.join(tmp, f"enc_{backend}_{spec}.mp4")
+            writer = open_writer(path, 25.0, w, h, backend=backend)
+            if backend == "ffmpeg" and isinstance(writer, cv2.VideoWriter):
+                writer.release()
+                continue  # ffmpeg yok: open_writer cv2'ye düştü
+            lat = _timeit(lambda i: writer.write(frames[i % len(frames)]), args.frames, warmup=0)
+            t = time.perf_counter()
+            writer.release()
+            # ffmpeg ayrı süreçte kodlar: release() kuyruğun boşalmasını bekler, toplam süreye katılır
+            total = float(lat.sum()) + time.perf_counter() - t
+            out.append({
+                "bench": "encode",
+                "params": {"res": spec, "backend": backend},
+                **_stats(lat),
+                "fps": round(args.frames / total, 2),
+                "bytes": os.path.getsize(path),
+            })
+    return out
+
+
+def bench_pipeline(args, tmp: str) -> List[Dict]:
+    out = []
+    w, h = _res(args.resolutions[0])
+    src = os.path.join(tmp, "pipeline_src.mp4")
+    write_synthetic_video(src, frames=args.frames, width=w, height=h, faces=args.faces, seed=args.seed, face_images=args.face_images)
+    variants = {
+        "metrics": {},
+        "skip3_half": {"frame_skip": 3, "half_res": True},
+        "annotated": {"output_video": os.path.join(tmp, "pipeline_out.mp4"), "blur": True, "video_backend": "cv2"},
+    }
+    for name, overrides in variants.items():
+        metrics_path = os.path.join(tmp, f"pipeline_{name}.jsonl")
+        cfg = PipelineConfig(
+            source=src,
+            output_video=None,
+            output_metrics_json=metrics_path,
+            output_metrics_csv=None,
+            output_heatmap=None,
+            detector="retinaface",
+            tracker="ocsort",
+            score_threshold=0.5,
+            nms_threshold=0.4,
+            min_face_size=args.min_face,
+            blur=False,
+            blur_level=args.blur_level,
+            heatmap=True,
+            frame_skip=1,
+            half_res=False,
+        )
+        cfg = dataclasses.replace(cfg, **overrides)
+        t = time.perf_counter()
+        process_video(cfg)
+        wall = time.perf_counter() - t
+        with open(metrics_path) as f:
+            rows = [json.loads(line) for line in f]
+        events = json.load(open(os.path.splitext(metrics_path)[0] + ".events.json"))
+        stages = next((e["stages"] for e in events if e["event"] == "stage_latency"), {})
+        out.append({
+            "bench": "pipeline",
+            "params": {"res": args.resolutions[0], "variant": name},
+            "n": len(rows),
+            "mean_ms": round(wall / max(1, len(rows)) * 1000.0, 4),
+            "fps": round(len(rows) / wall, 2),
+            "total_ids": rows[-1]["total_ids"] if rows else 0,
+            "true_faces": args.faces,
+            "stages": {k: {m: v[m] for m in ("mean_ms", "p50_ms", "p95_ms", "p99_ms")} for k, v in stages.items()},
+        })
+    return out
+
+
+def machine_info() -> Dict:
+    def git(*cmd):
+        try:
+            return subprocess.run(["git", *cmd], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD") or None,
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "cv2_threads": cv2.getNumThreads(),
+    }
+
+
+def _key(r: Dict) -> str:
+    return r["bench"] + "|" + json.dumps(r.get("params", {}), sort_keys=True)
+
+
+def compare(results: List[Dict], baseline: Dict, threshold: float) -> List[Dict]:
+    """Ortalama süresi taban çizgisine göre `threshold` oranından fazla artan ölçümler."""
+    base = {_key(r): r for r in baseline.get("results", [])}
+    print(f"\n{'ölçüm':<58} {'eski ms':>10} {'yeni ms':>10} {'değişim':>9}")
+    regressions = []
+    for r in results:
+        b = base.get(_key(r))
+        if b is None or not b.get("mean_ms"):
+            continue
+        change = r["mean_ms"] / b["mean_ms"] - 1.0
+        flag = ""
+        if change > threshold:
+            flag = "  GERİLEME"
+            regressions.append({"key": _key(r), "old_ms": b["mean_ms"], "new_ms": r["mean_ms"], "change": round(change, 3)})
+        elif "recall" in b and r.get("recall", 0.0) < b["recall"] - 0.05:
+            flag = f"  DUYARLILIK {b['recall']:.2f} -> {r['recall']:.2f}"
+            regressions.append({"key": _key(r), "old_recall": b["recall"], "new_recall": r.get("recall")})
+        print(f"{_key(r):<58} {b['mean_ms']:>10.3f} {r['mean_ms']:>10.3f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--out", default=None, help="Sonuç JSON (varsayılan benchmarks/results/<commit>.json)")
+    ap.add_argument("--only", nargs="+", choices=BENCHES, default=list(BENCHES))
+    ap.add_argument("--resolutions", nargs="+", default=["1280x720", "1920x1080"], help="GxY; ilki uçtan uca ölçümde kullanılır")
+    ap.add_argument("--frames", type=int, default=100)
+    ap.add_argument("--det-frames", type=int, default=20)
+    ap.add_argument("--faces", type=int, default=4, help="Sentetik videodaki yüz sayısı")
+    ap.add_argument("--track-faces", type=int, nargs="+", default=[50, 200])
+    ap.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.5], help="Tespit ölçekleri")
+    ap.add_argument("--min-face", type=int, default=24)
+    ap.add_argument("--blur-level", type=int, default=15)
+    ap.add_argument("--faces-dir", default=None, help="Çizim yerine kullanılacak yüz görüntüleri klasörü")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--quick", action="store_true", help="Küçük ayarlar (640x360, 30 kare)")
+    ap.add_argument("--compare", default=None, help="Karşılaştırılacak eski sonuç JSON")
+    ap.add_argument("--threshold", type=float, default=0.15, help="Gerileme eşiği (ortalama süre artış oranı)")
+    args = ap.parse_args()
+    if args.quick:
+        args.resolutions, args.frames, args.det_frames, args.track_faces = ["640x360"], 30, 10, [50]
+    args.face_images = load_face_images(args.faces_dir) if args.faces_dir else None
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    info = machine_info()
+    results: List[Dict] = []
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        for name in args.only:
+            t = time.perf_counter()
+            if name in ("encode", "pipeline"):
+                res = globals()[f"bench_{name}"](args, tmp)
+            else:
+                res = globals()[f"bench_{name}"](args)
+            results.extend(res)
+            for r in res:
+                extra = {k: v for k, v in r.items() if k in ("recall", "total_ids", "bytes", "ids")}
+                print(f"{_key(r):<58} {r['mean_ms']:>9.3f} ms  {r['fps']:>9.1f} fps  {extra if extra else ''}")
+            print(f"# {name}: {time.perf_counter() - t:.1f} sn")
+
+    cfg = {k: v for k, v in vars(args).items() if k not in ("face_images", "out", "compare")}
+    report = {"meta": info, "config": cfg, "results": results}
+    out = args.out or str(PROJECT_ROOT / "benchmarks" / "results" / f"{info['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Sonuçlar: {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} gerileme (eşik +{args.threshold:.0%})")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
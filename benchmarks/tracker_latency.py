@@ -0,0 +1,73 @@
+"""SimpleSORT.update için kare başına gecikme ölçümü.
+
+Kullanım: `python benchmarks/tracker_latency.py --faces 50 100 200 500 --frames 200`
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.trackers.base import SimpleSORT
+
+
+def synthetic_detections(n_faces: int, n_frames: int, width: int = 3840, height: int = 2160, seed: int = 0):
+    """Rastgele yürüyen n_faces yüz kutusu; her kare karıştırılmış sırada döner."""
+    rng = np.random.default_rng(seed)
+    size = rng.uniform(24, 64, n_faces)
+    pos = np.column_stack([rng.uniform(0, width - 64, n_faces), rng.uniform(0, height - 64, n_faces)])
+    vel = rng.normal(0, 2.0, (n_faces, 2))
+    frames = []
+    for _ in range(n_frames):
+        pos = np.clip(pos + vel + rng.normal(0, 0.5, pos.shape), 0, [width - 64, height - 64])
+        order = rng.permutation(n_faces)
+        frames.append([
+            (int(pos[i, 0]), int(pos[i, 1]), int(pos[i, 0] + size[i]), int(pos[i, 1] + size[i]), 0.99)
+            for i in order
+        ])
+    return frames
+
+
+def bench(n_faces: int, n_frames: int, warmup: int = 20) -> dict:
+    frames = synthetic_detections(n_faces, n_frames)
+    # Ölçülmeyen ısınma: scipy'nin tembel içe aktarımı ve ilk eşlemelerin bellek ayırmaları
+    # ölçülen izleyicinin ilk karelerine yansımasın
+    scratch = SimpleSORT(max_age=10, iou_threshold=0.3)
+    for dets in frames[:warmup]:
+        scratch.update(dets)
+    tracker = SimpleSORT(max_age=10, iou_threshold=0.3)
+    lat = np.empty(n_frames, dtype=np.float64)
+    for i, dets in enumerate(frames):
+        t = time.perf_counter()
+        tracker.update(dets)
+        lat[i] = (time.perf_counter() - t) * 1000.0
+    lat = lat[1:]  # ilk kare yalnızca iz oluşturur
+    return {
+        "faces": n_faces,
+        "mean_ms": float(lat.mean()),
+        "median_ms": float(np.median(lat)),
+        "p95_ms": float(np.percentile(lat, 95)),
+        "ids": tracker._next_id - 1,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--faces", type=int, nargs="+", default=[50, 100, 200, 500])
+    ap.add_argument("--frames", type=int, default=200)
+    ap.add_argument("--warmup", type=int, default=20, help="Ölçümden önce atılan izleyicide koşulan kare sayısı")
+    args = ap.parse_args()
+    print(f"{'faces':>6} {'mean ms':>9} {'median ms':>10} {'p95 ms':>9} {'ids':>6}")
+    for n in args.faces:
+        r = bench(n, args.frames, args.warmup)
+        print(f"{r['faces']:>6} {r['mean_ms']:>9.3f} {r['median_ms']:>10.3f} {r['p95_ms']:>9.3f} {r['ids']:>6}")
+
+
+if __name__ == "__main__":
+    main()
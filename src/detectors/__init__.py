@@ -1,4 +1,15 @@
-from .retinaface import RetinaFaceDetector
-from .mtcnn import MTCNNDetector
+from importlib import import_module
 
-__all__ = ["RetinaFaceDetector", "MTCNNDetector"]
+# Alt modüller ilk erişimde yüklenir: `src.detectors.base` içe aktarmak tüm arka uçları yüklemez
+_LAZY = {
+    "RetinaFaceDetector": ".retinaface",
+    "MTCNNDetector": ".mtcnn",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
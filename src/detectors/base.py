@@ -1,9 +1,20 @@
 from __future__ import annotations
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Sequence, Tuple
+import os
+import threading
+
+import cv2
+import numpy as np
+
+HAAR_CASCADE = "haarcascade_frontalface_default.xml"
+_local = threading.local()
 
 
 class Detection:
-    """Basit tespit yapısı: (x1, y1, x2, y2, score)."""
+    """Basit tespit yapısı: (x1, y1, x2, y2, score). Dizi yolunun (N,5) satırlarına uyumlu görünüm."""
+
+    __slots__ = ("x1", "y1", "x2", "y2", "score")
 
     def __init__(self, bbox: Tuple[int, int, int, int], score: float) -> None:
         self.x1, self.y1, self.x2, self.y2 = bbox
@@ -13,6 +24,48 @@ class Detection:
         return self.x1, self.y1, self.x2, self.y2
 
 
+def dets_to_array(detections: Sequence[Detection]) -> np.ndarray:
+    """`Detection` listesi -> (N,5) float32 [x1, y1, x2, y2, score]."""
+    if not detections:
+        return np.empty((0, 5), dtype=np.float32)
+    return np.asarray([(d.x1, d.y1, d.x2, d.y2, d.score) for d in detections], dtype=np.float32)
+
+
+def array_to_dets(arr: np.ndarray) -> List[Detection]:
+    boxes = arr[:, :4].astype(np.int64).tolist()
+    return [Detection(tuple(b), s) for b, s in zip(boxes, arr[:, 4].tolist())]
+
+
+def _thread_cascade():
+    """İş parçacığına özel Haar Cascade (CascadeClassifier iş parçacıkları arasında paylaşılmamalı).
+
+    XML iş parçacığı başına bir kez ayrıştırılır; aynı iş parçacığındaki tüm dedektörler paylaşır.
+    """
+    cascade = getattr(_local, "cascade", None)
+    if cascade is None:
+        cascade = cv2.CascadeClassifier(cv2.data.haarcascades + HAAR_CASCADE)
+        _local.cascade = cascade
+    return cascade
+
+
+def haar_detect_array(image, min_face: int, cascade=None) -> np.ndarray:
+    """Haar Cascade ile yüz tespiti (paket yoksa kullanılan ortak yedek); (N,5) float32."""
+    if cascade is None:
+        cascade = _thread_cascade()
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    faces = cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(min_face, min_face))
+    out = np.empty((len(faces), 5), dtype=np.float32)
+    if len(faces):
+        out[:, :2] = faces[:, :2]
+        out[:, 2:4] = faces[:, :2] + faces[:, 2:4]
+        out[:, 4] = 0.99
+    return out
+
+
+def haar_detect(image, min_face: int, cascade=None) -> List[Detection]:
+    return array_to_dets(haar_detect_array(image, min_face, cascade))
+
+
 class BaseFaceDetector:
     """Tüm yüz dedektörleri için arayüz."""
 
@@ -21,3 +74,28 @@ class BaseFaceDetector:
     def detect(self, image) -> List[Detection]:  # image: np.ndarray (BGR)
         raise NotImplementedError
 
+    def detect_array(self, image) -> np.ndarray:
+        """Dizi yolu: (N,5) float32 [x1, y1, x2, y2, score]. Varsayılan `detect()` sonucunu çevirir;
+        nesne üretmeden tespit edebilen dedektörler bunu ezer."""
+        return dets_to_array(self.detect(image))
+
+    def detect_batch_array(self, frames: Sequence) -> List[np.ndarray]:
+        return [dets_to_array(d) for d in self.detect_batch(frames)]
+
+    def detect_batch(self, frames: Sequence) -> List[List[Detection]]:
+        """Birden çok kareyi tek çağrıda işler; sonuç sırası kare sırasıyla aynıdır.
+
+        Varsayılan uygulama her kare için `detect()` çağırır; toplu çıkarım destekleyen
+        dedektörler bunu ezer.
+        """
+        return [self.detect(f) for f in frames]
+
+    def _map_threads(self, fn: Callable, frames: Sequence) -> List:
+        """`fn`'i kareler üzerinde iş parçacığı havuzunda çalıştır (OpenCV GIL'i bırakır)."""
+        if len(frames) <= 1:
+            return [fn(f) for f in frames]
+        pool = getattr(self, "_pool", None)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix=f"{self.name}-det")
+            self._pool = pool
+        return list(pool.map(fn, frames))
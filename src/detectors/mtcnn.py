@@ -1,9 +1,24 @@
 from __future__ import annotations
-from typing import List
+from functools import lru_cache
+from typing import List, Sequence
 from loguru import logger
-import cv2
+import numpy as np
 
-from .base import BaseFaceDetector, Detection
+from .base import BaseFaceDetector, Detection, haar_detect, haar_detect_array
+
+
+@lru_cache(maxsize=None)
+def _load_model():
+    """MTCNN modeli süreç başına bir kez yüklenir (tüm dedektör örnekleri paylaşır); paket yoksa None."""
+    try:
+        from mtcnn import MTCNN  # type: ignore
+
+        model = MTCNN()
+    except Exception:
+        logger.warning("MTCNN paketi yok; Haar Cascade fallback kullanılacak.")
+        return None
+    logger.info("MTCNN bulundu, onu kullanacağız.")
+    return model
 
 
 class MTCNNDetector(BaseFaceDetector):
@@ -14,34 +29,49 @@ class MTCNNDetector(BaseFaceDetector):
     def __init__(self, score_threshold: float = 0.5, min_face: int = 24) -> None:
         self.score_threshold = float(score_threshold)
         self.min_face = int(min_face)
-        self._impl = None
-        self._fallback = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-        try:
-            from mtcnn import MTCNN  # type: ignore
+        # Haar yedeği iş parçacığı başına önbellekli cascade'i kullanır (base._thread_cascade)
+        self._impl = _load_model()
 
-            self._impl = MTCNN()
-            logger.info("MTCNN bulundu, onu kullanacağız.")
-        except Exception:
-            logger.warning("MTCNN paketi yok; Haar Cascade fallback kullanılacak.")
+    def _parse(self, res) -> List[Detection]:
+        dets: List[Detection] = []
+        for r in res:
+            x, y, w, h = r.get("box", [0, 0, 0, 0])
+            score = float(r.get("confidence", 1.0))
+            if score >= self.score_threshold and w > 0 and h > 0:
+                dets.append(Detection((x, y, x + w, y + h), score))
+        return dets
 
     def detect(self, image) -> List[Detection]:
-        dets: List[Detection] = []
         if self._impl is not None:
             try:
-                res = self._impl.detect_faces(image)
-                for r in res:
-                    x, y, w, h = r.get("box", [0, 0, 0, 0])
-                    score = float(r.get("confidence", 1.0))
-                    if score >= self.score_threshold and w > 0 and h > 0:
-                        dets.append(Detection((x, y, x + w, y + h), score))
-                return dets
+                return self._parse(self._impl.detect_faces(image))
             except Exception as e:
                 logger.error(f"MTCNN çalıştırılamadı, fallback'e dönüyoruz: {e}")
 
         # Fallback
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        faces = self._fallback.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(self.min_face, self.min_face))
-        for (x, y, w0, h0) in faces:
-            dets.append(Detection((x, y, x + w0, y + h0), 0.99))
-        return dets
+        return haar_detect(image, self.min_face)
+
+    def detect_batch(self, frames: Sequence) -> List[List[Detection]]:
+        if self._impl is not None and len(frames) > 1:
+            # mtcnn>=1.0 kare listesi alıp her kare için ayrı sonuç listesi döndürür
+            try:
+                res = self._impl.detect_faces(list(frames))
+                if isinstance(res, list) and len(res) == len(frames) and all(isinstance(r, list) for r in res):
+                    return [self._parse(r) for r in res]
+            except Exception as e:
+                logger.debug(f"MTCNN toplu çağrı desteklenmiyor, kare kare devam: {e}")
+            return [self.detect(f) for f in frames]
+
+        if self._impl is None:
+            return self._map_threads(lambda f: haar_detect(f, self.min_face), frames)
+        return super().detect_batch(frames)
+
+    def detect_array(self, image) -> np.ndarray:
+        if self._impl is None:
+            return haar_detect_array(image, self.min_face)
+        return super().detect_array(image)
 
+    def detect_batch_array(self, frames: Sequence) -> List[np.ndarray]:
+        if self._impl is None:
+            return self._map_threads(lambda f: haar_detect_array(f, self.min_face), frames)
+        return super().detect_batch_array(frames)
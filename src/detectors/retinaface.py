@@ -1,10 +1,22 @@
 from __future__ import annotations
-from typing import List
+from functools import lru_cache
+from typing import List, Sequence
 from loguru import logger
-import cv2
 import numpy as np
 
-from .base import BaseFaceDetector, Detection
+from .base import BaseFaceDetector, Detection, haar_detect, haar_detect_array
+
+
+@lru_cache(maxsize=None)
+def _load_package():
+    """retinaface paketi süreç başına bir kez aranır (model paket içinde önbelleklidir); yoksa None."""
+    try:
+        import retinaface  # type: ignore
+    except Exception:
+        logger.warning("RetinaFace paketi yok; Haar Cascade fallback kullanılacak.")
+        return None
+    logger.info("RetinaFace bulundu, onu kullanacağız.")
+    return retinaface
 
 
 class RetinaFaceDetector(BaseFaceDetector):
@@ -17,15 +29,8 @@ class RetinaFaceDetector(BaseFaceDetector):
     def __init__(self, score_threshold: float = 0.5, min_face: int = 24) -> None:
         self.score_threshold = float(score_threshold)
         self.min_face = int(min_face)
-        self._impl = None
-        self._fallback = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-        try:
-            import retinaface  # type: ignore
-
-            self._impl = retinaface
-            logger.info("RetinaFace bulundu, onu kullanacağız.")
-        except Exception:
-            logger.warning("RetinaFace paketi yok; Haar Cascade fallback kullanılacak.")
+        # Haar yedeği iş parçacığı başına önbellekli cascade'i kullanır (base._thread_cascade)
+        self._impl = _load_package()
 
     def detect(self, image) -> List[Detection]:
         h, w = image.shape[:2]
@@ -49,10 +54,21 @@ class RetinaFaceDetector(BaseFaceDetector):
                 logger.error(f"RetinaFace çalıştırılamadı, fallback'e dönüyoruz: {e}")
 
         # Fallback: Haar Cascade
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        faces = self._fallback.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(self.min_face, self.min_face))
-        for (x, y, w0, h0) in faces:
-            x1, y1, x2, y2 = x, y, x + w0, y + h0
-            dets.append(Detection((x1, y1, x2, y2), 0.99))
-        return dets
+        return haar_detect(image, self.min_face)
+
+    def detect_batch(self, frames: Sequence) -> List[List[Detection]]:
+        if self._impl is None:
+            # Haar yedeği: kareler iş parçacığı havuzuna dağıtılır
+            return self._map_threads(lambda f: haar_detect(f, self.min_face), frames)
+        # retinaface paketi yalnızca tek görüntü kabul eder; model çağrıları sıralı kalır
+        return super().detect_batch(frames)
+
+    def detect_array(self, image) -> np.ndarray:
+        if self._impl is None:
+            return haar_detect_array(image, self.min_face)
+        return super().detect_array(image)
 
+    def detect_batch_array(self, frames: Sequence) -> List[np.ndarray]:
+        if self._impl is None:
+            return self._map_threads(lambda f: haar_detect_array(f, self.min_face), frames)
+        return super().detect_batch_array(frames)
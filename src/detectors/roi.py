@@ -0,0 +1,98 @@
+from __future__ import annotations
+from typing import List, Sequence, Tuple
+import cv2
+import numpy as np
+
+from .base import BaseFaceDetector, Detection, array_to_dets
+
+
+def merge_rois(rois: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+    """Kesişen dikdörtgenleri kapsayan dikdörtgenlerde birleştir (sonuçlar ayrık olur)."""
+    rois = list(rois)
+    merged = True
+    while merged:
+        merged = False
+        out: List[Tuple[int, int, int, int]] = []
+        for r in rois:
+            for i, o in enumerate(out):
+                if r[0] < o[2] and o[0] < r[2] and r[1] < o[3] and o[1] < r[3]:
+                    out[i] = (min(r[0], o[0]), min(r[1], o[1]), max(r[2], o[2]), max(r[3], o[3]))
+                    merged = True
+                    break
+            else:
+                out.append(r)
+        rois = out
+    return rois
+
+
+class ROIDetector(BaseFaceDetector):
+    """Herhangi bir dedektörü, yalnızca iz tahminleri çevresindeki bölgeleri tarayacak şekilde sarar.
+
+    `set_hints()` ile verilen kutular `pad` oranında genişletilip birleştirilir ve sadece bu
+    bölgeler taranır. Her `rescan_every` çağrıda bir ya da sahne değiştiğinde (küçük gri
+    önizlemenin ortalama mutlak farkı `scene_threshold`'u aşarsa) tam kare taranır ki yeni
+    yüzler kaçmasın.
+    """
+
+    def __init__(
+        self,
+        inner: BaseFaceDetector,
+        rescan_every: int = 10,
+        pad: float = 0.5,
+        scene_threshold: float = 12.0,
+    ) -> None:
+        self.inner = inner
+        self.name = f"{inner.name}+roi"
+        self.rescan_every = max(1, int(rescan_every))
+        self.pad = float(pad)
+        self.scene_threshold = float(scene_threshold)
+        self._hints: List[Tuple[int, int, int, int]] = []
+        self._since_full = self.rescan_every  # ilk çağrı tam kare
+        self._prev_thumb = None
+        self.full_scans = 0
+        self.roi_scans = 0
+
+    def set_hints(self, boxes: Sequence[Tuple[int, int, int, int]]) -> None:
+        """Bir sonraki `detect()` çağrısı için işleme koordinatlarında tahmini yüz kutuları."""
+        self._hints = [tuple(b) for b in np.asarray(boxes, dtype=np.float64).reshape(-1, 4).astype(np.int64).tolist()]
+
+    def _scene_changed(self, image) -> bool:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        thumb = cv2.resize(gray, (64, 36), interpolation=cv2.INTER_AREA).astype(np.int16)
+        prev, self._prev_thumb = self._prev_thumb, thumb
+        if prev is None:
+            return True
+        return float(np.abs(thumb - prev).mean()) > self.scene_threshold
+
+    def _rois(self, width: int, height: int) -> List[Tuple[int, int, int, int]]:
+        rois = []
+        for x1, y1, x2, y2 in self._hints:
+            p = int(self.pad * max(x2 - x1, y2 - y1))
+            r = (max(0, x1 - p), max(0, y1 - p), min(width, x2 + p), min(height, y2 + p))
+            if r[2] > r[0] and r[3] > r[1]:
+                rois.append(r)
+        return merge_rois(rois)
+
+    def detect(self, image) -> List[Detection]:
+        return array_to_dets(self.detect_array(image))
+
+    def detect_array(self, image) -> np.ndarray:
+        scene_changed = self._scene_changed(image)
+        self._since_full += 1
+        if scene_changed or self._since_full >= self.rescan_every:
+            self._since_full = 0
+            self.full_scans += 1
+            return self.inner.detect_array(image)
+
+        h, w = image.shape[:2]
+        rois = self._rois(w, h)
+        if not rois:
+            return np.empty((0, 5), dtype=np.float32)
+        self.roi_scans += 1
+        crops = [image[y1:y2, x1:x2] for x1, y1, x2, y2 in rois]
+        res = self.inner.detect_batch_array(crops)
+        # Bölge koordinatlarından kare koordinatlarına tek toplamayla taşı
+        offsets = np.repeat(np.asarray([r[:2] for r in rois], dtype=np.float32), [len(r) for r in res], axis=0)
+        dets = np.concatenate(res) if res else np.empty((0, 5), dtype=np.float32)
+        dets[:, 0:4] += np.tile(offsets, 2)
+        return dets
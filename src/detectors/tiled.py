@@ -0,0 +1,73 @@
+from __future__ import annotations
+from typing import List, Sequence, Tuple
+import numpy as np
+
+from .base import BaseFaceDetector, Detection, array_to_dets
+from ..utils.boxes import nms
+
+
+def tile_grid(width: int, height: int, tile_size: int, overlap: float) -> List[Tuple[int, int, int, int]]:
+    """Kareyi örtüşen (x1, y1, x2, y2) karolara böl; son karolar kenara hizalanır."""
+
+    def starts(length: int) -> List[int]:
+        if length <= tile_size:
+            return [0]
+        stride = max(1, int(tile_size * (1.0 - overlap)))
+        out = list(range(0, length - tile_size, stride))
+        out.append(length - tile_size)
+        return out
+
+    return [
+        (x, y, min(width, x + tile_size), min(height, y + tile_size))
+        for y in starts(height)
+        for x in starts(width)
+    ]
+
+
+class TiledDetector(BaseFaceDetector):
+    """Yüksek çözünürlüklü kareleri örtüşen karolarda tespit eden sarmalayıcı.
+
+    Tüm karolar iç dedektörün `detect_batch()`'ine tek seferde verilir (Haar yedeği bunları
+    iş parçacıklarına dağıtır). Karo sınırlarında iki kez bulunan yüzler `nms_threshold`
+    ile NMS'ten geçirilerek tekilleştirilir.
+    """
+
+    def __init__(self, inner: BaseFaceDetector, tile_size: int = 640, overlap: float = 0.2, nms_threshold: float = 0.4) -> None:
+        self.inner = inner
+        self.name = f"{inner.name}+tiled"
+        self.tile_size = int(tile_size)
+        self.overlap = float(overlap)
+        self.nms_threshold = float(nms_threshold)
+
+    def detect(self, image) -> List[Detection]:
+        return array_to_dets(self.detect_batch_array([image])[0])
+
+    def detect_batch(self, frames: Sequence) -> List[List[Detection]]:
+        return [array_to_dets(d) for d in self.detect_batch_array(frames)]
+
+    def detect_array(self, image) -> np.ndarray:
+        return self.detect_batch_array([image])[0]
+
+    def detect_batch_array(self, frames: Sequence) -> List[np.ndarray]:
+        tiles = []
+        owners = []
+        for i, image in enumerate(frames):
+            h, w = image.shape[:2]
+            for (x1, y1, x2, y2) in tile_grid(w, h, self.tile_size, self.overlap):
+                tiles.append(image[y1:y2, x1:x2])
+                owners.append((i, x1, y1))
+
+        res = self.inner.detect_batch_array(tiles)
+        counts = [len(r) for r in res]
+        dets = np.concatenate(res) if res else np.empty((0, 5), dtype=np.float32)
+        owner = np.repeat(np.asarray(owners, dtype=np.int64).reshape(-1, 3), counts, axis=0)
+        # Karo koordinatlarından kare koordinatlarına tek toplamayla taşı
+        dets[:, 0:4] += np.tile(owner[:, 1:3], 2).astype(np.float32)
+
+        out: List[np.ndarray] = []
+        for i in range(len(frames)):
+            d = dets[owner[:, 0] == i]
+            if len(d) >= 2:
+                d = d[nms(d[:, :4], d[:, 4], self.nms_threshold)]
+            out.append(d)
+        return out
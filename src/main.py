@@ -1,15 +1,24 @@
 from __future__ import annotations
 import typer
-from typing import Optional
+from typing import List, Optional
 from loguru import logger
 import os
+import cv2
 
-from .pipeline import PipelineConfig, process_video, load_config
+from .pipeline import PipelineConfig, check_detections_only, process_video, load_config
+from .utils.heatmap import merge_raw
 
 
 app = typer.Typer(help="Yüz tespiti/ takibi/ sayımı/ ısı haritası (kimliksiz)")
 
 
+def _on_off(value: Optional[str]) -> Optional[bool]:
+    """'on'/'off' seçeneğini çöz; verilmemişse None (config/varsayılan korunur)."""
+    if not value:
+        return None
+    return value.lower() == "on"
+
+
 def _execute(
     source: str,
     detector: str,
@@ -25,6 +34,7 @@ def _execute(
     frame_skip: int,
     half_res: str,
     config: Optional[str],
+    **overrides,
 ):
     """Aynı iş mantığını hem alt komut hem de kök komut için kullan."""
     if config:
@@ -62,6 +72,17 @@ def _execute(
             half_res=(half_res.lower() == "on"),
         )
 
+    # Ek ayarlar: yalnızca CLI'da verilenler config/varsayılanların üzerine yazılır
+    for key, value in overrides.items():
+        if value is not None:
+            setattr(cfg, key, value)
+
+    if cfg.detections_only:
+        try:
+            check_detections_only(cfg)
+        except ValueError as e:
+            raise typer.BadParameter(str(e))
+
     logger.info("Pipeline başlatılıyor...")
     process_video(cfg)
 
@@ -82,6 +103,39 @@ def run(
     frame_skip: int = typer.Option(1, help="Her N karede tespit"),
     half_res: str = typer.Option("off", help="Yarı çözünürlük: on/off"),
     config: Optional[str] = typer.Option(None, help="YAML config yolu (opsiyonel)"),
+    threaded: Optional[str] = typer.Option(None, help="Okuma/tespit/yazma iş parçacıkları: on/off"),
+    queue_size: Optional[int] = typer.Option(None, help="Aşamalar arası kuyruk boyu (backpressure)"),
+    workers: Optional[int] = typer.Option(None, help="Videoyu N sürece bölerek paralel işle"),
+    batch: Optional[int] = typer.Option(None, help="Tek dedektör çağrısındaki kare sayısı"),
+    roi_detect: Optional[str] = typer.Option(None, help="İz çevresinde bölge tespiti (periyodik tam tarama): on/off"),
+    target_fps: Optional[float] = typer.Option(None, help="Hedef FPS: tespit aralığı ve ölçek çalışırken ayarlanır"),
+    motion_gate: Optional[str] = typer.Option(None, help="Statik karelerde dedektörü atla: on/off"),
+    tile: Optional[str] = typer.Option(None, help="Örtüşen karolarda tespit (NMS ile birleştirme): on/off"),
+    nms_threshold: Optional[float] = typer.Option(None, help="Karo birleştirmede NMS IoU eşiği"),
+    det_cache: Optional[str] = typer.Option(None, help="Tespit önbelleği klasörü"),
+    detections_only: bool = typer.Option(False, "--detections-only", help="Sadece tespit yapıp önbelleği doldur"),
+    save_metrics_columnar: Optional[str] = typer.Option(None, help="Sütunsal metrik çıkışı (.parquet ya da .npy klasörü)"),
+    save_rollup: Optional[str] = typer.Option(None, help="Zaman kovası özet önekleri (<önek>_1s.csv, <önek>_60s.csv, <önek>_dwell.csv)"),
+    heatmap_stride: Optional[int] = typer.Option(None, help="Isı haritası ızgara adımı (px)"),
+    heatmap_mode: Optional[str] = typer.Option(None, help="Isı haritası kipi: cumulative/window/decay"),
+    heatmap_snapshots: Optional[str] = typer.Option(None, help="Isı haritası anlık görüntü klasörü (PNG + .npy)"),
+    heatmap_snapshot_every: Optional[float] = typer.Option(None, help="Anlık görüntü aralığı (sn, video zamanı)"),
+    heatmap_raw: Optional[str] = typer.Option(None, help="Ham ısı haritası çıkışı (.npy + .json)"),
+    blur_mode: Optional[str] = typer.Option(None, help="Anonimleştirme: gaussian/fast_blur/pixelate/fill"),
+    sample_fps: Optional[float] = typer.Option(None, help="Sadece metrik: bu FPS ile örneklenen kareleri işle (seek/grab)"),
+    video_backend: Optional[str] = typer.Option(None, help="Video yazıcı: auto/ffmpeg/cv2"),
+    video_codec: Optional[str] = typer.Option(None, help="ffmpeg codec (libx264, libx265, libvpx-vp9, mpeg4...)"),
+    video_preset: Optional[str] = typer.Option(None, help="ffmpeg preset (ultrafast ... veryslow)"),
+    video_threads: Optional[int] = typer.Option(None, help="ffmpeg kodlayıcı thread sayısı (0 = otomatik)"),
+    video_scale: Optional[float] = typer.Option(None, help="Çıktı videosu ölçeği (ör. 0.5)"),
+    save_clips: Optional[str] = typer.Option(None, help="Olay klipleri klasörü (sadece yüz olan aralıklar + index.json)"),
+    clip_pre_roll: Optional[float] = typer.Option(None, help="Klip öncesi pay (sn)"),
+    clip_post_roll: Optional[float] = typer.Option(None, help="Klip sonrası pay (sn)"),
+    stage_timing: Optional[bool] = typer.Option(None, "--stage-timing/--no-stage-timing", help="Aşama gecikme histogramları (p50/p95/p99)"),
+    stage_report_every: Optional[int] = typer.Option(None, help="Her N işlenen karede aşama gecikme özetini metrik olaylarına yaz"),
+    profile_frames: Optional[str] = typer.Option(None, help="Bu kare aralığında profil çıkar (ör. 100-300)"),
+    profile_mode: Optional[str] = typer.Option(None, help="Profil kipi: cprofile | sample"),
+    profile_out: Optional[str] = typer.Option(None, help="Profil çıktı öneki (.prof/.folded/.txt eklenir)"),
 ):
     """Komut satırı arayüzü (alt komut)."""
     _execute(
@@ -99,6 +153,39 @@ def run(
         frame_skip,
         half_res,
         config,
+        threaded=_on_off(threaded),
+        queue_size=queue_size,
+        workers=workers,
+        batch=batch,
+        roi_detect=_on_off(roi_detect),
+        target_fps=target_fps,
+        motion_gate=_on_off(motion_gate),
+        tile=_on_off(tile),
+        nms_threshold=nms_threshold,
+        det_cache_dir=det_cache,
+        detections_only=detections_only or None,
+        output_metrics_columnar=save_metrics_columnar,
+        output_rollup=save_rollup,
+        heatmap_stride=heatmap_stride,
+        heatmap_mode=heatmap_mode,
+        heatmap_snapshot_dir=heatmap_snapshots,
+        heatmap_snapshot_every=heatmap_snapshot_every,
+        output_heatmap_raw=heatmap_raw,
+        blur_mode=blur_mode,
+        sample_fps=sample_fps,
+        video_backend=video_backend,
+        video_codec=video_codec,
+        video_preset=video_preset,
+        video_threads=video_threads,
+        video_scale=video_scale,
+        output_clips_dir=save_clips,
+        clip_pre_roll=clip_pre_roll,
+        clip_post_roll=clip_post_roll,
+        stage_timing=stage_timing,
+        stage_report_every=stage_report_every,
+        profile_frames=profile_frames,
+        profile_mode=profile_mode,
+        profile_out=profile_out,
     )
 
 
@@ -119,6 +206,39 @@ def main(
     frame_skip: int = typer.Option(1, help="Her N karede tespit"),
     half_res: str = typer.Option("off", help="Yarı çözünürlük: on/off"),
     config: Optional[str] = typer.Option(None, help="YAML config yolu (opsiyonel)"),
+    threaded: Optional[str] = typer.Option(None, help="Okuma/tespit/yazma iş parçacıkları: on/off"),
+    queue_size: Optional[int] = typer.Option(None, help="Aşamalar arası kuyruk boyu (backpressure)"),
+    workers: Optional[int] = typer.Option(None, help="Videoyu N sürece bölerek paralel işle"),
+    batch: Optional[int] = typer.Option(None, help="Tek dedektör çağrısındaki kare sayısı"),
+    roi_detect: Optional[str] = typer.Option(None, help="İz çevresinde bölge tespiti (periyodik tam tarama): on/off"),
+    target_fps: Optional[float] = typer.Option(None, help="Hedef FPS: tespit aralığı ve ölçek çalışırken ayarlanır"),
+    motion_gate: Optional[str] = typer.Option(None, help="Statik karelerde dedektörü atla: on/off"),
+    tile: Optional[str] = typer.Option(None, help="Örtüşen karolarda tespit (NMS ile birleştirme): on/off"),
+    nms_threshold: Optional[float] = typer.Option(None, help="Karo birleştirmede NMS IoU eşiği"),
+    det_cache: Optional[str] = typer.Option(None, help="Tespit önbelleği klasörü"),
+    detections_only: bool = typer.Option(False, "--detections-only", help="Sadece tespit yapıp önbelleği doldur"),
+    save_metrics_columnar: Optional[str] = typer.Option(None, help="Sütunsal metrik çıkışı (.parquet ya da .npy klasörü)"),
+    save_rollup: Optional[str] = typer.Option(None, help="Zaman kovası özet önekleri (<önek>_1s.csv, <önek>_60s.csv, <önek>_dwell.csv)"),
+    heatmap_stride: Optional[int] = typer.Option(None, help="Isı haritası ızgara adımı (px)"),
+    heatmap_mode: Optional[str] = typer.Option(None, help="Isı haritası kipi: cumulative/window/decay"),
+    heatmap_snapshots: Optional[str] = typer.Option(None, help="Isı haritası anlık görüntü klasörü (PNG + .npy)"),
+    heatmap_snapshot_every: Optional[float] = typer.Option(None, help="Anlık görüntü aralığı (sn, video zamanı)"),
+    heatmap_raw: Optional[str] = typer.Option(None, help="Ham ısı haritası çıkışı (.npy + .json)"),
+    blur_mode: Optional[str] = typer.Option(None, help="Anonimleştirme: gaussian/fast_blur/pixelate/fill"),
+    sample_fps: Optional[float] = typer.Option(None, help="Sadece metrik: bu FPS ile örneklenen kareleri işle (seek/grab)"),
+    video_backend: Optional[str] = typer.Option(None, help="Video yazıcı: auto/ffmpeg/cv2"),
+    video_codec: Optional[str] = typer.Option(None, help="ffmpeg codec (libx264, libx265, libvpx-vp9, mpeg4...)"),
+    video_preset: Optional[str] = typer.Option(None, help="ffmpeg preset (ultrafast ... veryslow)"),
+    video_threads: Optional[int] = typer.Option(None, help="ffmpeg kodlayıcı thread sayısı (0 = otomatik)"),
+    video_scale: Optional[float] = typer.Option(None, help="Çıktı videosu ölçeği (ör. 0.5)"),
+    save_clips: Optional[str] = typer.Option(None, help="Olay klipleri klasörü (sadece yüz olan aralıklar + index.json)"),
+    clip_pre_roll: Optional[float] = typer.Option(None, help="Klip öncesi pay (sn)"),
+    clip_post_roll: Optional[float] = typer.Option(None, help="Klip sonrası pay (sn)"),
+    stage_timing: Optional[bool] = typer.Option(None, "--stage-timing/--no-stage-timing", help="Aşama gecikme histogramları (p50/p95/p99)"),
+    stage_report_every: Optional[int] = typer.Option(None, help="Her N işlenen karede aşama gecikme özetini metrik olaylarına yaz"),
+    profile_frames: Optional[str] = typer.Option(None, help="Bu kare aralığında profil çıkar (ör. 100-300)"),
+    profile_mode: Optional[str] = typer.Option(None, help="Profil kipi: cprofile | sample"),
+    profile_out: Optional[str] = typer.Option(None, help="Profil çıktı öneki (.prof/.folded/.txt eklenir)"),
 ):
     """Kök komut: 'run' yazmadan çağrılmayı da destekler."""
     if ctx.invoked_subcommand is None:
@@ -141,7 +261,165 @@ def main(
             frame_skip,
             half_res,
             config,
+            threaded=_on_off(threaded),
+            queue_size=queue_size,
+            workers=workers,
+            batch=batch,
+            roi_detect=_on_off(roi_detect),
+            target_fps=target_fps,
+            motion_gate=_on_off(motion_gate),
+            tile=_on_off(tile),
+            nms_threshold=nms_threshold,
+            det_cache_dir=det_cache,
+            detections_only=detections_only or None,
+            output_metrics_columnar=save_metrics_columnar,
+            output_rollup=save_rollup,
+            heatmap_stride=heatmap_stride,
+            heatmap_mode=heatmap_mode,
+            heatmap_snapshot_dir=heatmap_snapshots,
+            heatmap_snapshot_every=heatmap_snapshot_every,
+            output_heatmap_raw=heatmap_raw,
+            blur_mode=blur_mode,
+            sample_fps=sample_fps,
+            video_backend=video_backend,
+            video_codec=video_codec,
+            video_preset=video_preset,
+            video_threads=video_threads,
+            video_scale=video_scale,
+            output_clips_dir=save_clips,
+            clip_pre_roll=clip_pre_roll,
+            clip_post_roll=clip_post_roll,
+            stage_timing=stage_timing,
+            stage_report_every=stage_report_every,
+            profile_frames=profile_frames,
+            profile_mode=profile_mode,
+            profile_out=profile_out,
+        )
+
+
+@app.command("merge-heatmaps")
+def merge_heatmaps(
+    inputs: List[str] = typer.Argument(..., help="Ham ısı haritaları (.npy; yanında .json üst verisi)"),
+    out: str = typer.Option(..., help="Birleşik ham çıktı (.npy + .json)"),
+    png: Optional[str] = typer.Option(None, help="Birleşik ısı haritası PNG"),
+):
+    """Çok sayıda videonun/kameranın ham ısı haritalarını tek tek okuyarak toplar."""
+    try:
+        total = merge_raw(inputs)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    total.save_raw(out)
+    if png:
+        if os.path.dirname(png):
+            os.makedirs(os.path.dirname(png), exist_ok=True)
+        cv2.imwrite(png, total.to_color())
+    logger.info(f"{len(inputs)} ısı haritası birleştirildi ({total.frames} kare): {out}")
+
+
+@app.command()
+def multi(
+    sources: List[str] = typer.Argument(..., help="Kaynak videolar (her biri ayrı akış/kamera)"),
+    out_dir: str = typer.Option("data/outputs/multi", help="Akış başına çıktıların kök klasörü"),
+    detector: str = typer.Option("retinaface", help="Dedektör: retinaface | mtcnn"),
+    tracker: str = typer.Option("ocsort", help="Takipçi: ocsort | deepsort"),
+    heatmap: str = typer.Option("on", help="Isı haritası: on/off"),
+    score_threshold: float = typer.Option(0.5, help="Skor eşiği"),
+    min_face_size: int = typer.Option(24, help="Min yüz boyutu (px)"),
+    frame_skip: int = typer.Option(1, help="Her N karede tespit"),
+    half_res: str = typer.Option("off", help="Yarı çözünürlük: on/off"),
+    config: Optional[str] = typer.Option(None, help="YAML config yolu (opsiyonel; ortak ayarlar)"),
+    detector_workers: int = typer.Option(2, help="Paylaşılan dedektör örneği / iş parçacığı sayısı"),
+    realtime: bool = typer.Option(False, "--realtime", help="Dosyaları gerçek zaman hızında oynat (canlı kamera benzetimi)"),
+    max_inflight: int = typer.Option(2, help="Akış başına havuzda bekleyen en fazla tespit"),
+    queue_size: int = typer.Option(8, help="Akış başına okuma kuyruğu boyu"),
+    report_every: float = typer.Option(5.0, help="Akış FPS / kuyruk raporu aralığı (sn)"),
+):
+    """Çok kameralı mod: tüm akışlar tek süreçte, ortak dedektör havuzuyla işlenir."""
+    from .multistream import process_streams
+
+    if config:
+        cfg = load_config(config)
+        cfg.source = sources[0]
+    else:
+        cfg = PipelineConfig(
+            source=sources[0],
+            output_video=None,
+            output_metrics_json=None,
+            output_metrics_csv=None,
+            output_heatmap=None,
+            detector=detector,
+            tracker=tracker,
+            score_threshold=score_threshold,
+            nms_threshold=0.4,
+            min_face_size=min_face_size,
+            blur=False,
+            blur_level=15,
+            heatmap=(heatmap.lower() == "on"),
+            frame_skip=frame_skip,
+            half_res=(half_res.lower() == "on"),
+        )
+    process_streams(
+        cfg,
+        sources,
+        out_dir,
+        detector_workers=detector_workers,
+        realtime=realtime,
+        max_inflight=max_inflight,
+        queue_size=queue_size,
+        report_every=report_every,
+    )
+
+
+@app.command()
+def sweep(
+    source: str = typer.Argument(..., help="Ayarların deneneceği video"),
+    out_dir: str = typer.Option("data/outputs/sweep", help="sweep.json / sweep.csv klasörü"),
+    config: Optional[str] = typer.Option(None, help="YAML config yolu (temel ayarlar; referans bunlarla frame_skip=1, tam çözünürlük)"),
+    detector: str = typer.Option("retinaface", help="Dedektör: retinaface | mtcnn"),
+    tracker: str = typer.Option("ocsort", help="Takipçi: ocsort | deepsort"),
+    frame_skip: List[int] = typer.Option([1, 2, 3, 5], help="Denenecek frame_skip değerleri (tekrarlanabilir)"),
+    half_res: List[str] = typer.Option(["off", "on"], help="Denenecek yarı çözünürlük değerleri: on/off"),
+    min_face_size: List[int] = typer.Option([], help="Denenecek min yüz boyutları (boş: temel ayar)"),
+    score_threshold: List[float] = typer.Option([], help="Denenecek skor eşikleri (boş: temel ayar)"),
+    max_error: float = typer.Option(0.05, help="Sayım hatası bütçesi (aktif / toplam kimlik, oran)"),
+    measure: bool = typer.Option(False, "--measure", help="Pareto ayarlarını gerçek metrik işi olarak da çalıştırıp FPS ölç"),
+    det_cache_dir: Optional[str] = typer.Option(None, help="Tespit önbelleği (varsayılan <out_dir>/det_cache)"),
+):
+    """frame_skip / half_res / min yüz / skor eşiği ızgarasını tarar; hız-sayım doğruluğu Pareto ayarlarını raporlar."""
+    from .sweep import run_sweep
+
+    if config:
+        cfg = load_config(config)
+        cfg.source = source
+    else:
+        cfg = PipelineConfig(
+            source=source,
+            output_video=None,
+            output_metrics_json=None,
+            output_metrics_csv=None,
+            output_heatmap=None,
+            detector=detector,
+            tracker=tracker,
+            score_threshold=0.5,
+            nms_threshold=0.4,
+            min_face_size=24,
+            blur=False,
+            blur_level=15,
+            heatmap=False,
+            frame_skip=1,
+            half_res=False,
         )
+    if det_cache_dir:
+        cfg.det_cache_dir = det_cache_dir
+    grid = {"frame_skip": frame_skip, "half_res": [v.lower() == "on" for v in half_res]}
+    if min_face_size:
+        grid["min_face_size"] = min_face_size
+    if score_threshold:
+        grid["score_threshold"] = score_threshold
+    try:
+        run_sweep(cfg, grid, out_dir, max_error=max_error, measure=measure)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
 
 
 if __name__ == "__main__":
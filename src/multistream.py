@@ -0,0 +1,234 @@
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+import dataclasses
+import json
+import os
+import queue
+import time
+
+import cv2
+import numpy as np
+from loguru import logger
+
+from .detectors.base import BaseFaceDetector
+from .pipeline import PipelineConfig, build_frame_detector, build_heatmap, build_tracker, rescale_detections, _resize
+from .utils.video_io import open_video, get_props, grab_frames, paced, ThreadedReader
+from .utils.metrics import MetricsLogger
+
+
+class DetectorPool:
+    """Akışlar arasında paylaşılan sabit sayıda dedektör örneği.
+
+    Her iş parçacığı havuzdan bir dedektör alır, tespiti yapar ve geri bırakır; iş parçacığı
+    sayısı dedektör sayısına eşit olduğundan bekleme olmaz. Model süreçte bir kez, Haar
+    cascade'i havuz iş parçacığı başına bir kez yüklenir.
+    """
+
+    def __init__(self, factory: Callable[[], BaseFaceDetector], size: int) -> None:
+        self.size = max(1, int(size))
+        self._free: queue.Queue = queue.Queue()
+        for _ in range(self.size):
+            self._free.put(factory())
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="detector")
+
+    def _detect(self, image) -> np.ndarray:
+        det = self._free.get()
+        try:
+            return det.detect_array(image)
+        finally:
+            self._free.put(det)
+
+    def submit(self, image) -> Future:
+        return self._executor.submit(self._detect, image)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+class _Stream:
+    """Tek bir kaynağın durumu: okuyucu, takipçi, ısı haritası, metrikler ve istatistikler."""
+
+    def __init__(self, name: str, cfg: PipelineConfig, out_dir: str, realtime: bool, queue_size: int) -> None:
+        self.name = name
+        self.cfg = cfg
+        self.cap = open_video(cfg.source)
+        self.width, self.height, self.fps_in, self.total_frames = get_props(self.cap)
+        self.skip = max(1, cfg.frame_skip)
+        self.scale = 0.5 if cfg.half_res else 1.0
+        frames = grab_frames(self.cap, lambda fid: fid % self.skip == 0)
+        if realtime:
+            frames = paced(frames, self.fps_in)
+        # Canlı kaynakta işleme geride kalırsa eski kareler atılır; dosya modunda okuyucu bekler
+        self.reader = ThreadedReader(frames, maxsize=queue_size, drop_oldest=realtime)
+        self.tracker = build_tracker(cfg.tracker)
+        self.heatmap = build_heatmap(cfg, self.height, self.width) if cfg.heatmap else None
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.metrics = MetricsLogger(
+            os.path.join(out_dir, "metrics.jsonl"),
+            os.path.join(out_dir, "metrics.csv"),
+            flush_every=cfg.metrics_flush_every,
+        )
+        # Sıra korunarak işlenecek kareler: (frame_id, tespit future'ı ya da None)
+        self.pending: Deque[Tuple[int, Optional[Future]]] = deque()
+        self.eof = False
+        self.ids: set = set()
+        self.frames = 0
+        self.det_calls = 0
+        self.t_start = time.perf_counter()
+        self.t_end: float | None = None
+        self._window: Deque[float] = deque(maxlen=60)
+        self.queue_samples = 0
+        self.queue_sum = 0
+        self.queue_max = 0
+
+    def sample_queue(self) -> None:
+        q = self.reader.qsize()
+        self.queue_samples += 1
+        self.queue_sum += q
+        self.queue_max = max(self.queue_max, q)
+
+    def finish_ready(self) -> int:
+        """Baştaki tamamlanmış kareleri sırayla takipçiye ver; işlenen kare sayısını döndürür."""
+        done = 0
+        while self.pending and (self.pending[0][1] is None or self.pending[0][1].done()):
+            frame_id, fut = self.pending.popleft()
+            if fut is not None:
+                tracks = self.tracker.update_array(rescale_detections(fut.result(), self.scale))
+            else:
+                tracks = self.tracker.predict_array()
+            t_video = frame_id / (self.fps_in or 25.0)
+            if self.heatmap is not None:
+                self.heatmap.add_bboxes(tracks[:, 1:5], t=t_video)
+            self.ids.update(tracks[:, 0].astype(np.int64).tolist())
+            self.metrics.log(t_video, frame_id, active_count=len(tracks), total_ids=len(self.ids))
+            self.frames += 1
+            self._window.append(time.perf_counter())
+            done += 1
+        return done
+
+    def fps(self) -> float:
+        if len(self._window) < 2:
+            return 0.0
+        return (len(self._window) - 1) / max(1e-9, self._window[-1] - self._window[0])
+
+    def summary(self) -> Dict:
+        wall = (self.t_end or time.perf_counter()) - self.t_start
+        return {
+            "name": self.name,
+            "source": self.cfg.source,
+            "frames": self.frames,
+            "detector_calls": self.det_calls,
+            "total_ids": len(self.ids),
+            "fps": round(self.frames / wall, 2) if wall > 0 else 0.0,
+            "source_fps": self.fps_in,
+            "queue_mean": round(self.queue_sum / self.queue_samples, 2) if self.queue_samples else 0.0,
+            "queue_max": self.queue_max,
+            "dropped": self.reader.dropped,
+        }
+
+    def close(self) -> None:
+        self.reader.close()
+        self.cap.release()
+        self.metrics.close()
+        if self.heatmap is not None:
+            cv2.imwrite(os.path.join(self.out_dir, "heatmap.png"), self.heatmap.to_color())
+            self.heatmap.save_raw(os.path.join(self.out_dir, "heatmap.npy"))
+
+
+def _stream_names(sources: List[str]) -> List[str]:
+    names = []
+    for i, src in enumerate(sources):
+        stem = os.path.splitext(os.path.basename(src))[0] or "stream"
+        names.append(f"{i:02d}_{stem}")
+    return names
+
+
+def process_streams(
+    cfg: PipelineConfig,
+    sources: List[str],
+    out_dir: str,
+    detector_workers: int = 2,
+    realtime: bool = False,
+    max_inflight: int = 2,
+    queue_size: int = 8,
+    report_every: float = 5.0,
+) -> List[Dict]:
+    """Birden çok kaynağı tek süreçte, paylaşılan dedektör havuzuyla işler.
+
+    Zamanlayıcı akışları sırayla dolaşır ve her turda her akıştan en fazla bir kare alır;
+    bir akışın havuzdaki bekleyen tespit sayısı `max_inflight` ile sınırlıdır. Böylece
+    yoğun bir akış diğerlerinin dedektör payını tüketemez. Her akışın takipçisi, ısı
+    haritası ve metrikleri `out_dir/<akış>/` altında ayrıdır; özet `out_dir/summary.json`'dadır.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    pool = DetectorPool(lambda: build_frame_detector(cfg), detector_workers)
+    streams = [
+        _Stream(name, dataclasses.replace(cfg, source=src), os.path.join(out_dir, name), realtime, queue_size)
+        for name, src in zip(_stream_names(sources), sources)
+    ]
+    logger.info(f"{len(streams)} akış, {pool.size} dedektör örneği, {'gerçek zaman' if realtime else 'dosya'} modu")
+
+    t_report = time.perf_counter()
+    start = 0
+    try:
+        while any(not s.eof or s.pending for s in streams):
+            progressed = False
+            # Adil sıra: her tur farklı akıştan başlar
+            order = streams[start:] + streams[:start]
+            start = (start + 1) % len(streams)
+            for s in order:
+                if s.finish_ready():
+                    progressed = True
+                if s.eof:
+                    if not s.pending and s.t_end is None:
+                        s.t_end = time.perf_counter()
+                    continue
+                inflight = sum(1 for _, f in s.pending if f is not None)
+                if inflight >= max_inflight:
+                    continue
+                s.sample_queue()
+                try:
+                    item = s.reader.poll()
+                except StopIteration:
+                    s.eof = True
+                    continue
+                if item is None:
+                    continue
+                frame_id, frame = item
+                fut = None
+                if frame is not None:
+                    fut = pool.submit(_resize(frame, s.scale))
+                    s.det_calls += 1
+                s.pending.append((frame_id, fut))
+                progressed = True
+
+            if not progressed:
+                # Hiçbir akış ilerleyemediyse ilk biten tespiti ya da yeni kareyi kısa süre bekle
+                futs = [f for s in streams for _, f in s.pending if f is not None]
+                if futs:
+                    wait(futs, timeout=0.005, return_when=FIRST_COMPLETED)
+                else:
+                    time.sleep(0.002)
+
+            now = time.perf_counter()
+            if report_every > 0 and now - t_report >= report_every:
+                t_report = now
+                for s in streams:
+                    logger.info(f"[{s.name}] {s.fps():.1f} FPS, kuyruk {s.reader.qsize()}, atılan {s.reader.dropped}, kare {s.frames}")
+    finally:
+        pool.shutdown()
+        for s in streams:
+            s.close()
+
+    summary = [s.summary() for s in streams]
+    with open(os.path.join(out_dir, "summary.json"), "w") as f:
+        json.dump({"detector_workers": pool.size, "realtime": realtime, "streams": summary}, f, indent=2)
+    for r in summary:
+        logger.info(
+            f"[{r['name']}] {r['frames']} kare, {r['fps']} FPS, {r['total_ids']} ID, "
+            f"kuyruk ort. {r['queue_mean']} / en çok {r['queue_max']}, atılan {r['dropped']}"
+        )
+    return summary
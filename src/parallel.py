@@ -0,0 +1,298 @@
+from __future__ import annotations
+from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+import dataclasses
+import itertools
+import os
+import time
+
+from loguru import logger
+import cv2
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from .pipeline import (
+    PipelineConfig,
+    _detection_chunks,
+    _run_detector,
+    annotate_frame,
+    build_frame_detector,
+    build_heatmap,
+    build_tracker,
+    open_detection_cache,
+    open_output_writer,
+)
+from .utils.video_io import open_video, get_props, read_frames, grab_frames
+from .utils.fps import FPSMeter
+from .utils.heatmap import HeatmapSnapshots
+from .utils.metrics import MetricsLogger
+from .utils.rollup import MetricsRollup
+from .utils.clips import EventClipWriter
+from .utils.boxes import iou_matrix
+
+
+# Segment sınırında ID eşlemek için bir önceki segmentle ortak işlenen kare sayısı
+MIN_OVERLAP = 10
+
+# Segmentlere bölünemeyen ayarlar: tespitler iz durumuna (ROI, hedef FPS, hareket kapısı) ya da
+# örnekleme adımına bağlıdır
+SERIAL_ONLY = {
+    "roi_detect": lambda c: c.roi_detect,
+    "target_fps": lambda c: c.target_fps > 0,
+    "motion_gate": lambda c: c.motion_gate,
+    "sample_fps": lambda c: c.sample_fps > 0,
+}
+
+
+def split_segments(total_frames: int, n: int) -> List[Tuple[int, int]]:
+    """[1, total_frames] aralığını n adet [start, end) kare aralığına böl."""
+    n = max(1, min(int(n), total_frames))
+    bounds = np.linspace(1, total_frames + 1, n + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def _process_segment(cfg: PipelineConfig, start: int, end: int, overlap: int, width: int, height: int) -> Dict:
+    """Bir süreçte [start - overlap, end) karelerini işler.
+
+    Dönen `rows` dizisi (frame_id, local_id, x1, y1, x2, y2), `scores` ise izlerin skorudur.
+    Örtüşen kareler sadece ID eşleme içindir. Tespit seri akıştaki gibi `build_frame_detector`
+    (karo dahil), `batch` ve tespit önbelleğiyle yapılır; önbellek burada yalnızca okunur, yeni
+    tespitler `new_dets` olarak ana sürece döner ve orada tek seferde kaydedilir.
+    """
+    cap = open_video(cfg.source)
+    first = max(1, start - overlap)
+    if first > 1:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first - 1)
+
+    detector = build_frame_detector(cfg)
+    tracker = build_tracker(cfg.tracker)
+    scale = 0.5 if cfg.half_res else 1.0
+    cache = open_detection_cache(cfg, scale)
+
+    rows: List[np.ndarray] = []
+    new_dets: List[Tuple[int, np.ndarray, float]] = []
+    try:
+        # Tespit fazı global kare numarasına bağlı; seri çalıştırmayla aynı kareler seçilir.
+        # Tespit edilmeyen kareler çözülmez (grab), sadece iz tahmini ilerletilir.
+        skip = max(1, cfg.frame_skip)
+        frames = ((first + off - 1, f) for off, f in grab_frames(cap, lambda off: (first + off - 1) % skip == 0))
+        frames = itertools.takewhile(lambda item: item[0] < end, frames)
+        for chunk in _detection_chunks(frames, None, max(1, cfg.batch)):
+            det_frames = [(fid, f) for fid, f, do_detect in chunk if do_detect]
+            fresh = [fid for fid, _ in det_frames if cache is None or fid not in cache]
+            chunk_dets = _run_detector(detector, det_frames, scale, cache) if det_frames else {}
+            if cache is not None:
+                new_dets.extend((fid, chunk_dets[fid], cache.det_ms(fid)) for fid in fresh)
+            for frame_id, _, _ in chunk:
+                if frame_id in chunk_dets:
+                    tracks = tracker.update_array(chunk_dets[frame_id])
+                else:
+                    tracks = tracker.predict_array()
+                if len(tracks):
+                    rows.append(np.column_stack([np.full(len(tracks), frame_id), tracks]))
+    finally:
+        cap.release()
+
+    tracks = np.concatenate(rows) if rows else np.empty((0, 7))
+    return {
+        "start": start,
+        "end": end,
+        "rows": tracks[:, :6].astype(np.int64),
+        "scores": tracks[:, 6].astype(np.float32),
+        "new_dets": new_dets,
+    }
+
+
+def stitch_segments(results: List[Dict], iou_threshold: float = 0.3) -> List[Dict[int, int]]:
+    """Segmentlerin yerel iz ID'lerini global ID'lere eşle.
+
+    Ardışık segmentlerin ortak işlediği karelerde IoU >= eşik olan iz çiftleri oy toplar;
+    oylar üzerinde birebir (Hungarian) eşleme yapılır, eşleşmeyen izler yeni ID alır.
+    Sonuç: her segment için {yerel_id: global_id}.
+    """
+    next_id = 1
+    mappings: List[Dict[int, int]] = []
+    prev_rows = None
+    prev_map: Dict[int, int] = {}
+    for res in results:
+        rows = res["rows"]
+        mapping: Dict[int, int] = {}
+        if prev_rows is not None and len(rows) and len(prev_rows):
+            ov = rows[rows[:, 0] < res["start"]]
+            votes: Dict[Tuple[int, int], int] = {}
+            for f in np.unique(ov[:, 0]):
+                cur = ov[ov[:, 0] == f]
+                prv = prev_rows[prev_rows[:, 0] == f]
+                if not len(prv):
+                    continue
+                iou = iou_matrix(cur[:, 2:6], prv[:, 2:6])
+                for i, j in zip(*np.nonzero(iou >= iou_threshold)):
+                    key = (int(cur[i, 1]), int(prv[j, 1]))
+                    votes[key] = votes.get(key, 0) + 1
+            if votes:
+                cur_ids = sorted({k[0] for k in votes})
+                prv_ids = sorted({k[1] for k in votes})
+                table = np.zeros((len(cur_ids), len(prv_ids)), dtype=np.float64)
+                for (c, p), v in votes.items():
+                    table[cur_ids.index(c), prv_ids.index(p)] = v
+                for i, j in zip(*linear_sum_assignment(-table)):
+                    if table[i, j] > 0:
+                        mapping[cur_ids[i]] = prev_map[prv_ids[j]]
+
+        # Eşleşmeyenlere ilk görünme sırasına göre yeni global ID ver
+        own = rows[rows[:, 0] >= res["start"]] if len(rows) else rows
+        for local_id in dict.fromkeys(int(t) for t in own[:, 1]):
+            if local_id not in mapping:
+                mapping[local_id] = next_id
+                next_id += 1
+        mappings.append(mapping)
+        prev_rows = own
+        prev_map = mapping
+    return mappings
+
+
+def process_video_parallel(cfg: PipelineConfig):
+    """Videoyu kare aralıklarına bölüp her aralığı ayrı süreçte işler, sonuçları birleştirir.
+
+    Her süreç kendi dedektör ve takipçisini kullanır. İz ID'leri segment sınırlarında
+    IoU ile birleştirilir, ısı haritası birleşik izlerden kurulur, metrik satırları kare sırasıyla yazılır.
+    Annotasyonlu video istenirse birleşik izlerle ikinci bir (tespitsiz) geçişte üretilir.
+    """
+    from .pipeline import process_video
+
+    # İz durumuna ya da kare sırasına bağlı modlar segmentlere bölünemez
+    serial_only = [name for name, on in SERIAL_ONLY.items() if on(cfg)]
+    if serial_only:
+        logger.warning(f"{', '.join(serial_only)} çok süreçli modda desteklenmiyor; tek süreçli işleme dönülüyor.")
+        return process_video(dataclasses.replace(cfg, workers=1))
+    if cfg.profile_frames:
+        logger.warning("profile_frames çok süreçli modda kullanılmaz (profil üretilmez); tek süreçli çalıştırın.")
+
+    logger.info(f"Kaynak: {cfg.source}")
+    cap = open_video(cfg.source)
+    w, h, fps_in, total_frames = get_props(cap)
+    cap.release()
+    if total_frames <= 0:
+        logger.warning("Kare sayısı bilinmiyor; tek süreçli işleme dönülüyor.")
+        return process_video(dataclasses.replace(cfg, workers=1))
+
+    segments = split_segments(total_frames, cfg.workers)
+    overlap = max(MIN_OVERLAP, 3 * max(1, cfg.frame_skip))
+    logger.info(f"Video boyutu: {w}x{h} @ {fps_in:.1f} FPS, toplam {total_frames}; {len(segments)} segment, {cfg.workers} süreç")
+
+    # Önbellek (ve kaynak özeti) süreçlerden önce açılır: süreçler yalnızca okur
+    cache = open_detection_cache(cfg, 0.5 if cfg.half_res else 1.0)
+    t0 = time.time()
+    # OpenCV iş parçacıklarıyla fork güvenli olmadığından spawn kullanılır
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=cfg.workers, mp_context=ctx) as pool:
+        futures = [pool.submit(_process_segment, cfg, s, e, overlap, w, h) for s, e in segments]
+        results = [f.result() for f in futures]
+    logger.info(f"Segmentler {time.time() - t0:.1f} sn'de işlendi, sonuçlar birleştiriliyor.")
+    # Süreçler önbelleği yalnızca okur; yeni tespitler burada tek yazıcıyla kaydedilir
+    if cache is not None:
+        for res in results:
+            for fid, dets, det_ms in res["new_dets"]:
+                cache.put(fid, dets, det_ms / 1000.0)
+        cache.save()
+
+    mappings = stitch_segments(results)
+
+    # Kare bazında global izler: (M,6) `TRACK_COLS` dizileri
+    per_frame: Dict[int, np.ndarray] = {}
+    for res, mapping in zip(results, mappings):
+        rows, scores = res["rows"], res["scores"]
+        keep = rows[:, 0] >= res["start"]
+        rows, scores = rows[keep], scores[keep]
+        if not len(rows):
+            continue
+        gids = np.asarray([mapping[int(t)] for t in rows[:, 1]], dtype=np.float64)
+        tracks = np.column_stack([gids, rows[:, 2:6], scores])
+        # Satırlar kare sırasında; her kare tek dilim olarak alınır
+        fids, starts = np.unique(rows[:, 0], return_index=True)
+        for fid, part in zip(fids.tolist(), np.split(tracks, starts[1:])):
+            per_frame[fid] = part
+    no_tracks = np.empty((0, 6))
+
+    for path in (cfg.output_metrics_json, cfg.output_metrics_csv, cfg.output_heatmap, cfg.output_video, cfg.output_rollup):
+        if path and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Metrikler: zaman damgası video zamanıdır (frame_id / fps)
+    metrics = MetricsLogger(
+        cfg.output_metrics_json,
+        cfg.output_metrics_csv,
+        columnar_path=cfg.output_metrics_columnar,
+        flush_every=cfg.metrics_flush_every,
+    )
+    rollup = MetricsRollup(cfg.output_rollup, cfg.rollup_buckets, fps=fps_in) if cfg.output_rollup else None
+    # Rollup olayları birleşik ID'lerden türetilir: doğum ilk, ölüm son görüldüğü kare
+    first_seen: Dict[int, int] = {}
+    last_seen: Dict[int, int] = {}
+    for frame_id, tracks in per_frame.items():
+        for tid in tracks[:, 0].astype(np.int64).tolist():
+            first_seen[tid] = min(first_seen.get(tid, frame_id), frame_id)
+            last_seen[tid] = max(last_seen.get(tid, frame_id), frame_id)
+    deaths: Dict[int, List[int]] = {}
+    for tid, fid in last_seen.items():
+        deaths.setdefault(fid, []).append(tid)
+    # Isı haritası birleşik izlerden kare sırasıyla yeniden kurulur; zaman kipleri ve anlık görüntüler seri çalıştırmayla aynıdır
+    heatmap = build_heatmap(cfg, h, w) if cfg.heatmap else None
+    snapshots = HeatmapSnapshots(cfg.heatmap_snapshot_dir, cfg.heatmap_snapshot_every) if heatmap is not None and cfg.heatmap_snapshot_dir else None
+    seen = set()
+    totals: Dict[int, int] = {}
+    try:
+        for frame_id in range(1, segments[-1][1]):
+            tracks = per_frame.get(frame_id, no_tracks)
+            ids = tracks[:, 0].astype(np.int64).tolist()
+            seen.update(ids)
+            totals[frame_id] = len(seen)
+            metrics.log(frame_id / fps_in, frame_id, active_count=len(tracks), total_ids=len(seen))
+            if heatmap is not None:
+                heatmap.add_bboxes(tracks[:, 1:5], t=frame_id / fps_in)
+                if snapshots is not None:
+                    snapshots.maybe_write(heatmap, frame_id / fps_in)
+            if rollup is not None:
+                events = [("birth", tid, 0) for tid in ids if first_seen[tid] == frame_id]
+                events += [("death", tid, frame_id - first_seen[tid] + 1) for tid in deaths.get(frame_id, [])]
+                rollup.update(frame_id / fps_in, len(tracks), events)
+    finally:
+        metrics.close()
+        if rollup is not None:
+            rollup.close()
+
+    if heatmap is not None and cfg.output_heatmap:
+        cv2.imwrite(cfg.output_heatmap, heatmap.to_color())
+    if heatmap is not None and cfg.output_heatmap_raw:
+        heatmap.save_raw(cfg.output_heatmap_raw)
+
+    if cfg.output_video or cfg.output_clips_dir:
+        cap = open_video(cfg.source)
+        write_out = open_output_writer(cfg, fps_in, w, h) if cfg.output_video else None
+        clips = None
+        if cfg.output_clips_dir:
+            clips = EventClipWriter(
+                cfg.output_clips_dir,
+                fps_in,
+                lambda path: open_output_writer(cfg, fps_in, w, h, path=path),
+                pre_roll_s=cfg.clip_pre_roll,
+                post_roll_s=cfg.clip_post_roll,
+            )
+        fpsm = FPSMeter()
+        try:
+            for frame_id, frame in read_frames(cap):
+                tracks = per_frame.get(frame_id, no_tracks)
+                annotate_frame(frame, tracks, cfg, fps=fpsm.tick(), total_count=totals.get(frame_id, len(seen)))
+                if write_out is not None:
+                    write_out.write(frame)
+                if clips is not None:
+                    clips.push(frame_id, frame, len(tracks))
+        finally:
+            cap.release()
+            if write_out is not None:
+                write_out.release()
+            if clips is not None:
+                clips.close()
+
+    logger.info(f"Toplam {len(seen)} ID, {time.time() - t0:.1f} sn.")
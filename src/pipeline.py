@@ -1,46 +1,61 @@
 from __future__ import annotations
-from typing import Dict, Tuple, List
-from dataclasses import dataclass
+from typing import Callable, Dict, Tuple, List
+from dataclasses import dataclass, field
+import dataclasses
 from loguru import logger
 import time
 import os
 import yaml
 import cv2
+import numpy as np
 
-from .detectors.base import BaseFaceDetector, Detection
-from .detectors.retinaface import RetinaFaceDetector
-from .detectors.mtcnn import MTCNNDetector
-from .trackers.base import BaseTracker, Track
-from .trackers.ocsort import OCSORTTracker
-from .trackers.deepsort import DeepSORTTracker
-from .utils.video_io import open_video, get_props, open_writer
+from .detectors.base import BaseFaceDetector
+from .detectors.roi import ROIDetector
+from .detectors.tiled import TiledDetector
+from .trackers.base import BaseTracker
+from . import registry
+from .utils.video_io import (
+    open_video,
+    get_props,
+    open_writer,
+    read_frames,
+    grab_frames,
+    sample_frames,
+    ThreadedReader,
+    ThreadedWriter,
+)
 from .utils.fps import FPSMeter
 from .utils.draw import overlay_tracks
-from .utils.heatmap import HeatmapAccumulator
-from .utils.privacy import gaussian_blur_face
+from .utils.heatmap import HeatmapAccumulator, HeatmapSnapshots
+from .utils.privacy import anonymize
 from .utils.metrics import MetricsLogger
+from .utils.adaptive import AdaptiveController
+from .utils.motion import MotionGate
+from .utils.det_cache import DetectionCache
+from .utils.rollup import MetricsRollup
+from .utils.clips import EventClipWriter
+from .utils.profiling import FrameProfiler, StageTimers, parse_frame_range, record_durations, with_durations
+
+
+# process_video'nun ölçtüğü aşamalar ("frame": iki kare arası toplam süre)
+STAGES = ("decode", "detect", "track", "heatmap", "blur", "overlay", "encode", "metrics", "frame")
 
 
 def build_detector(name: str, score_threshold: float, min_face: int) -> BaseFaceDetector:
-    name = name.lower()
-    if name == "retinaface":
-        return RetinaFaceDetector(score_threshold=score_threshold, min_face=min_face)
-    elif name == "mtcnn":
-        return MTCNNDetector(score_threshold=score_threshold, min_face=min_face)
-    else:
-        logger.warning(f"Bilinmeyen dedektör '{name}', RetinaFace fallback kullanılacak.")
-        return RetinaFaceDetector(score_threshold=score_threshold, min_face=min_face)
+    """Dedektörü kayıt defterinden ada göre oluştur; yalnızca seçilen arka ucun modülü içe aktarılır."""
+    factory = registry.resolve("detector", name)
+    if factory is None:
+        logger.warning(f"Bilinmeyen dedektör '{name}', RetinaFace fallback kullanılacak. Kayıtlı: {registry.available('detector')}")
+        factory = registry.resolve("detector", "retinaface")
+    return factory(score_threshold=score_threshold, min_face=min_face)
 
 
 def build_tracker(name: str) -> BaseTracker:
-    name = name.lower()
-    if name == "ocsort":
-        return OCSORTTracker()
-    elif name == "deepsort":
-        return DeepSORTTracker()
-    else:
-        logger.warning(f"Bilinmeyen takipçi '{name}', OC-SORT fallback kullanılacak.")
-        return OCSORTTracker()
+    factory = registry.resolve("tracker", name)
+    if factory is None:
+        logger.warning(f"Bilinmeyen takipçi '{name}', OC-SORT fallback kullanılacak. Kayıtlı: {registry.available('tracker')}")
+        factory = registry.resolve("tracker", "ocsort")
+    return factory()
 
 
 @dataclass
@@ -60,6 +75,74 @@ class PipelineConfig:
     heatmap: bool
     frame_skip: int
     half_res: bool
+    # Okuma / tespit / yazma aşamalarını ayrı iş parçacıklarında çalıştır
+    threaded: bool = False
+    queue_size: int = 8
+    # >1 ise video kare aralıklarına bölünüp süreç havuzunda işlenir
+    workers: int = 1
+    # Tek dedektör çağrısında işlenecek tespit karesi sayısı
+    batch: int = 1
+    # Sadece iz tahminleri çevresini tara; her roi_rescan tespitte bir tam kare
+    roi_detect: bool = False
+    roi_rescan: int = 10
+    roi_pad: float = 0.5
+    # >0 ise frame_skip ve işleme ölçeği bu FPS'i tutturacak şekilde çalışırken ayarlanır
+    target_fps: float = 0.0
+    adapt_max_skip: int = 6
+    adapt_min_scale: float = 0.5
+    adapt_hysteresis: float = 0.15
+    # Statik karelerde dedektörü atla, önceki tespitleri yeniden kullan
+    motion_gate: bool = False
+    motion_threshold: float = 0.005
+    motion_max_static: int = 0
+    # Örtüşen karolarda tespit + nms_threshold ile NMS (yüksek çözünürlükte küçük yüzler için)
+    tile: bool = False
+    tile_size: int = 640
+    tile_overlap: float = 0.2
+    # Tespit önbelleği: aynı kaynak + tespit ayarlarıyla tekrar çalıştırmalarda dedektör atlanır
+    det_cache_dir: str | None = None
+    detections_only: bool = False
+    # Sütunsal metrik çıktısı (.parquet ya da .npy parça klasörü) ve diske boşaltma aralığı
+    output_metrics_columnar: str | None = None
+    metrics_flush_every: int = 100
+    # Zaman kovası özetleri (<önek>_1s.csv, <önek>_60s.csv, <önek>_dwell.csv)
+    output_rollup: str | None = None
+    rollup_buckets: List[float] = field(default_factory=lambda: [1.0, 60.0])
+    # Isı haritası biriktirme ızgarasının adımı (piksel); bellek stride² kat azalır
+    heatmap_stride: int = 4
+    # Video yazıcı: cv2 (mp4v) | ffmpeg | auto (ffmpeg varsa); ffmpeg'de codec/preset/thread/crf
+    video_backend: str = "auto"
+    video_codec: str = "libx264"
+    video_preset: str = "veryfast"
+    video_threads: int = 0
+    video_crf: int = 23
+    # Çıktı videosu ölçeği (ör. 0.5 = yarı çözünürlük)
+    video_scale: float = 1.0
+    # Olay klipleri: sadece aktif iz olan aralıklar (ön/son pay ile) ayrı kliplere + index.json
+    output_clips_dir: str | None = None
+    clip_pre_roll: float = 2.0
+    clip_post_roll: float = 2.0
+    # >0 ise sadece bu hızda örneklenen kareler okunur ve işlenir (seek/grab; sadece metrik işleri için)
+    sample_fps: float = 0.0
+    # Anonimleştirme: gaussian | fast_blur | pixelate | fill (blur_level şiddeti belirler)
+    blur_mode: str = "gaussian"
+    # Zaman kipi: cumulative | window (son heatmap_window_s sn) | decay (yarı ömür heatmap_half_life_s)
+    heatmap_mode: str = "cumulative"
+    heatmap_window_s: float = 900.0
+    heatmap_interval_s: float = 60.0
+    heatmap_half_life_s: float = 300.0
+    # Çalışma sırasında her heatmap_snapshot_every sn'de PNG + ham .npy anlık görüntü
+    heatmap_snapshot_dir: str | None = None
+    heatmap_snapshot_every: float = 60.0
+    # Birleştirilebilir ham ısı haritası (.npy + .json üst verisi); `merge-heatmaps` ile toplanır
+    output_heatmap_raw: str | None = None
+    # Aşama gecikme histogramları (decode/detect/track/...); >0 ise her N karede pencere özeti olay olarak yazılır
+    stage_timing: bool = True
+    stage_report_every: int = 0
+    # Verilen kare aralığında (ör. "100-300") profil: cprofile (.prof) | sample (.folded yığın örnekleri)
+    profile_frames: str | None = None
+    profile_mode: str = "cprofile"
+    profile_out: str = "data/outputs/profile"
 
 
 def load_config(path: str) -> PipelineConfig:
@@ -67,6 +150,7 @@ def load_config(path: str) -> PipelineConfig:
         y = yaml.safe_load(f)
     v = y.get("video", {})
     p = y.get("processing", {})
+    r = y.get("runtime", {}) or {}
     return PipelineConfig(
         source=v.get("source"),
         output_video=v.get("output_video"),
@@ -80,13 +164,242 @@ def load_config(path: str) -> PipelineConfig:
         min_face_size=int(p.get("min_face_size", 24)),
         blur=bool(p.get("blur", False)),
         blur_level=int(p.get("blur_level", 15)),
+        blur_mode=str(p.get("blur_mode", "gaussian")),
+        sample_fps=float(p.get("sample_fps", 0.0)),
+        output_clips_dir=v.get("output_clips_dir"),
+        clip_pre_roll=float(v.get("clip_pre_roll", 2.0)),
+        clip_post_roll=float(v.get("clip_post_roll", 2.0)),
+        video_backend=str(v.get("writer_backend", "auto")),
+        video_codec=str(v.get("writer_codec", "libx264")),
+        video_preset=str(v.get("writer_preset", "veryfast")),
+        video_threads=int(v.get("writer_threads", 0)),
+        video_crf=int(v.get("writer_crf", 23)),
+        video_scale=float(v.get("writer_scale", 1.0)),
         heatmap=bool(p.get("heatmap", True)),
         frame_skip=int(p.get("frame_skip", 1)),
         half_res=bool(p.get("half_res", False)),
+        threaded=bool(r.get("threaded", False)),
+        queue_size=int(r.get("queue_size", 8)),
+        workers=int(r.get("workers", 1)),
+        batch=int(r.get("batch", 1)),
+        roi_detect=bool(p.get("roi_detect", False)),
+        roi_rescan=int(p.get("roi_rescan", 10)),
+        roi_pad=float(p.get("roi_pad", 0.5)),
+        target_fps=float(p.get("target_fps", 0.0)),
+        adapt_max_skip=int(p.get("adapt_max_skip", 6)),
+        adapt_min_scale=float(p.get("adapt_min_scale", 0.5)),
+        adapt_hysteresis=float(p.get("adapt_hysteresis", 0.15)),
+        motion_gate=bool(p.get("motion_gate", False)),
+        motion_threshold=float(p.get("motion_threshold", 0.005)),
+        motion_max_static=int(p.get("motion_max_static", 0)),
+        tile=bool(p.get("tile", False)),
+        tile_size=int(p.get("tile_size", 640)),
+        tile_overlap=float(p.get("tile_overlap", 0.2)),
+        det_cache_dir=r.get("det_cache_dir"),
+        output_metrics_columnar=v.get("output_metrics_columnar"),
+        metrics_flush_every=int(y.get("logging", {}).get("metrics_flush_every", 100)),
+        heatmap_stride=int(p.get("heatmap_stride", 4)),
+        heatmap_mode=str(p.get("heatmap_mode", "cumulative")),
+        heatmap_window_s=float(p.get("heatmap_window_s", 900.0)),
+        heatmap_interval_s=float(p.get("heatmap_interval_s", 60.0)),
+        heatmap_half_life_s=float(p.get("heatmap_half_life_s", 300.0)),
+        heatmap_snapshot_dir=v.get("heatmap_snapshot_dir"),
+        output_heatmap_raw=v.get("output_heatmap_raw"),
+        heatmap_snapshot_every=float(p.get("heatmap_snapshot_every", 60.0)),
+        output_rollup=v.get("output_rollup"),
+        rollup_buckets=[float(b) for b in y.get("logging", {}).get("rollup_buckets", [1.0, 60.0])],
+        stage_timing=bool(y.get("logging", {}).get("stage_timing", True)),
+        stage_report_every=int(y.get("logging", {}).get("stage_report_every", 0)),
+        profile_frames=y.get("logging", {}).get("profile_frames"),
+        profile_mode=str(y.get("logging", {}).get("profile_mode", "cprofile")),
+        profile_out=str(y.get("logging", {}).get("profile_out", "data/outputs/profile")),
+    )
+
+
+def rescale_detections(dets: np.ndarray, scale: float) -> np.ndarray:
+    """(N,5) tespitleri işleme ölçeğinden orijinal kare koordinatlarına taşı (tek vektör bölme, tamsayıya kırpılır)."""
+    if scale == 1.0 or not len(dets):
+        return dets
+    out = dets.copy()
+    out[:, :4] = np.trunc(dets[:, :4].astype(np.float64) / scale)
+    return out
+
+
+def _resize(frame, scale: float):
+    if scale == 1.0:
+        return frame
+    h, w = frame.shape[:2]
+    return cv2.resize(frame, (int(w * scale), int(h * scale)))
+
+
+def annotate_frame(frame, tracks: np.ndarray, cfg: PipelineConfig, fps: float, total_count: int, timers: StageTimers | None = None):
+    """Kareye (yerinde) bulanıklaştırma ve overlay uygula; `tracks` (M,6) `TRACK_COLS` dizisi."""
+    t = time.perf_counter()
+    # Bulanıklaştırma
+    if cfg.blur and len(tracks):
+        anonymize(frame, tracks[:, 1:5], mode=cfg.blur_mode, level=max(3, cfg.blur_level))
+        if timers is not None:
+            t = timers.lap("blur", t)
+
+    # Overlay çiz
+    overlay_tracks(
+        frame,
+        tracks,
+        fps=fps,
+        active_count=len(tracks),
+        total_count=total_count,
     )
+    if timers is not None:
+        timers.lap("overlay", t)
+
+
+def open_output_writer(cfg: PipelineConfig, fps: float, width: int, height: int, path: str | None = None):
+    """Çıktı videosu yazıcısı (varsayılan yol `cfg.output_video`). ffmpeg hattı (ya da threaded mod) sınırlı
+    kuyruklu ayrı iş parçacığından beslenir, böylece kodlayıcı tespit döngüsünü bekletmez."""
+    path = path or cfg.output_video
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    writer = open_writer(
+        path,
+        fps,
+        width,
+        height,
+        backend=cfg.video_backend,
+        codec=cfg.video_codec,
+        preset=cfg.video_preset,
+        threads=cfg.video_threads,
+        crf=cfg.video_crf,
+        scale=cfg.video_scale,
+    )
+    if cfg.threaded or not isinstance(writer, cv2.VideoWriter):
+        writer = ThreadedWriter(writer, maxsize=cfg.queue_size)
+    return writer
+
+
+def build_heatmap(cfg: PipelineConfig, height: int, width: int) -> HeatmapAccumulator:
+    return HeatmapAccumulator(
+        height,
+        width,
+        sigma=8.0,
+        stride=cfg.heatmap_stride,
+        mode=cfg.heatmap_mode,
+        window_s=cfg.heatmap_window_s,
+        interval_s=cfg.heatmap_interval_s,
+        half_life_s=cfg.heatmap_half_life_s,
+    )
+
+
+def _detection_chunks(frames, is_detect: Callable[[int], bool] | None, batch: int):
+    """Kareleri, her biri en fazla `batch` tespit karesi içeren sıralı parçalara böl.
+
+    Parça öğeleri (frame_id, frame, do_detect) üçlüleridir. `is_detect` None ise kare
+    kaynağı kararı zaten vermiştir (`grab_frames`): çözülmüş kareler tespit edilir.
+    """
+    chunk = []
+    n_det = 0
+    for frame_id, frame in frames:
+        do_detect = frame is not None if is_detect is None else is_detect(frame_id)
+        chunk.append((frame_id, frame, do_detect))
+        if do_detect:
+            n_det += 1
+            if n_det >= batch:
+                yield chunk
+                chunk = []
+                n_det = 0
+    if chunk:
+        yield chunk
+
+
+def _run_detector(detector: BaseFaceDetector, det_frames, scale: float, cache: DetectionCache | None = None):
+    """Tespit karelerini işle: önbellekte olanlar okunur, kalanlar tek `detect_batch_array` çağrısında tespit edilir."""
+    out: Dict[int, np.ndarray] = {}
+    todo = []
+    for fid, f in det_frames:
+        cached = cache.get_array(fid) if cache is not None else None
+        if cached is not None:
+            out[fid] = cached
+        else:
+            todo.append((fid, f))
+    if todo:
+        t = time.perf_counter()
+        procs = [_resize(f, scale) for _, f in todo]
+        results = detector.detect_batch_array(procs) if len(procs) > 1 else [detector.detect_array(procs[0])]
+        per_frame = (time.perf_counter() - t) / len(todo)
+        for (fid, _), dets in zip(todo, results):
+            out[fid] = rescale_detections(dets, scale)
+            if cache is not None:
+                cache.put(fid, out[fid], per_frame)
+    return out
+
+
+def open_detection_cache(cfg: PipelineConfig, scale: float) -> DetectionCache | None:
+    """Ayarlar tespit sonucunu kareden bağımsız kılıyorsa önbelleği aç."""
+    if not cfg.det_cache_dir:
+        return None
+    if cfg.roi_detect or cfg.target_fps > 0:
+        logger.warning("Tespit önbelleği ROI / hedef FPS modlarıyla kullanılamaz (sonuç iz durumuna bağlı); kapatıldı.")
+        return None
+    if not os.path.isfile(cfg.source):
+        logger.warning(f"Tespit önbelleği yalnızca dosya kaynaklarıyla kullanılır (içerik özeti gerekir): {cfg.source}; kapatıldı.")
+        return None
+    params = {
+        "detector": cfg.detector.lower(),
+        "score_threshold": cfg.score_threshold,
+        "min_face_size": cfg.min_face_size,
+        "scale": scale,
+    }
+    if cfg.tile:
+        params.update(tile_size=cfg.tile_size, tile_overlap=cfg.tile_overlap, nms_threshold=cfg.nms_threshold)
+    cache = DetectionCache(cfg.det_cache_dir, cfg.source, params)
+    logger.info(f"Tespit önbelleği: {cache.path} ({len(cache)} kare kayıtlı)")
+    return cache
+
+
+def build_frame_detector(cfg: PipelineConfig) -> BaseFaceDetector:
+    """Config'e göre dedektörü (gerekirse karo sarmalayıcısıyla) oluştur."""
+    detector = build_detector(cfg.detector, cfg.score_threshold, cfg.min_face_size)
+    if cfg.tile:
+        detector = TiledDetector(detector, tile_size=cfg.tile_size, overlap=cfg.tile_overlap, nms_threshold=cfg.nms_threshold)
+    return detector
+
+
+def check_detections_only(cfg: PipelineConfig) -> None:
+    """`detections_only` ayarlarını doğrula (kullanıcı hatası: ValueError); CLI bunu işten önce çağırır."""
+    if not cfg.det_cache_dir:
+        raise ValueError("detections_only için det_cache_dir gerekli")
+    if not os.path.isfile(cfg.source):
+        raise ValueError(f"detections_only yalnızca video dosyalarıyla çalışır (akış/kamera önbelleğe alınamaz): {cfg.source}")
+
+
+def fill_detection_cache(cfg: PipelineConfig) -> int:
+    """Sadece çözme + tespit: sonuçları önbelleğe yazar; takip/çıktı üretilmez. Yeni tespit edilen kare sayısını döndürür."""
+    check_detections_only(cfg)
+    cap = open_video(cfg.source)
+    scale = 0.5 if cfg.half_res else 1.0
+    cache = open_detection_cache(dataclasses.replace(cfg, roi_detect=False, target_fps=0.0), scale)
+    detector = build_frame_detector(cfg)
+    skip = max(1, cfg.frame_skip)
+    before = len(cache)
+    t0 = time.time()
+    try:
+        for chunk in _detection_chunks(grab_frames(cap, lambda fid: fid % skip == 0), None, max(1, cfg.batch)):
+            _run_detector(detector, [(fid, f) for fid, f, do_detect in chunk if do_detect], scale, cache)
+    finally:
+        cap.release()
+        cache.save()
+    added = len(cache) - before
+    logger.info(f"Tespit önbelleği dolduruldu: {added} yeni kare, toplam {len(cache)} ({time.time() - t0:.1f} sn)")
+    return added
 
 
 def process_video(cfg: PipelineConfig):
+    if cfg.detections_only:
+        return fill_detection_cache(cfg)
+    if cfg.workers > 1:
+        from .parallel import process_video_parallel
+
+        return process_video_parallel(cfg)
+
     logger.info(f"Kaynak: {cfg.source}")
     cap = open_video(cfg.source)
     w, h, fps_in, total_frames = get_props(cap)
@@ -94,99 +407,227 @@ def process_video(cfg: PipelineConfig):
 
     write_out = None
     if cfg.output_video:
-        os.makedirs(os.path.dirname(cfg.output_video), exist_ok=True)
-        write_out = open_writer(cfg.output_video, fps_in, w, h)
+        write_out = open_output_writer(cfg, fps_in, w, h)
+    clips = None
+    if cfg.output_clips_dir:
+        clips = EventClipWriter(
+            cfg.output_clips_dir,
+            fps_in,
+            lambda path: open_output_writer(cfg, fps_in, w, h, path=path),
+            pre_roll_s=cfg.clip_pre_roll,
+            post_roll_s=cfg.clip_post_roll,
+        )
 
-    metrics = MetricsLogger(cfg.output_metrics_json, cfg.output_metrics_csv)
     if cfg.output_metrics_json:
         os.makedirs(os.path.dirname(cfg.output_metrics_json), exist_ok=True)
     if cfg.output_metrics_csv:
         os.makedirs(os.path.dirname(cfg.output_metrics_csv), exist_ok=True)
+    gate = MotionGate(cfg.motion_threshold, max_static=cfg.motion_max_static) if cfg.motion_gate else None
+    metrics = MetricsLogger(
+        cfg.output_metrics_json,
+        cfg.output_metrics_csv,
+        extra_fields=["gate", "det_saved"] if gate is not None else None,
+        columnar_path=cfg.output_metrics_columnar,
+        flush_every=cfg.metrics_flush_every,
+    )
+    rollup = None
+    if cfg.output_rollup:
+        os.makedirs(os.path.dirname(cfg.output_rollup) or ".", exist_ok=True)
+        rollup = MetricsRollup(cfg.output_rollup, cfg.rollup_buckets, fps=fps_in)
 
-    detector = build_detector(cfg.detector, cfg.score_threshold, cfg.min_face_size)
+    detector = build_frame_detector(cfg)
     tracker = build_tracker(cfg.tracker)
+    roi = None
+    if cfg.roi_detect:
+        roi = detector = ROIDetector(detector, rescan_every=cfg.roi_rescan, pad=cfg.roi_pad)
 
     heatmap = None
+    snapshots = None
     if cfg.heatmap:
         out_h, out_w = h, w
-        heatmap = HeatmapAccumulator(out_h, out_w, sigma=8.0)
+        heatmap = build_heatmap(cfg, out_h, out_w)
         if cfg.output_heatmap:
             os.makedirs(os.path.dirname(cfg.output_heatmap), exist_ok=True)
+        if cfg.heatmap_snapshot_dir:
+            snapshots = HeatmapSnapshots(cfg.heatmap_snapshot_dir, cfg.heatmap_snapshot_every)
 
     fpsm = FPSMeter()
     total_unique_ids = set()
-    frame_id = 0
     t0 = time.time()
+    # Aşama süreleri pencere histogramlarına eklenir; stage_report_every>0 ise her raporda toplama aktarılıp sıfırlanır
+    timers = StageTimers(STAGES, enabled=cfg.stage_timing)
+    stage_totals = StageTimers(STAGES)
+    window_frames = 0  # son pencere raporundan beri işlenen kare (örneklemede kaynak karesinden az)
+    profiler = None
+    if cfg.profile_frames:
+        p_start, p_end = parse_frame_range(cfg.profile_frames)
+        profiler = FrameProfiler(cfg.profile_out, p_start, p_end, mode=cfg.profile_mode)
+
+    skip = max(1, cfg.frame_skip)
+    base_scale = 0.5 if cfg.half_res else 1.0
+    cache = open_detection_cache(cfg, base_scale)
+    last_fid = 0
+    last_dets = np.empty((0, 5), dtype=np.float32)
+
+    adapt = None
+    is_detect: Callable[[int], bool] = lambda fid: fid % skip == 0
+    if cfg.target_fps > 0 and cfg.sample_fps <= 0:
+        adapt = AdaptiveController(
+            cfg.target_fps,
+            frame_skip=skip,
+            scale=base_scale,
+            max_skip=cfg.adapt_max_skip,
+            min_scale=cfg.adapt_min_scale,
+            hysteresis=cfg.adapt_hysteresis,
+        )
+        is_detect = adapt.should_detect
+
+    # Kare kaynağı: örnekleme modunda sadece örneklenen kareler okunur (her biri tespit edilir);
+    # çıktı videosu yoksa tespit edilmeyecek kareler yalnızca grab() ile geçilir (çözülmez)
+    sample_step = 1
+    needs_all_frames = write_out is not None or clips is not None
+    if cfg.sample_fps > 0 and needs_all_frames:
+        logger.warning("sample_fps sadece video çıktısı olmayan işlerde kullanılır; tüm kareler işlenecek.")
+    if cfg.sample_fps > 0 and not needs_all_frames:
+        sample_step = max(1, int(round(fps_in / cfg.sample_fps)))
+        frames = sample_frames(cap, sample_step)
+        is_detect = lambda fid: True
+        # Takipçi her örnekte `sample_step` kare ilerler: uzak eşleme ve kalma süreleri buna göre
+        tracker.set_frame_step(sample_step)
+        logger.info(f"Örnekleme: her {sample_step} karede bir (~{fps_in / sample_step:.2f} FPS)")
+    elif not needs_all_frames:
+        frames = grab_frames(cap, is_detect)
+        is_detect = None
+    else:
+        frames = read_frames(cap)
+    # Çözme süresi kareyi üreten iş parçacığında ölçülüp kareyle taşınır, ana iş parçacığında kaydedilir
+    if timers.enabled:
+        frames = with_durations(frames)
+    # Threaded modda çözme ayrı iş parçacığında, sınırlı kuyrukla ilerler
+    reader = ThreadedReader(frames, maxsize=cfg.queue_size) if cfg.threaded else None
+    if reader is not None:
+        frames = reader
+    if timers.enabled:
+        frames = record_durations(frames, timers, "decode")
 
     try:
-        while True:
-            ok, frame = cap.read()
-            if not ok:
-                break
-            frame_id += 1
-
-            proc_frame = frame
-            scale = 1.0
-            if cfg.half_res:
-                proc_frame = cv2.resize(frame, (w // 2, h // 2))
-                scale = 0.5
-
-            # Frame skipping: sadece her N. karede tespit yap, diğerlerinde önceki sonuçları kullanma yerine basit tekrar takip uygulanır.
-            do_detect = (frame_id % max(1, cfg.frame_skip) == 0)
-
-            detections: List[Detection] = []
-            if do_detect:
-                detections = detector.detect(proc_frame)
-
-            det_xyxys: List[Tuple[int, int, int, int, float]] = []
-            for d in detections:
-                x1, y1, x2, y2 = d.to_xyxy()
-                if scale != 1.0:
-                    x1 = int(x1 / scale)
-                    y1 = int(y1 / scale)
-                    x2 = int(x2 / scale)
-                    y2 = int(y2 / scale)
-                det_xyxys.append((x1, y1, x2, y2, d.score))
-
-            tracks: List[Track] = tracker.update(det_xyxys)
-
-            # Isı haritası için merkezleri ekle
-            if heatmap is not None:
-                for tr in tracks:
-                    heatmap.add_bbox(tr.bbox)
-
-            # Bulanıklaştırma
-            if cfg.blur:
-                for tr in tracks:
-                    gaussian_blur_face(frame, tr.bbox, ksize=max(3, cfg.blur_level))
-
-            # Overlay çiz
-            fps = fpsm.tick()
-            for tr in tracks:
-                total_unique_ids.add(tr.track_id)
-            overlay_tracks(
-                frame,
-                [(tr.track_id, *tr.bbox, tr.score) for tr in tracks],
-                fps=fps,
-                active_count=len(tracks),
-                total_count=len(total_unique_ids),
-            )
-
-            # Çıktı yaz
-            if write_out is not None:
-                write_out.write(frame)
-
-            # Metrikler
-            now = time.time() - t0
-            metrics.log(now, frame_id, active_count=len(tracks), total_ids=len(total_unique_ids))
+        for chunk in _detection_chunks(frames, is_detect, max(1, cfg.batch)):
+            # Frame skipping: sadece her N. karede tespit yap; parçadaki tespit kareleri tek çağrıda işlenir.
+            if profiler is not None:
+                profiler.on_frame(chunk[0][0])
+            t_det = time.perf_counter()
+            scale = adapt.scale if adapt is not None else base_scale
+            det_frames = [(fid, f) for fid, f, do_detect in chunk if do_detect]
+            gated = set()
+            if gate is not None:
+                # Hareket kapısı: statik karelerde dedektör çağrılmaz
+                gated = {fid for fid, f in det_frames if not gate.should_detect(f)}
+                det_frames = [(fid, f) for fid, f in det_frames if fid not in gated]
+            chunk_dets: Dict[int, np.ndarray] = {}
+            if det_frames:
+                if roi is not None:
+                    # ROI modunda ipuçları her tespit karesi için iz tahmininden gelir
+                    for fid, f in det_frames:
+                        roi.set_hints(tracker.predicted_boxes((fid - last_fid) // sample_step) * scale)
+                        chunk_dets[fid] = rescale_detections(roi.detect_array(_resize(f, scale)), scale)
+                else:
+                    chunk_dets.update(_run_detector(detector, det_frames, scale, cache))
+                # Toplu tespit süresi tespit karelerine bölünür
+                timers.add("detect", time.perf_counter() - t_det, n=len(det_frames))
+
+            for frame_id, frame, _ in chunk:
+                if profiler is not None:
+                    profiler.on_frame(frame_id)
+                t = time.perf_counter()
+                t_video = frame_id / (fps_in or 25.0)
+                # Tespitsiz karelerde izler Kalman tahminiyle ilerletilir; statik karelerde son tespitler tekrar verilir.
+                # İzler (M,6) dizi olarak akar: (track_id, x1, y1, x2, y2, score)
+                if frame_id in chunk_dets:
+                    last_dets = chunk_dets[frame_id]
+                    tracks = tracker.update_array(last_dets)
+                elif frame_id in gated:
+                    tracks = tracker.update_array(last_dets)
+                else:
+                    tracks = tracker.predict_array()
+                total_unique_ids.update(tracks[:, 0].astype(np.int64).tolist())
+                t = timers.lap("track", t)
+
+                # Isı haritası için merkezleri ekle
+                if heatmap is not None:
+                    heatmap.add_bboxes(tracks[:, 1:5], t=t_video)
+                    if snapshots is not None:
+                        snapshots.maybe_write(heatmap, t_video)
+                    t = timers.lap("heatmap", t)
+
+                fps = fpsm.tick()
+                timers.add("frame", fpsm.dt)
+                # Çıktı yaz
+                if needs_all_frames:
+                    annotate_frame(frame, tracks, cfg, fps=fps, total_count=len(total_unique_ids), timers=timers)
+                    t = time.perf_counter()
+                if write_out is not None:
+                    write_out.write(frame)
+                if clips is not None:
+                    clips.push(frame_id, frame, len(tracks))
+                if needs_all_frames:
+                    t = timers.lap("encode", t)
+
+                # Metrikler
+                now = time.time() - t0
+                extra = {}
+                if gate is not None:
+                    gate_state = "static" if frame_id in gated else ("motion" if frame_id in chunk_dets else "")
+                    extra = {"gate": gate_state, "det_saved": gate.skipped}
+                metrics.log(now, frame_id, active_count=len(tracks), total_ids=len(total_unique_ids), **extra)
+                if rollup is not None:
+                    # Kovalar video zamanına göre; takipçinin doğum/ölüm olaylarıyla kalma süreleri çıkarılır
+                    rollup.update(t_video, len(tracks), tracker.pop_events())
+                last_fid = frame_id
+                timers.lap("metrics", t)
+                window_frames += 1
+                if cfg.stage_report_every > 0 and window_frames >= cfg.stage_report_every and timers.enabled:
+                    metrics.event(now, frame_id, "stage_latency", window_frames=window_frames, stages=timers.summary())
+                    stage_totals.merge(timers)
+                    timers.reset()
+                    window_frames = 0
+
+                # Hedef FPS modu: ayar değişiklikleri metrik olaylarına yazılır
+                if adapt is not None and adapt.observe(fpsm.dt):
+                    metrics.event(now, frame_id, "adapt", **adapt.state())
+                    logger.info(f"Uyarlama (kare {frame_id}): {adapt.state()}")
 
         # Isı haritası kaydet
         if heatmap is not None and cfg.output_heatmap:
             hm_color = heatmap.to_color()
             cv2.imwrite(cfg.output_heatmap, hm_color)
+        if heatmap is not None and cfg.output_heatmap_raw:
+            heatmap.save_raw(cfg.output_heatmap_raw)
+
+        if roi is not None:
+            logger.info(f"ROI tespiti: {roi.full_scans} tam kare, {roi.roi_scans} bölge taraması")
+
+        if gate is not None:
+            metrics.event(time.time() - t0, last_fid, "motion_gate", checks=gate.checks, detector_calls_saved=gate.skipped)
+            logger.info(f"Hareket kapısı: {gate.checks} tespit karesinin {gate.skipped} tanesinde dedektör atlandı")
+
+        if timers.enabled:
+            stage_totals.merge(timers)
+            metrics.event(time.time() - t0, last_fid, "stage_latency", final=True, stages=stage_totals.summary())
+            logger.info("Aşama gecikmeleri (ms):\n" + stage_totals.table())
 
     finally:
+        if profiler is not None:
+            profiler.close()
+        if reader is not None:
+            reader.close()
+        if cache is not None:
+            cache.save()
         metrics.close()
+        if rollup is not None:
+            rollup.close(last_fid / (fps_in or 25.0), tracker.pop_events(final=True))
+        if clips is not None:
+            clips.close()
+            logger.info(f"Olay klipleri: {len(clips.clips)} klip, {clips.frames_written}/{clips.frames_seen} kare yazıldı")
         cap.release()
         if write_out is not None:
             write_out.release()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+from importlib import import_module
+from importlib.metadata import entry_points
+from typing import Callable, Dict, List
+from loguru import logger
+
+# Ad -> fabrika. Fabrika bir çağrılabilir ya da "modül:ad" dizesidir; dize ilk kullanımda içe aktarılır,
+# böylece seçilmeyen arka uçların modülleri (ve ağır bağımlılıkları) hiç yüklenmez.
+# Dedektör fabrikaları `score_threshold=`, `min_face=` ile, takipçi fabrikaları argümansız çağrılır.
+_BUILTIN = {
+    "detector": {
+        "retinaface": ".detectors.retinaface:RetinaFaceDetector",
+        "mtcnn": ".detectors.mtcnn:MTCNNDetector",
+    },
+    "tracker": {
+        "ocsort": ".trackers.ocsort:OCSORTTracker",
+        "deepsort": ".trackers.deepsort:DeepSORTTracker",
+        "sort": ".trackers.base:SimpleSORT",
+    },
+}
+# Üçüncü taraf paketler pyproject'te şu gruplarla arka uç ekleyebilir:
+#   [project.entry-points."yuz_tanima.detectors"]  benim = "paketim.modul:BenimDedektorum"
+ENTRY_POINT_GROUPS = {"detector": "yuz_tanima.detectors", "tracker": "yuz_tanima.trackers"}
+
+_registry: Dict[str, Dict[str, object]] = {kind: dict(items) for kind, items in _BUILTIN.items()}
+_entry_points_loaded = set()
+
+
+def _load_entry_points(kind: str) -> None:
+    """Eklenti adlarını kaydet (modüller `resolve` anında yüklenir); yerleşik adlar ezilmez."""
+    if kind in _entry_points_loaded:
+        return
+    _entry_points_loaded.add(kind)
+    try:
+        eps = entry_points(group=ENTRY_POINT_GROUPS[kind])
+    except Exception as e:
+        logger.warning(f"Eklenti giriş noktaları okunamadı ({ENTRY_POINT_GROUPS[kind]}): {e}")
+        return
+    for ep in eps:
+        _registry[kind].setdefault(ep.name.lower(), ep)
+
+
+def register(kind: str, name: str, factory: Callable | str) -> None:
+    """Arka uç ekle ya da değiştir. `factory` çağrılabilir ya da "paket.modul:Sinif" dizesi olabilir."""
+    if kind not in _registry:
+        raise ValueError(f"Bilinmeyen arka uç türü: {kind}")
+    _registry[kind][name.lower()] = factory
+
+
+def register_detector(name: str, factory: Callable | str) -> None:
+    register("detector", name, factory)
+
+
+def register_tracker(name: str, factory: Callable | str) -> None:
+    register("tracker", name, factory)
+
+
+def available(kind: str) -> List[str]:
+    _load_entry_points(kind)
+    return sorted(_registry[kind])
+
+
+def resolve(kind: str, name: str) -> Callable | None:
+    """Adın fabrikasını döndür (gerekirse modülünü şimdi içe aktararak); bilinmiyorsa None."""
+    key = name.lower()
+    if key not in _registry[kind]:
+        _load_entry_points(kind)
+    factory = _registry[kind].get(key)
+    if factory is None:
+        return None
+    if isinstance(factory, str):
+        module, _, attr = factory.partition(":")
+        factory = getattr(import_module(module, package=__package__), attr)
+    elif not callable(factory):  # importlib.metadata.EntryPoint
+        factory = factory.load()
+    _registry[kind][key] = factory
+    return factory
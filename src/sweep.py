@@ -0,0 +1,245 @@
+from __future__ import annotations
+from functools import reduce
+from typing import Dict, List, Sequence, Tuple
+import csv
+import dataclasses
+import itertools
+import json
+import math
+import os
+import time
+
+import numpy as np
+from loguru import logger
+
+from .pipeline import PipelineConfig, _run_detector, build_frame_detector, build_tracker, open_detection_cache, process_video
+from .utils.det_cache import DetectionCache
+from .utils.video_io import grab_frames, open_video
+
+# Taranabilen ayarlar; tespiti değiştirenler (detector, half_res, min_face_size) ayrı tespit geçişi gerektirir
+SWEEP_KEYS = ("detector", "frame_skip", "half_res", "min_face_size", "score_threshold")
+
+
+@dataclasses.dataclass
+class SweepResult:
+    params: Dict
+    fps: float  # tahmini uçtan uca FPS (çözme + tespit + takip)
+    detect_frames: int
+    active_mae: float  # kare başına |aktif - referans| ortalaması
+    active_rel: float  # active_mae / referans ortalama aktif
+    ids_err: float  # |total_ids - referans| / referans
+    error: float  # max(active_rel, ids_err): sayım hatası bütçesiyle karşılaştırılan değer
+    total_ids: int
+    pareto: bool = False
+    measured_fps: float | None = None
+
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[Dict]:
+    """{"frame_skip": [1, 2], "half_res": [False, True]} -> 4 ayar sözlüğü."""
+    unknown = set(grid) - set(SWEEP_KEYS)
+    if unknown:
+        raise ValueError(f"Taranamayan ayar(lar): {sorted(unknown)}")
+    keys = [k for k in SWEEP_KEYS if k in grid and len(grid[k])]
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def pareto_front(results: Sequence[SweepResult]) -> None:
+    """FPS'i yüksek, hataları (active_rel, ids_err) düşük olan baskılanmamış sonuçları işaretle."""
+    for r in results:
+        r.pareto = not any(
+            o.fps >= r.fps and o.active_rel <= r.active_rel and o.ids_err <= r.ids_err
+            and (o.fps > r.fps or o.active_rel < r.active_rel or o.ids_err < r.ids_err)
+            for o in results
+        )
+
+
+def _det_key(cfg: PipelineConfig) -> Tuple:
+    return (cfg.detector.lower(), cfg.half_res, cfg.min_face_size)
+
+
+def collect_detections(cfgs: Sequence[PipelineConfig], cache_dir: str) -> Tuple[Dict[Tuple, DetectionCache], int, Dict[str, float]]:
+    """Tüm varyantların tespitlerini tek çözme geçişinde önbelleğe doldur.
+
+    Tespiti etkileyen her (dedektör, ölçek, min yüz) için bir önbellek açılır; skor eşiği sonradan
+    filtre olduğundan en düşük eşikle tespit yapılır. Yalnızca frame_skip değerlerinin ortak
+    bölenine düşen kareler çözülür. Dönüş: anahtar -> önbellek, kare sayısı ve kare başına çözme
+    maliyetleri (grab_ms, retrieve_ms).
+    """
+    groups: Dict[Tuple, List[PipelineConfig]] = {}
+    for c in cfgs:
+        groups.setdefault(_det_key(c), []).append(c)
+    caches = {}
+    for key, members in groups.items():
+        base = dataclasses.replace(members[0], score_threshold=min(c.score_threshold for c in members), det_cache_dir=cache_dir)
+        scale = 0.5 if base.half_res else 1.0
+        caches[key] = (open_detection_cache(base, scale), build_frame_detector(base), scale)
+    step = reduce(math.gcd, (max(1, c.frame_skip) for c in cfgs))
+
+    cap = open_video(cfgs[0].source)
+    grab_s = retrieve_s = 0.0
+    n_frames = n_retrieved = 0
+    t0 = time.time()
+    frames = grab_frames(cap, lambda fid: fid % step == 0)
+    try:
+        while True:
+            # grab() ve retrieve() süreleri ayrı tutulur: metrik işleri sadece tespit karelerini çözer
+            t = time.perf_counter()
+            item = next(frames, None)
+            if item is None:
+                break
+            n_frames += 1
+            if item[1] is None:
+                grab_s += time.perf_counter() - t
+                continue
+            retrieve_s += time.perf_counter() - t
+            n_retrieved += 1
+            for cache, detector, scale in caches.values():
+                _run_detector(detector, [item], scale, cache)
+    finally:
+        cap.release()
+        for cache, *_ in caches.values():
+            cache.save()
+    n_grab = n_frames - n_retrieved
+    grab_ms = grab_s / n_grab * 1000.0 if n_grab else 0.0
+    # Çözülen karede grab da yapılır; retrieve maliyeti farktan kestirilir
+    retrieve_ms = max(0.0, retrieve_s / max(1, n_retrieved) * 1000.0 - grab_ms)
+    logger.info(f"Tarama tespitleri hazır: {len(caches)} tespit ayarı, {n_frames} kare ({time.time() - t0:.1f} sn)")
+    return {k: v[0] for k, v in caches.items()}, n_frames, {"grab_ms": grab_ms, "retrieve_ms": retrieve_ms}
+
+
+def replay(cfg: PipelineConfig, cache: DetectionCache, n_frames: int) -> Tuple[np.ndarray, int, float, List[float]]:
+    """Önbellekteki tespitlerle takibi yeniden oynat (`process_video` metrik moduyla aynı mantık).
+
+    Dönüş: kare başına aktif sayısı, toplam kimlik, takip süresi (sn) ve tespit karelerinin det_ms değerleri.
+    """
+    skip = max(1, cfg.frame_skip)
+    tracker = build_tracker(cfg.tracker)
+    active = np.zeros(n_frames, dtype=np.int64)
+    ids = set()
+    det_ms = []
+    track_s = 0.0
+    for fid in range(1, n_frames + 1):
+        t = time.perf_counter()
+        dets = cache.get_array(fid) if fid % skip == 0 else None
+        if dets is not None:
+            tracks = tracker.update_array(dets[dets[:, 4] >= cfg.score_threshold])
+            det_ms.append(cache.det_ms(fid))
+        else:
+            # Tespitsiz (ya da çözülemeyen) kare: boru hattındaki gibi Kalman tahmini
+            tracks = tracker.predict_array()
+        ids.update(tracks[:, 0].astype(np.int64).tolist())
+        active[fid - 1] = len(tracks)
+        track_s += time.perf_counter() - t
+    return active, len(ids), track_s, det_ms
+
+
+def run_sweep(
+    cfg: PipelineConfig,
+    grid: Dict[str, Sequence],
+    out_dir: str,
+    max_error: float = 0.05,
+    measure: bool = False,
+) -> List[SweepResult]:
+    """Ayar ızgarasını tara, referansa (frame_skip=1, tam çözünürlük) göre sayım hatasını ve tahmini FPS'i çıkar.
+
+    Tespitler `det_cache_dir` (yoksa `<out_dir>/det_cache`) önbelleğinden paylaşılır; tekrar
+    çalıştırmada yalnızca yeni ayarların tespiti yapılır. FPS, ölçülen kare başına çözme ve
+    tespit süreleriyle yeniden oynatılan takip süresinden kestirilir; `measure=True` ise Pareto
+    ayarları gerçek metrik işi olarak da çalıştırılır. Sonuçlar `sweep.json` ve `sweep.csv`
+    olarak yazılır.
+    """
+    if not os.path.isfile(cfg.source):
+        raise ValueError(f"Tarama yalnızca video dosyalarıyla çalışır (tespit önbelleği gerekir): {cfg.source}")
+    if cfg.roi_detect or cfg.target_fps > 0:
+        raise ValueError("Tarama ROI / hedef FPS modlarıyla kullanılamaz (tespitler iz durumuna bağlı)")
+    if cfg.motion_gate or cfg.sample_fps > 0:
+        logger.warning("Taramada hareket kapısı / örnekleme kullanılmaz; kapatıldı.")
+    base = dataclasses.replace(
+        cfg,
+        motion_gate=False,
+        sample_fps=0.0,
+        workers=1,
+        output_video=None,
+        output_clips_dir=None,
+        output_metrics_json=None,
+        output_metrics_csv=None,
+        output_metrics_columnar=None,
+        output_rollup=None,
+        output_heatmap=None,
+        output_heatmap_raw=None,
+        heatmap=False,
+        stage_timing=False,
+        profile_frames=None,
+    )
+    reference = dataclasses.replace(base, frame_skip=1, half_res=False)
+    variants = [(p, dataclasses.replace(base, **p)) for p in expand_grid(grid)]
+    os.makedirs(out_dir, exist_ok=True)
+    cache_dir = cfg.det_cache_dir or os.path.join(out_dir, "det_cache")
+    caches, n_frames, decode = collect_detections([reference] + [c for _, c in variants], cache_dir)
+
+    def evaluate(c: PipelineConfig):
+        active, total_ids, track_s, det_ms = replay(c, caches[_det_key(c)], n_frames)
+        # Metrik işinde her kare grab edilir, yalnızca tespit kareleri çözülür
+        frame_ms = decode["grab_ms"] + (len(det_ms) * decode["retrieve_ms"] + sum(det_ms) + track_s * 1000.0) / max(1, n_frames)
+        return active, total_ids, len(det_ms), 1000.0 / frame_ms if frame_ms > 0 else 0.0
+
+    ref_active, ref_ids, _, ref_fps = evaluate(reference)
+    ref_mean = max(float(ref_active.mean()) if n_frames else 0.0, 1e-9)
+    results: List[SweepResult] = []
+    for params, c in variants:
+        active, total_ids, n_det, fps = evaluate(c)
+        mae = float(np.abs(active - ref_active).mean()) if n_frames else 0.0
+        ids_err = abs(total_ids - ref_ids) / max(1, ref_ids)
+        results.append(SweepResult(
+            params=params,
+            fps=round(fps, 2),
+            detect_frames=n_det,
+            active_mae=round(mae, 4),
+            active_rel=round(mae / ref_mean, 4),
+            ids_err=round(ids_err, 4),
+            error=round(max(mae / ref_mean, ids_err), 4),
+            total_ids=total_ids,
+        ))
+    pareto_front(results)
+    results.sort(key=lambda r: -r.fps)
+
+    if measure:
+        for r in results:
+            if r.pareto:
+                c = dataclasses.replace(base, **r.params, det_cache_dir=None)
+                t = time.perf_counter()
+                process_video(c)
+                r.measured_fps = round(n_frames / (time.perf_counter() - t), 2)
+
+    within = [r for r in results if r.error <= max_error]
+    best = max(within, key=lambda r: r.fps) if within else None
+    report = {
+        "source": cfg.source,
+        "frames": n_frames,
+        "reference": {"params": {"detector": reference.detector, "frame_skip": 1, "half_res": False,
+                                 "min_face_size": reference.min_face_size, "score_threshold": reference.score_threshold},
+                      "fps": round(ref_fps, 2), "total_ids": ref_ids, "mean_active": round(float(ref_active.mean()), 4)},
+        "decode": {k: round(v, 4) for k, v in decode.items()},
+        "max_error": max_error,
+        "best": dataclasses.asdict(best) if best is not None else None,
+        "results": [dataclasses.asdict(r) for r in results],
+    }
+    with open(os.path.join(out_dir, "sweep.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    keys = [k for k in SWEEP_KEYS if k in grid]
+    with open(os.path.join(out_dir, "sweep.csv"), "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(keys + ["fps", "measured_fps", "detect_frames", "active_mae", "active_rel", "ids_err", "total_ids", "pareto"])
+        for r in results:
+            w.writerow([r.params.get(k) for k in keys] + [r.fps, r.measured_fps, r.detect_frames, r.active_mae, r.active_rel, r.ids_err, r.total_ids, int(r.pareto)])
+
+    lines = [f"Referans: {ref_fps:.1f} FPS (tahmini), {ref_ids} kimlik, ort. aktif {float(ref_active.mean()):.2f}"]
+    for r in results:
+        if r.pareto:
+            lines.append(f"  {r.params}  {r.fps:>8.1f} FPS  aktif hata %{100 * r.active_rel:.1f}  kimlik hata %{100 * r.ids_err:.1f}")
+    logger.info("Pareto ayarları:\n" + "\n".join(lines))
+    if best is not None:
+        logger.info(f"Hata bütçesi %{100 * max_error:.0f} içinde en hızlı: {best.params} ({best.fps:.1f} FPS)")
+    else:
+        logger.warning(f"Hiçbir ayar %{100 * max_error:.0f} hata bütçesine sığmıyor")
+    return results
@@ -1,5 +1,16 @@
-from .ocsort import OCSORTTracker
-from .deepsort import DeepSORTTracker
-from .base import SimpleSORT
+from importlib import import_module
 
-__all__ = ["OCSORTTracker", "DeepSORTTracker", "SimpleSORT"]
+# Alt modüller ilk erişimde yüklenir: `src.trackers.base` içe aktarmak tüm arka uçları yüklemez
+_LAZY = {
+    "OCSORTTracker": ".ocsort",
+    "DeepSORTTracker": ".deepsort",
+    "SimpleSORT": ".base",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,90 +1,268 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Tuple, Dict
-import itertools
+from typing import List, Tuple
 import numpy as np
 
+from ..utils.boxes import iou_matrix
 
-@dataclass
+
+def assign_max_iou(iou: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """IoU'yu en büyükleyen (Hungarian) atama; `linear_sum_assignment(iou, maximize=True)` ile aynı eşlemeler.
+
+    Her satır ve sütunda en fazla bir sıfırdan büyük IoU varsa (ayrık yüzler, en sık durum) en iyi
+    atama tam olarak bu çiftlerdir ve scipy hiç yüklenmez. Sıfır IoU'lu çiftler döndürülmez; eşik
+    >0 olduğundan sonuç değişmez.
+    """
+    nz = iou > 0
+    if not nz.any():
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    if nz.sum(0).max() <= 1 and nz.sum(1).max() <= 1:
+        return np.nonzero(nz)
+    from scipy.optimize import linear_sum_assignment
+
+    return linear_sum_assignment(iou, maximize=True)
+
+
+# update_array / predict_array satır düzeni: (track_id, x1, y1, x2, y2, score)
+TRACK_COLS = ("track_id", "x1", "y1", "x2", "y2", "score")
+
+
+@dataclass(slots=True)
 class Track:
     track_id: int
     bbox: Tuple[int, int, int, int]
     score: float
 
 
+def as_det_array(detections) -> np.ndarray:
+    """(N,5) xyxy+skor dizisi ya da demet listesi -> (N,5) float64."""
+    return np.asarray(detections, dtype=np.float64).reshape(-1, 5)
+
+
+def tracks_to_array(tracks: List[Track]) -> np.ndarray:
+    if not tracks:
+        return np.empty((0, 6), dtype=np.float64)
+    return np.asarray([(t.track_id, *t.bbox, t.score) for t in tracks], dtype=np.float64)
+
+
+def tracks_from_array(arr: np.ndarray) -> List[Track]:
+    """(M,6) iz dizisini `Track` görünümlerine çevir (geriye dönük uyumlu liste API'si)."""
+    ints = arr[:, :5].astype(np.int64).tolist()
+    return [Track(r[0], (r[1], r[2], r[3], r[4]), s) for r, s in zip(ints, arr[:, 5].tolist())]
+
+
 class BaseTracker:
     name: str = "base"
 
-    def update(self, detections: List[Tuple[int, int, int, int, float]]) -> List[Track]:
+    def update(self, detections) -> List[Track]:
+        """`detections`: (N,5) dizi ya da (x1, y1, x2, y2, skor) demetleri."""
+        return tracks_from_array(self.update_array(detections))
+
+    def predict(self) -> List[Track]:
+        return tracks_from_array(self.predict_array())
+
+    def update_array(self, detections) -> np.ndarray:
+        """Dizi yolu: (M,6) `TRACK_COLS` düzeninde izler. Alt sınıflar bunu ya da `update`'i uygular."""
         raise NotImplementedError
 
+    def predict_array(self) -> np.ndarray:
+        """Tespit yapılmayan kareler için ilerlet. Varsayılan: boş tespitle update."""
+        return self.update_array(np.empty((0, 5)))
+
+    def predicted_boxes(self, steps: int = 1) -> np.ndarray:
+        """Canlı izlerin `steps` kare sonrası için tahmini (T,4) kutuları (durumu değiştirmez)."""
+        return np.empty((0, 4), dtype=np.int64)
+
+    def set_frame_step(self, step: int) -> None:
+        """Ardışık update/predict çağrıları arasında `step` video karesi var (örnekleme modu)."""
+
+    def pop_events(self, final: bool = False) -> List[Tuple[str, int, int]]:
+        """Son çağrıdan beri oluşan iz olayları: ("birth", id, 0) / ("death", id, görülen_kare_sayısı).
+
+        `final=True` videonun sonunda canlı izleri de ölmüş sayar.
+        """
+        return []
+
+
+# Sabit hızlı Kalman modeli: durum [cx, cy, w, h, vcx, vcy, vw, vh], ölçüm [cx, cy, w, h]
+_F = np.eye(8)
+_F[:4, 4:] = np.eye(4)
+_Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.05, 0.05, 0.01, 0.01])
+_R = np.diag([4.0, 4.0, 10.0, 10.0])
+# Hız bilinmiyor: başlangıçta yüksek belirsizlik
+_P0 = np.diag([10.0, 10.0, 10.0, 10.0, 1000.0, 1000.0, 1000.0, 1000.0])
+
+
+def _boxes_of(z: np.ndarray) -> np.ndarray:
+    """(T,4) [cx, cy, w, h] -> yuvarlanmış (T,4) xyxy (genişlik/yükseklik en az 1)."""
+    wh = np.maximum(z[:, 2:4], 1.0) / 2
+    return np.round(np.concatenate([z[:, :2] - wh, z[:, :2] + wh], axis=1))
+
 
 class SimpleSORT(BaseTracker):
     """Basit IoU tabanlı, sabit ömürlü takip (fallback).
     Not: Bu, gerçek SORT/OC-SORT değildir fakat arayüz uyumlu ve hafiftir.
+    Her iz sabit hızlı bir Kalman durumu taşır; eşleme tahmin edilen kutularla yapılır ve
+    tespitsiz karelerde `predict()` son görülen izlerin tahmini kutularını döndürür.
+
+    İz durumu dizi yapısında (structure-of-arrays) tutulur: tüm izlerin Kalman tahmini ve
+    eşleşen izlerin güncellemesi kare başına tek toplu matris işlemidir.
     """
 
     name = "simple_sort"
 
+    # Örnekleme modunda yüzün kare başına en fazla kaç kutu boyu yer değiştirdiği varsayılır
+    CENTER_GATE_PER_FRAME = 0.15
+
     def __init__(self, max_age: int = 10, iou_threshold: float = 0.3) -> None:
         self.max_age = max_age
         self.iou_threshold = iou_threshold
+        self.max_center_dist = 0.0  # >0: IoU'dan sonra merkez uzaklığıyla (kutu boyu cinsinden) ikinci eşleme
+        self._frame_step = 1
         self._next_id = 1
-        self._tracks: Dict[int, Dict] = {}
+        self._frame = 0
+        self._events: List[Tuple[str, int, int]] = []
+        self._ids = np.empty(0, dtype=np.int64)
+        self._x = np.empty((0, 8))  # Kalman durumu [cx, cy, w, h, vcx, vcy, vw, vh]
+        self._P = np.empty((0, 8, 8))
+        self._bbox = np.empty((0, 4))  # son tahmin edilen kutu
+        self._age = np.empty(0, dtype=np.int64)
+        self._score = np.empty(0)
+        self._visible = np.empty(0, dtype=bool)
+        self._born = np.empty(0, dtype=np.int64)
+        self._last_seen = np.empty(0, dtype=np.int64)
+
+    def set_frame_step(self, step: int) -> None:
+        """Seyrek örneklerde yüzler IoU ile eşlenemeyecek kadar uzağa gider: adım büyüdükçe
+        genişleyen merkez uzaklığı eşlemesi açılır; doğum/ölüm kare sayıları video karesi cinsindendir."""
+        self._frame_step = max(1, int(step))
+        self.max_center_dist = max(1.0, self.CENTER_GATE_PER_FRAME * self._frame_step) if self._frame_step > 1 else 0.0
+
+    def _advance(self) -> None:
+        # Yaşlandır ve tüm izler için toplu Kalman tahmini
+        self._frame += self._frame_step
+        self._age += 1
+        self._x = self._x @ _F.T
+        self._x[:, 2:4] = np.maximum(self._x[:, 2:4], 1.0)
+        self._P = _F @ self._P @ _F.T + _Q
+        self._bbox = _boxes_of(self._x[:, :4])
 
     @staticmethod
-    def _iou(a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]) -> float:
-        ax1, ay1, ax2, ay2 = a
-        bx1, by1, bx2, by2 = b
-        inter_x1 = max(ax1, bx1)
-        inter_y1 = max(ay1, by1)
-        inter_x2 = min(ax2, bx2)
-        inter_y2 = min(ay2, by2)
-        iw = max(0, inter_x2 - inter_x1)
-        ih = max(0, inter_y2 - inter_y1)
-        inter = iw * ih
-        area_a = max(0, ax2 - ax1) * max(0, ay2 - ay1)
-        area_b = max(0, bx2 - bx1) * max(0, by2 - by1)
-        union = area_a + area_b - inter + 1e-6
-        return inter / union
-
-    def update(self, detections: List[Tuple[int, int, int, int, float]]) -> List[Track]:
-        # Yaşlandır
-        for t in self._tracks.values():
-            t["age"] += 1
-
-        # Eşleme: greedy IoU
-        unmatched_trk_ids = list(self._tracks.keys())
-        assigned_trk = set()
-        outputs: List[Track] = []
-
-        for (x1, y1, x2, y2, s) in detections:
-            best_iou = 0.0
-            best_id = None
-            for tid in unmatched_trk_ids:
-                if tid in assigned_trk:
-                    continue
-                iou = self._iou(self._tracks[tid]["bbox"], (x1, y1, x2, y2))
-                if iou > best_iou:
-                    best_iou = iou
-                    best_id = tid
-            if best_id is not None and best_iou >= self.iou_threshold:
-                self._tracks[best_id]["bbox"] = (x1, y1, x2, y2)
-                self._tracks[best_id]["age"] = 0
-                assigned_trk.add(best_id)
-                outputs.append(Track(best_id, (x1, y1, x2, y2), s))
+    def _to_z(boxes: np.ndarray) -> np.ndarray:
+        return np.column_stack([(boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2, boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]])
+
+    def _correct(self, idx: np.ndarray, boxes: np.ndarray) -> None:
+        """Eşleşen izlerin Kalman güncellemesi (H = [I 0] olduğundan alt matrislerle)."""
+        P = self._P[idx]
+        y = self._to_z(boxes) - self._x[idx, :4]
+        S = P[:, :4, :4] + _R
+        K = P[:, :, :4] @ np.linalg.inv(S)
+        self._x[idx] += (K @ y[:, :, None])[:, :, 0]
+        self._P[idx] = P - K @ P[:, :4, :]
+
+    def _match_centers(self, dets: np.ndarray, det_trk: np.ndarray) -> None:
+        """IoU ile eşleşmeyen tespit ve izleri tahmini merkez uzaklığına göre (en yakın önce) eşle."""
+        free_d = np.flatnonzero(det_trk < 0)
+        free_t = np.setdiff1d(np.arange(len(self._ids)), det_trk[det_trk >= 0])
+        if not len(free_d) or not len(free_t):
+            return
+        zd = self._to_z(dets[free_d, :4])
+        zt = self._x[free_t, :4]
+        size = np.sqrt(np.maximum(zt[:, 2] * zt[:, 3], 1.0))
+        dist = np.hypot(zd[:, None, 0] - zt[None, :, 0], zd[:, None, 1] - zt[None, :, 1]) / size[None, :]
+        used_d, used_t = set(), set()
+        for flat in np.argsort(dist, axis=None, kind="stable"):
+            i, j = divmod(int(flat), len(free_t))
+            if dist[i, j] > self.max_center_dist:
+                break
+            if i in used_d or j in used_t:
+                continue
+            used_d.add(i)
+            used_t.add(j)
+            det_trk[free_d[i]] = free_t[j]
+
+    def update_array(self, detections) -> np.ndarray:
+        dets = as_det_array(detections)
+        self._advance()
+
+        # Eşleme: tahmin edilen kutuların IoU matrisi üzerinde global (Hungarian) atama
+        n = len(dets)
+        det_trk = np.full(n, -1, dtype=np.int64)
+        if n and len(self._ids):
+            iou = iou_matrix(dets[:, :4], self._bbox)
+            if self.iou_threshold > 0:
+                rows, cols = assign_max_iou(iou)
             else:
-                tid = self._next_id
-                self._next_id += 1
-                self._tracks[tid] = {"bbox": (x1, y1, x2, y2), "age": 0}
-                assigned_trk.add(tid)
-                outputs.append(Track(tid, (x1, y1, x2, y2), s))
+                from scipy.optimize import linear_sum_assignment
 
-        # Eski izleri sil
-        to_del = [tid for tid, t in self._tracks.items() if t["age"] > self.max_age]
-        for tid in to_del:
-            del self._tracks[tid]
+                rows, cols = linear_sum_assignment(iou, maximize=True)
+            ok = iou[rows, cols] >= self.iou_threshold
+            det_trk[rows[ok]] = cols[ok]
+            if self.max_center_dist > 0:
+                self._match_centers(dets, det_trk)
+
+        self._visible[:] = False
+        matched = det_trk >= 0
+        if matched.any():
+            self._correct(det_trk[matched], dets[matched, :4])
+
+        # Eşleşmeyen tespitler tespit sırasıyla yeni iz olur
+        new = np.flatnonzero(~matched)
+        if len(new):
+            k = len(new)
+            ids = np.arange(self._next_id, self._next_id + k, dtype=np.int64)
+            self._next_id += k
+            x = np.zeros((k, 8))
+            x[:, :4] = self._to_z(dets[new, :4])
+            det_trk[new] = np.arange(len(self._ids), len(self._ids) + k)
+            self._ids = np.concatenate([self._ids, ids])
+            self._x = np.concatenate([self._x, x])
+            self._P = np.concatenate([self._P, np.broadcast_to(_P0, (k, 8, 8))])
+            self._bbox = np.concatenate([self._bbox, dets[new, :4]])
+            self._age = np.concatenate([self._age, np.zeros(k, dtype=np.int64)])
+            self._score = np.concatenate([self._score, np.zeros(k)])
+            self._visible = np.concatenate([self._visible, np.zeros(k, dtype=bool)])
+            self._born = np.concatenate([self._born, np.full(k, self._frame, dtype=np.int64)])
+            self._last_seen = np.concatenate([self._last_seen, np.zeros(k, dtype=np.int64)])
+            self._events.extend(("birth", int(tid), 0) for tid in ids)
+
+        self._age[det_trk] = 0
+        self._score[det_trk] = dets[:, 4]
+        self._visible[det_trk] = True
+        self._last_seen[det_trk] = self._frame
+        outputs = np.column_stack([self._ids[det_trk], dets]) if n else np.empty((0, 6))
+
+        self._prune()
 
         # Takipte kalan ama bu karede görülmeyenler döndürülmez
         return outputs
 
+    def predict_array(self) -> np.ndarray:
+        """Tespitsiz kare: son tespitte görülen izlerin sabit hızla ötelenmiş kutularını döndür."""
+        self._advance()
+        show = self._visible & (self._age <= self.max_age)
+        outputs = np.column_stack([self._ids[show], self._bbox[show], self._score[show]])
+        self._prune()
+        return outputs
+
+    def predicted_boxes(self, steps: int = 1) -> np.ndarray:
+        return _boxes_of(self._x[:, :4] + steps * self._x[:, 4:]).astype(np.int64)
+
+    def _prune(self) -> None:
+        # Eski izleri sil
+        dead = self._age > self.max_age
+        if dead.any():
+            self._end(dead)
+
+    def _end(self, dead: np.ndarray) -> None:
+        seen = self._last_seen[dead] - self._born[dead] + self._frame_step
+        self._events.extend(("death", int(tid), int(n)) for tid, n in zip(self._ids[dead], seen))
+        keep = ~dead
+        for name in ("_ids", "_x", "_P", "_bbox", "_age", "_score", "_visible", "_born", "_last_seen"):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def pop_events(self, final: bool = False) -> List[Tuple[str, int, int]]:
+        if final and len(self._ids):
+            self._end(np.ones(len(self._ids), dtype=bool))
+        events, self._events = self._events, []
+        return events
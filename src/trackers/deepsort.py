@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import List, Tuple
 from loguru import logger
+import numpy as np
 
 from .base import BaseTracker, Track, SimpleSORT
 
@@ -17,6 +18,23 @@ class DeepSORTTracker(BaseTracker):
             logger.warning("DeepSORT bulunamadı; SimpleSORT fallback kullanılıyor.")
             self._impl = SimpleSORT(max_age=10, iou_threshold=0.3)
 
-    def update(self, detections: List[Tuple[int, int, int, int, float]]) -> List[Track]:
+    def update(self, detections) -> List[Track]:
         return self._impl.update(detections)
 
+    def predict(self) -> List[Track]:
+        return self._impl.predict()
+
+    def update_array(self, detections) -> np.ndarray:
+        return self._impl.update_array(detections)
+
+    def predict_array(self) -> np.ndarray:
+        return self._impl.predict_array()
+
+    def predicted_boxes(self, steps: int = 1) -> np.ndarray:
+        return self._impl.predicted_boxes(steps)
+
+    def set_frame_step(self, step: int) -> None:
+        self._impl.set_frame_step(step)
+
+    def pop_events(self, final: bool = False) -> List[Tuple[str, int, int]]:
+        return self._impl.pop_events(final)
@@ -14,6 +14,7 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from src import registry
 from src.pipeline import PipelineConfig, process_video
 
 
@@ -24,8 +25,11 @@ st.caption("Yerel videonuzu yükleyin, seçenekleri belirleyin ve çalıştırı
 
 with st.sidebar:
     st.header("Ayarlar")
-    detector = st.selectbox("Dedektör", ["retinaface", "mtcnn"], index=0)
-    tracker = st.selectbox("Takipçi", ["ocsort", "deepsort"], index=0)
+    # Seçenekler kayıt defterinden gelir (eklenti arka uçları dahil); modüller yalnızca çalıştırılınca yüklenir
+    detectors = registry.available("detector")
+    trackers = registry.available("tracker")
+    detector = st.selectbox("Dedektör", detectors, index=detectors.index("retinaface"))
+    tracker = st.selectbox("Takipçi", trackers, index=trackers.index("ocsort"))
     blur = st.checkbox("Yüzleri bulanıklaştır", value=True)
     heatmap = st.checkbox("Isı haritası üret", value=True)
     score_threshold = st.slider("Skor eşiği", 0.1, 0.9, 0.5, 0.05)
@@ -83,6 +87,8 @@ if run_btn:
         heatmap=bool(heatmap),
         frame_skip=int(frame_skip),
         half_res=bool(half_res),
+        # Aynı yükleme farklı takip/blur/ısı haritası ayarlarıyla tekrar çalıştırılınca tespit atlanır
+        det_cache_dir=os.path.join("data", "cache"),
     )
 
     status.info("İşleme başladı, lütfen bekleyin...")
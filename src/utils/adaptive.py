@@ -0,0 +1,96 @@
+from __future__ import annotations
+from collections import deque
+from typing import Dict
+
+
+class AdaptiveController:
+    """Hedef FPS'i korumak için tespit aralığını (frame_skip) ve işleme ölçeğini ayarlar.
+
+    Kare süreleri `window` karelik pencerede ortalanır. Ölçülen FPS hedefin
+    `(1 - hysteresis)` katının altına düşerse önce tespit aralığı artırılır, sonra ölçek
+    küçültülür; `(1 + hysteresis)` katını aşarsa ters sırayla geri alınır. İki değişiklik
+    arasında en az `cooldown` kare beklenir.
+    """
+
+    SCALE_STEP = 0.75
+
+    def __init__(
+        self,
+        target_fps: float,
+        frame_skip: int = 1,
+        scale: float = 1.0,
+        min_skip: int = 1,
+        max_skip: int = 6,
+        min_scale: float = 0.5,
+        max_scale: float = 1.0,
+        hysteresis: float = 0.15,
+        window: int = 30,
+        cooldown: int = 30,
+    ) -> None:
+        self.target_fps = float(target_fps)
+        self.min_skip = max(1, int(min_skip))
+        self.max_skip = max(self.min_skip, int(max_skip))
+        self.min_scale = float(min_scale)
+        self.max_scale = max(self.min_scale, float(max_scale))
+        self.frame_skip = min(max(int(frame_skip), self.min_skip), self.max_skip)
+        self.scale = min(max(float(scale), self.min_scale), self.max_scale)
+        self.hysteresis = float(hysteresis)
+        self.cooldown = int(cooldown)
+        self._times: deque = deque(maxlen=max(1, int(window)))
+        self._since_change = 0
+        self._next_detect = 0
+        # Son kararın dayandığı ölçüm
+        self.measured_fps = 0.0
+
+    @property
+    def fps(self) -> float:
+        if not self._times:
+            return 0.0
+        mean = sum(self._times) / len(self._times)
+        return 1.0 / mean if mean > 0 else 0.0
+
+    def state(self) -> Dict[str, float]:
+        return {"frame_skip": self.frame_skip, "scale": round(self.scale, 4), "fps": round(self.measured_fps, 2)}
+
+    def should_detect(self, frame_id: int) -> bool:
+        """Güncel tespit aralığına göre bu karede tespit yapılıp yapılmayacağı."""
+        if frame_id >= self._next_detect:
+            self._next_detect = frame_id + self.frame_skip
+            return True
+        return False
+
+    def observe(self, frame_seconds: float) -> bool:
+        """Bir karenin işlem süresini ekle; ayar değiştiyse True döndür."""
+        self._times.append(float(frame_seconds))
+        self._since_change += 1
+        if self._since_change < self.cooldown or len(self._times) < self._times.maxlen:
+            return False
+
+        fps = self.measured_fps = self.fps
+        changed = False
+        if fps < self.target_fps * (1.0 - self.hysteresis):
+            changed = self._degrade()
+        elif fps > self.target_fps * (1.0 + self.hysteresis):
+            changed = self._improve()
+        if changed:
+            self._since_change = 0
+            self._times.clear()
+        return changed
+
+    def _degrade(self) -> bool:
+        if self.frame_skip < self.max_skip:
+            self.frame_skip += 1
+            return True
+        if self.scale > self.min_scale:
+            self.scale = max(self.min_scale, self.scale * self.SCALE_STEP)
+            return True
+        return False
+
+    def _improve(self) -> bool:
+        if self.scale < self.max_scale:
+            self.scale = min(self.max_scale, self.scale / self.SCALE_STEP)
+            return True
+        if self.frame_skip > self.min_skip:
+            self.frame_skip -= 1
+            return True
+        return False
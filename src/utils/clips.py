@@ -0,0 +1,100 @@
+from __future__ import annotations
+from collections import deque
+from typing import Any, Callable, Dict, List
+import json
+import os
+
+
+class EventClipWriter:
+    """Sadece aktif iz bulunan aralıkları ayrı kliplere yazar.
+
+    Boştayken son `pre_roll_s` saniyelik kareler halka tamponda tutulur; ilk aktif karede
+    yeni klip açılır ve tampon başa yazılır. Son aktif kareden `post_roll_s` saniye sonra
+    klip kapanır; bu süre içinde yeniden yüz görünürse aynı klip devam eder. `close()` klip
+    başlangıç/bitiş zamanlarını `index.json`'a yazar.
+    """
+
+    def __init__(
+        self,
+        out_dir: str,
+        fps: float,
+        open_fn: Callable[[str], Any],
+        pre_roll_s: float = 2.0,
+        post_roll_s: float = 2.0,
+    ) -> None:
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.fps = float(fps) or 25.0
+        self.open_fn = open_fn
+        self.pre_roll_s = float(pre_roll_s)
+        self.post_roll_s = float(post_roll_s)
+        self._pre: deque = deque(maxlen=max(0, int(round(self.pre_roll_s * self.fps))))
+        self._post_frames = max(0, int(round(self.post_roll_s * self.fps)))
+        self._writer = None
+        self._clip: Dict[str, Any] | None = None
+        self._last_active = 0
+        self.clips: List[Dict[str, Any]] = []
+        self.frames_seen = 0
+        self.frames_written = 0
+
+    def push(self, frame_id: int, frame, active_count: int) -> None:
+        self.frames_seen += 1
+        if self._writer is not None and active_count <= 0 and frame_id - self._last_active > self._post_frames:
+            # Son pay bitti (post_roll 0 ise ilk boş karede): kare klibe değil ön tampona gider
+            self._finish()
+        if self._writer is None:
+            if active_count <= 0:
+                self._pre.append((frame_id, frame))
+                return
+            self._open(frame_id)
+        if active_count > 0:
+            self._last_active = frame_id
+            self._clip["max_active"] = max(self._clip["max_active"], int(active_count))
+        self._write(frame_id, frame)
+        if active_count <= 0 and frame_id - self._last_active >= self._post_frames:
+            self._finish()
+
+    def _open(self, frame_id: int) -> None:
+        start = self._pre[0][0] if self._pre else frame_id
+        path = os.path.join(self.out_dir, f"clip_{len(self.clips) + 1:04d}.mp4")
+        self._writer = self.open_fn(path)
+        self._clip = {"path": os.path.basename(path), "start_frame": start, "first_active_frame": frame_id, "max_active": 0}
+        for fid, f in self._pre:
+            self._write(fid, f)
+        self._pre.clear()
+
+    def _write(self, frame_id: int, frame) -> None:
+        self._writer.write(frame)
+        self._clip["end_frame"] = frame_id
+        self.frames_written += 1
+
+    def _finish(self) -> None:
+        self._writer.release()
+        self._writer = None
+        clip = self._clip
+        clip["last_active_frame"] = self._last_active
+        clip["start_s"] = round((clip["start_frame"] - 1) / self.fps, 3)
+        clip["end_s"] = round(clip["end_frame"] / self.fps, 3)
+        clip["frames"] = clip["end_frame"] - clip["start_frame"] + 1
+        self.clips.append(clip)
+        self._clip = None
+
+    def close(self) -> str:
+        """Açık klibi kapat ve `index.json` yolunu döndür."""
+        if self._writer is not None:
+            self._finish()
+        path = os.path.join(self.out_dir, "index.json")
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "fps": self.fps,
+                    "pre_roll_s": self.pre_roll_s,
+                    "post_roll_s": self.post_roll_s,
+                    "frames_seen": self.frames_seen,
+                    "frames_written": self.frames_written,
+                    "clips": self.clips,
+                },
+                f,
+                indent=2,
+            )
+        return path
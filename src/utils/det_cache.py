@@ -0,0 +1,107 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Dosya içeriğinin BLAKE2b özeti (hex)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+
+class DetectionCache:
+    """Kare başına tespit kutularını diskte tutan önbellek.
+
+    Anahtar: kaynak içerik özeti + tespiti etkileyen ayarlar (dedektör, skor eşiği, min yüz,
+    ölçek vb.). Kutular orijinal kare koordinatlarında (N,5) float32 olarak, tek bir `.npz`
+    dosyasında düz dizi + kare ofsetleri biçiminde saklanır. Her kare için tespit süresi de
+    tutulur (`det_ms`).
+    """
+
+    def __init__(self, cache_dir: str, source: str, params: Dict[str, Any]) -> None:
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.source_digest = self._source_digest(source)
+        self.params = dict(params)
+        key = hashlib.blake2b(json.dumps(self.params, sort_keys=True).encode(), digest_size=8).hexdigest()
+        self.path = os.path.join(cache_dir, f"{self.source_digest}-{key}.npz")
+        self._boxes: Dict[int, np.ndarray] = {}
+        self._det_ms: Dict[int, float] = {}
+        self._dirty = False
+        if os.path.exists(self.path):
+            self._load()
+
+    def _source_digest(self, source: str) -> str:
+        # Aynı dosyayı tekrar okumamak için (yol, boyut, mtime) -> özet eşlemesi saklanır
+        st = os.stat(source)
+        memo_path = os.path.join(self.cache_dir, "digests.json")
+        memo_key = f"{os.path.abspath(source)}|{st.st_size}|{st.st_mtime_ns}"
+        memo: Dict[str, str] = {}
+        if os.path.exists(memo_path):
+            try:
+                with open(memo_path, "r") as f:
+                    memo = json.load(f)
+            except (OSError, ValueError):
+                memo = {}
+        if memo_key not in memo:
+            memo[memo_key] = file_digest(source)
+            # Paralel süreçler aynı klasöre yazabilir: geçici dosya süreç başına ayrı
+            tmp = f"{memo_path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(memo, f)
+            os.replace(tmp, memo_path)
+        return memo[memo_key]
+
+    def _load(self) -> None:
+        with np.load(self.path) as z:
+            frame_ids, offsets, boxes, det_ms = z["frame_ids"], z["offsets"], z["boxes"], z["det_ms"]
+        for i, fid in enumerate(frame_ids):
+            self._boxes[int(fid)] = boxes[offsets[i]:offsets[i + 1]]
+            self._det_ms[int(fid)] = float(det_ms[i])
+
+    def __contains__(self, frame_id: int) -> bool:
+        return frame_id in self._boxes
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    def get(self, frame_id: int) -> Optional[List[Tuple[int, int, int, int, float]]]:
+        arr = self._boxes.get(frame_id)
+        if arr is None:
+            return None
+        return [(int(b[0]), int(b[1]), int(b[2]), int(b[3]), float(b[4])) for b in arr]
+
+    def get_array(self, frame_id: int) -> Optional[np.ndarray]:
+        """Kare tespitleri (N,5) float32 olarak (kopyasız)."""
+        return self._boxes.get(frame_id)
+
+    def det_ms(self, frame_id: int) -> float:
+        return self._det_ms.get(frame_id, 0.0)
+
+    def put(self, frame_id: int, dets: List[Tuple[int, int, int, int, float]] | np.ndarray, seconds: float = 0.0) -> None:
+        self._boxes[int(frame_id)] = np.asarray(dets, dtype=np.float32).reshape(-1, 5)
+        self._det_ms[int(frame_id)] = float(seconds) * 1000.0
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        frame_ids = np.asarray(sorted(self._boxes), dtype=np.int64)
+        counts = np.asarray([len(self._boxes[f]) for f in frame_ids], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        boxes = np.concatenate([self._boxes[f] for f in frame_ids]) if len(frame_ids) else np.empty((0, 5), np.float32)
+        det_ms = np.asarray([self._det_ms[f] for f in frame_ids], dtype=np.float32)
+        tmp = self.path + ".tmp.npz"
+        np.savez(tmp, frame_ids=frame_ids, offsets=offsets, boxes=boxes.astype(np.float32), det_ms=det_ms)
+        os.replace(tmp, self.path)
+        self._dirty = False
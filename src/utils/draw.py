@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Tuple, List
 import cv2
+import numpy as np
 
 
 def draw_bbox(image, bbox: Tuple[int, int, int, int], color=(0, 255, 0), thickness=2):
@@ -12,8 +13,10 @@ def draw_text(image, text: str, org: Tuple[int, int], color=(255, 255, 255)):
     cv2.putText(image, text, org, cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1, cv2.LINE_AA)
 
 
-def overlay_tracks(image, tracks: List[Tuple[int, int, int, int, int, float]], fps: float, active_count: int, total_count: int):
-    for (tid, x1, y1, x2, y2, score) in tracks:
+def overlay_tracks(image, tracks: List[Tuple[int, int, int, int, int, float]] | np.ndarray, fps: float, active_count: int, total_count: int):
+    """`tracks`: (M,6) dizi ya da (tid, x1, y1, x2, y2, score) demetleri."""
+    arr = np.asarray(tracks, dtype=np.float64).reshape(-1, 6)
+    for (tid, x1, y1, x2, y2), score in zip(arr[:, :5].astype(np.int64).tolist(), arr[:, 5].tolist()):
         draw_bbox(image, (x1, y1, x2, y2), (0, 200, 0), 2)
         draw_text(image, f"ID {tid} {score:.2f}", (x1, max(0, y1 - 5)))
     draw_text(image, f"Active: {active_count}", (10, 20))
@@ -9,9 +9,15 @@ class FPSMeter:
         self.t0 = time.time()
         self.frames = 0
         self.fps = 0.0
+        # Son iki tick arasındaki süre (kare başına gecikme, sn)
+        self.dt = 0.0
+        self._last = time.perf_counter()
 
     def tick(self) -> float:
         self.frames += 1
+        t = time.perf_counter()
+        self.dt = t - self._last
+        self._last = t
         now = time.time()
         dt = now - self.t0
         if dt >= 1.0:
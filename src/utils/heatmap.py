@@ -1,27 +1,129 @@
 from __future__ import annotations
-from typing import Tuple
+from typing import Any, Dict, Iterable, Sequence, Tuple
+import json
+import os
+
+import cv2
 import numpy as np
-from scipy.ndimage import gaussian_filter
+
+
+HEATMAP_MODES = ("cumulative", "window", "decay")
+RAW_FORMAT_VERSION = 1
 
 
 class HeatmapAccumulator:
-    """Yüz merkezlerinden birikimli yoğunluk haritası üretir."""
+    """Yüz merkezlerinden birikimli yoğunluk haritası üretir.
+
+    Sayımlar `stride` piksellik hücrelerden oluşan seyrek bir ızgarada tutulur (bellek
+    stride² kat azalır); `render()` ızgarayı sigma/stride ile yumuşatıp kare boyutuna büyütür.
 
-    def __init__(self, height: int, width: int, sigma: float = 8.0) -> None:
+    Zaman kipleri (`t` video zamanı, sn; `advance()` ya da `add_*(..., t=...)` ile ilerletilir):
+    - "cumulative": tüm çalışma (varsayılan)
+    - "window": son `window_s` saniye; `interval_s`'lik kısmi haritalardan oluşan halka tampon
+    - "decay": her `interval_s` sonunda harita yarı ömrü `half_life_s` olacak şekilde sönümlenir
+    """
+
+    def __init__(
+        self,
+        height: int,
+        width: int,
+        sigma: float = 8.0,
+        stride: int = 1,
+        mode: str = "cumulative",
+        window_s: float = 900.0,
+        interval_s: float = 60.0,
+        half_life_s: float = 300.0,
+    ) -> None:
+        if mode not in HEATMAP_MODES:
+            raise ValueError(f"Bilinmeyen ısı haritası kipi: {mode}")
         self.height = int(height)
         self.width = int(width)
-        self.map = np.zeros((self.height, self.width), dtype=np.float32)
+        self.stride = max(1, int(stride))
+        grid_h = -(-self.height // self.stride)
+        grid_w = -(-self.width // self.stride)
+        self.map = np.zeros((grid_h, grid_w), dtype=np.float32)
         self.sigma = float(sigma)
+        self.mode = mode
+        self.interval_s = float(interval_s)
+        self.window_s = float(window_s)
+        self.half_life_s = float(half_life_s)
+        self._slots = None
+        if mode == "window":
+            n = max(1, int(np.ceil(self.window_s / self.interval_s)))
+            self._slots = np.zeros((n, grid_h, grid_w), dtype=np.float32)
+        self._interval = None  # içinde bulunulan aralık numarası
+        # Biriktirilen kare sayısı (add_bbox/add_bboxes her çağrıda bir kare sayar)
+        self.frames = 0
+
+    def advance(self, t: float) -> int:
+        """Zamanı `t`'ye ilerlet; kapanan aralık sayısını döndürür (cumulative kipte her zaman 0)."""
+        if self.mode == "cumulative":
+            return 0
+        k = int(t // self.interval_s)
+        if self._interval is None:
+            self._interval = k
+            return 0
+        steps = k - self._interval
+        if steps <= 0:
+            return 0
+        if self.mode == "decay":
+            self.map *= np.float32(0.5 ** (steps * self.interval_s / self.half_life_s))
+        else:
+            n = len(self._slots)
+            if steps >= n:
+                self._slots[:] = 0.0
+                self.map[:] = 0.0
+            else:
+                # Pencereden çıkan en eski aralıkların katkısını düş, slotları yeniden kullan
+                for j in range(self._interval + 1, k + 1):
+                    slot = self._slots[j % n]
+                    self.map -= slot
+                    slot[:] = 0.0
+        self._interval = k
+        return steps
+
+    def _add_cells(self, gy: np.ndarray, gx: np.ndarray) -> None:
+        # Aynı hücreye düşen merkezler de doğru sayılsın diye np.add.at (tamponsuz toplama)
+        np.add.at(self.map, (gy, gx), 1.0)
+        if self._slots is not None:
+            np.add.at(self._slots[(self._interval or 0) % len(self._slots)], (gy, gx), 1.0)
 
-    def add_bbox(self, bbox: Tuple[int, int, int, int]):
-        x1, y1, x2, y2 = bbox
-        cx = int((x1 + x2) / 2)
-        cy = int((y1 + y2) / 2)
-        if 0 <= cx < self.width and 0 <= cy < self.height:
-            self.map[cy, cx] += 1.0
+    def add_bbox(self, bbox: Tuple[int, int, int, int], t: float | None = None):
+        """Tek kutulu bir kare ekle (`add_bboxes([bbox], t)`)."""
+        self.add_bboxes([bbox], t)
+
+    def add_bboxes(self, boxes: Sequence[Sequence[float]] | np.ndarray, t: float | None = None):
+        """(N,4+) xyxy kutu dizisinin merkezlerini tek seferde ekle."""
+        if t is not None:
+            self.advance(t)
+        self.frames += 1
+        b = np.asarray(boxes, dtype=np.float64)
+        if b.size == 0:
+            return
+        b = b.reshape(len(b), -1)
+        cx = ((b[:, 0] + b[:, 2]) / 2).astype(np.int64)
+        cy = ((b[:, 1] + b[:, 3]) / 2).astype(np.int64)
+        ok = (cx >= 0) & (cx < self.width) & (cy >= 0) & (cy < self.height)
+        self._add_cells(cy[ok] // self.stride, cx[ok] // self.stride)
+
+    def add_grid(self, grid: np.ndarray, t: float | None = None, frames: int = 0):
+        """Aynı ızgara boyutundaki kısmi bir sayım haritasını ekle (ör. başka bir çalıştırmanın ham haritası)."""
+        if t is not None:
+            self.advance(t)
+        if grid.shape != self.map.shape:
+            raise ValueError(f"Izgara boyutu uyuşmuyor: {grid.shape} != {self.map.shape}")
+        self.frames += int(frames)
+        self.map += grid
+        if self._slots is not None:
+            self._slots[(self._interval or 0) % len(self._slots)] += grid
 
     def render(self, normalize: bool = True) -> np.ndarray:
-        hm = gaussian_filter(self.map, sigma=self.sigma)
+        hm = self.map
+        sigma = self.sigma / self.stride
+        if sigma > 0:
+            hm = cv2.GaussianBlur(hm, (0, 0), sigmaX=sigma, borderType=cv2.BORDER_REFLECT)
+        if hm.shape != (self.height, self.width):
+            hm = cv2.resize(hm, (self.width, self.height), interpolation=cv2.INTER_LINEAR)
         if normalize and hm.max() > 0:
             hm = hm / hm.max()
         return hm
@@ -29,8 +131,114 @@ class HeatmapAccumulator:
     def to_color(self) -> np.ndarray:
         hm = self.render(normalize=True)
         hm_uint8 = (hm * 255).astype(np.uint8)
-        import cv2
-
         color = cv2.applyColorMap(hm_uint8, cv2.COLORMAP_JET)
         return color
 
+    def meta(self) -> Dict[str, Any]:
+        return {
+            "version": RAW_FORMAT_VERSION,
+            "height": self.height,
+            "width": self.width,
+            "stride": self.stride,
+            "sigma": self.sigma,
+            "frames": self.frames,
+            "mode": self.mode,
+        }
+
+    def save_raw(self, path: str) -> None:
+        """Ham sayım ızgarasını `.npy` (np.load(..., mmap_mode="r") ile açılabilir) + `<yol>.json` üst verisi olarak yaz."""
+        save_raw(path, self.map, self.meta())
+
+    @classmethod
+    def from_raw(cls, path: str) -> "HeatmapAccumulator":
+        grid, meta = load_raw(path, mmap=False)
+        hm = cls(meta["height"], meta["width"], sigma=meta.get("sigma", 8.0), stride=meta["stride"])
+        hm.add_grid(grid, frames=meta.get("frames", 0))
+        return hm
+
+
+def _meta_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".json"
+
+
+def save_raw(path: str, grid: np.ndarray, meta: Dict[str, Any]) -> None:
+    """Ham ızgarayı ve üst verisini atomik olarak yaz (yarım dosya okunmasın diye önce geçici dosyaya)."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp.npy"
+    np.save(tmp, np.ascontiguousarray(grid, dtype=np.float32))
+    os.replace(tmp, path)
+    with open(_meta_path(path) + ".tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(_meta_path(path) + ".tmp", _meta_path(path))
+
+
+def load_raw(path: str, mmap: bool = True) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """`save_raw` çıktısını oku; `mmap=True` ise dizi belleğe yüklenmeden eşlenir."""
+    grid = np.load(path, mmap_mode="r" if mmap else None)
+    meta_path = _meta_path(path)
+    if os.path.exists(meta_path):
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+    else:
+        # Üst verisiz eski .npy: tam çözünürlüklü ızgara varsay
+        meta = {"height": grid.shape[0], "width": grid.shape[1], "stride": 1, "frames": 0}
+    return grid, meta
+
+
+def merge_raw(paths: Iterable[str]) -> HeatmapAccumulator:
+    """Ham ısı haritalarını teker teker (mmap ile) okuyup toplar; bellekte tek ızgara tutulur.
+
+    Tüm girdilerin kare boyutu ve ızgara adımı aynı olmalıdır, aksi halde ValueError.
+    """
+    total = None
+    for path in paths:
+        grid, meta = load_raw(path, mmap=True)
+        if total is None:
+            total = HeatmapAccumulator(meta["height"], meta["width"], sigma=meta.get("sigma", 8.0), stride=meta["stride"])
+        elif (meta["height"], meta["width"], meta["stride"]) != (total.height, total.width, total.stride):
+            raise ValueError(
+                f"{path}: {meta['width']}x{meta['height']} (stride {meta['stride']}) "
+                f"birleşime uymuyor ({total.width}x{total.height}, stride {total.stride})"
+            )
+        total.add_grid(grid, frames=meta.get("frames", 0))
+        del grid
+    if total is None:
+        raise ValueError("Birleştirilecek ısı haritası yok")
+    return total
+
+
+class HeatmapSnapshots:
+    """Çalışma sırasında her `every_s` saniyede (video zamanı) ısı haritası anlık görüntüsü yazar.
+
+    Her anlık görüntü `heatmap_<sn>s.png` + ham ızgara `heatmap_<sn>s.npy`/`.json` olarak saklanır;
+    `heatmap_latest.png` her seferinde atomik olarak güncellenir. Harita baştan hesaplanmaz,
+    yalnızca o anki birikim durumu render edilir.
+    """
+
+    def __init__(self, out_dir: str, every_s: float = 60.0) -> None:
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.every_s = float(every_s)
+        self._next = self.every_s
+        self.written = 0
+
+    def maybe_write(self, heatmap: HeatmapAccumulator, t: float) -> bool:
+        if t < self._next:
+            return False
+        stamp = self._next
+        self._next = (int(t // self.every_s) + 1) * self.every_s
+        self.write(heatmap, stamp)
+        return True
+
+    def write(self, heatmap: HeatmapAccumulator, t: float) -> str:
+        base = os.path.join(self.out_dir, f"heatmap_{int(round(t)):06d}s")
+        heatmap.save_raw(base + ".npy")
+        color = heatmap.to_color()
+        cv2.imwrite(base + ".png", color)
+        latest = os.path.join(self.out_dir, "heatmap_latest.png")
+        tmp = os.path.join(self.out_dir, ".heatmap_latest.tmp.png")
+        cv2.imwrite(tmp, color)
+        os.replace(tmp, latest)
+        self.written += 1
+        return base
@@ -1,37 +1,250 @@
 from __future__ import annotations
-from typing import Dict, Any
+from typing import Dict, Any, List
 import csv
+import glob
 import json
+import os
+
+import numpy as np
+from loguru import logger
+
+
+class _JsonArrayWriter:
+    """JSON dizisini satır satır yazar; bellekte satır tutmaz.
+
+    Dosya `close()` ile geçerli bir JSON dizisi olur; yarıda kalırsa `load_metrics` onarır.
+    """
+
+    def __init__(self, path: str, flush_every: int) -> None:
+        self._f = open(path, "w")
+        self._f.write("[")
+        self._n = 0
+        self._flush_every = max(1, int(flush_every))
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._f.write(("\n  " if self._n == 0 else ",\n  ") + json.dumps(row))
+        self._n += 1
+        if self._n % self._flush_every == 0:
+            self._f.flush()
+
+    def close(self) -> None:
+        self._f.write("\n]\n" if self._n else "]\n")
+        self._f.close()
+
+
+class _JsonLinesWriter:
+    """Her satırı ayrı bir JSON nesnesi olarak yazar (JSONL)."""
+
+    def __init__(self, path: str, flush_every: int) -> None:
+        self._f = open(path, "w")
+        self._n = 0
+        self._flush_every = max(1, int(flush_every))
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._f.write(json.dumps(row) + "\n")
+        self._n += 1
+        if self._n % self._flush_every == 0:
+            self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def _column_dtype(value: Any) -> str:
+    if isinstance(value, (bool, np.bool_, int, np.integer)):
+        return "i8"
+    if isinstance(value, (float, np.floating)):
+        return "f8"
+    return "U32"
+
+
+class _ColumnarWriter:
+    """Satırları `chunk_rows`'luk sütunsal parçalar halinde yazar.
+
+    Yol `.parquet` ile bitiyor ve pyarrow kuruluysa tek Parquet dosyası (her parça bir row
+    group) üretilir; aksi halde yol bir klasördür ve her parça `part-00000.npy` biçiminde
+    yapılandırılmış NumPy dizisidir. Sütun tipleri ilk satırdan belirlenir.
+    """
+
+    def __init__(self, path: str, chunk_rows: int) -> None:
+        self.path = path
+        self.chunk_rows = max(1, int(chunk_rows))
+        self._pq = None
+        self._pq_writer = None
+        if path.endswith(".parquet"):
+            try:
+                import pyarrow as pa  # type: ignore
+                import pyarrow.parquet as pq  # type: ignore
+
+                self._pq = (pa, pq)
+            except ImportError:
+                self.path = path[: -len(".parquet")]
+                logger.warning(f"pyarrow yok; sütunsal metrikler .npy parçaları olarak {self.path}/ altına yazılacak.")
+        if self._pq is None:
+            os.makedirs(self.path, exist_ok=True)
+            for old in glob.glob(os.path.join(self.path, "part-*.npy")):
+                os.remove(old)
+        self._dtype = None
+        self._buf: List[tuple] = []
+        self._parts = 0
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if self._dtype is None:
+            self._dtype = np.dtype([(k, _column_dtype(v)) for k, v in row.items()])
+        self._buf.append(tuple(row.get(k, 0 if self._dtype[k].kind != "U" else "") for k in self._dtype.names))
+        if len(self._buf) >= self.chunk_rows:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buf:
+            return
+        arr = np.array(self._buf, dtype=self._dtype)
+        self._buf = []
+        if self._pq is not None:
+            pa, pq = self._pq
+            table = pa.table({k: arr[k] for k in arr.dtype.names})
+            if self._pq_writer is None:
+                self._pq_writer = pq.ParquetWriter(self.path, table.schema)
+            self._pq_writer.write_table(table)
+        else:
+            np.save(os.path.join(self.path, f"part-{self._parts:05d}.npy"), arr)
+        self._parts += 1
+
+    def close(self) -> None:
+        self._flush()
+        if self._pq_writer is not None:
+            self._pq_writer.close()
 
 
 class MetricsLogger:
-    def __init__(self, json_path: str | None, csv_path: str | None) -> None:
+    """Kare başına metrikleri akış halinde yazar; bellek kullanımı çalışma süresinden bağımsızdır.
+
+    JSON yolu `.jsonl` ile bitiyorsa JSON Lines, aksi halde (geriye uyumlu) JSON dizisi yazılır.
+    `columnar_path` verilirse satırlar ayrıca sütunsal biçimde (Parquet ya da .npy parçaları)
+    saklanır. Tüm çıktılar `flush_every` satırda bir diske boşaltılır.
+    """
+
+    def __init__(
+        self,
+        json_path: str | None,
+        csv_path: str | None,
+        extra_fields: list[str] | None = None,
+        columnar_path: str | None = None,
+        flush_every: int = 100,
+        chunk_rows: int = 65536,
+    ) -> None:
         self.json_path = json_path
         self.csv_path = csv_path
+        self.columnar_path = columnar_path
+        self.flush_every = max(1, int(flush_every))
+        # log(**extra) ile gelen ek sütunlar (ör. hareket kapısı kararı)
+        self.extra_fields = list(extra_fields or [])
         self._csv_file = None
         self._csv_writer = None
+        self._rows = 0
         if self.csv_path:
             self._csv_file = open(self.csv_path, "w", newline="")
-            self._csv_writer = csv.DictWriter(self._csv_file, fieldnames=["timestamp", "frame_id", "active_count", "total_ids"])
+            self._csv_writer = csv.DictWriter(
+                self._csv_file,
+                fieldnames=["timestamp", "frame_id", "active_count", "total_ids", *self.extra_fields],
+                extrasaction="ignore",
+            )
             self._csv_writer.writeheader()
-        self._json_records: list[Dict[str, Any]] = []
+        self._json = None
+        if self.json_path:
+            writer = _JsonLinesWriter if self.json_path.endswith(".jsonl") else _JsonArrayWriter
+            self._json = writer(self.json_path, self.flush_every)
+        self._columnar = _ColumnarWriter(columnar_path, chunk_rows) if columnar_path else None
+        self._events = None
 
-    def log(self, timestamp: float, frame_id: int, active_count: int, total_ids: int):
+    def log(self, timestamp: float, frame_id: int, active_count: int, total_ids: int, **extra: Any):
         row = {
             "timestamp": float(timestamp),
             "frame_id": int(frame_id),
             "active_count": int(active_count),
             "total_ids": int(total_ids),
+            **extra,
         }
         if self._csv_writer:
             self._csv_writer.writerow(row)
-        if self.json_path:
-            self._json_records.append(row)
+        if self._json is not None:
+            self._json.write(row)
+        if self._columnar is not None:
+            self._columnar.write(row)
+        self._rows += 1
+        if self._csv_file and self._rows % self.flush_every == 0:
+            self._csv_file.flush()
+
+    def event(self, timestamp: float, frame_id: int, kind: str, **data: Any):
+        """Kare satırlarından ayrı olay kaydı (ör. ayar değişikliği); `<metrik>.events.json`'a yazılır."""
+        if self._events is None:
+            if not self.events_path:
+                return
+            self._events = _JsonArrayWriter(self.events_path, 1)
+        self._events.write({"timestamp": float(timestamp), "frame_id": int(frame_id), "event": kind, **data})
+
+    @property
+    def events_path(self) -> str | None:
+        base = self.json_path or self.csv_path
+        if not base:
+            return None
+        return os.path.splitext(base)[0] + ".events.json"
 
     def close(self):
         if self._csv_file:
             self._csv_file.close()
-        if self.json_path:
-            with open(self.json_path, "w") as f:
-                json.dump(self._json_records, f, indent=2)
+        for w in (self._json, self._columnar, self._events):
+            if w is not None:
+                w.close()
+        self._json = self._columnar = self._events = None
+
+
+def _rows_to_columns(rows: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    keys: Dict[str, None] = {}
+    for r in rows:
+        keys.update(dict.fromkeys(r))
+    return {k: np.asarray([r.get(k) for r in rows]) for k in keys}
+
+
+def load_metrics(path: str) -> Dict[str, np.ndarray]:
+    """MetricsLogger çıktısını sütun sözlüğü olarak oku (.json, .jsonl, .csv, .parquet ya da .npy klasörü).
+
+    Yarıda kalmış (kapanmamış) JSON dizileri de okunur.
+    """
+    if os.path.isdir(path):
+        parts = sorted(glob.glob(os.path.join(path, "part-*.npy")))
+        if not parts:
+            return {}
+        arr = np.concatenate([np.load(p) for p in parts])
+        return {k: arr[k] for k in arr.dtype.names}
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq  # type: ignore
 
+        table = pq.read_table(path)
+        return {k: table.column(k).to_numpy() for k in table.column_names}
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        cols = _rows_to_columns(rows)
+        for k, v in cols.items():
+            for dtype in (np.int64, np.float64):
+                try:
+                    cols[k] = v.astype(dtype)
+                    break
+                except ValueError:
+                    continue
+        return cols
+    if path.endswith(".jsonl"):
+        with open(path) as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        return _rows_to_columns(rows)
+    with open(path) as f:
+        text = f.read()
+    try:
+        rows = json.loads(text)
+    except ValueError:
+        # Kapanmamış dizi: son tam satıra kadar onar
+        body = text.rstrip().rstrip(",")
+        cut = body.rfind("}")
+        rows = json.loads(body[: cut + 1] + "\n]") if cut >= 0 else []
+    return _rows_to_columns(rows)
@@ -0,0 +1,43 @@
+from __future__ import annotations
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Küçültülmüş gri kare farkıyla statik kareleri ayırt eden ucuz tespit kapısı.
+
+    Kare, son dedektör çağrısındaki önizlemeyle karşılaştırılır; `pixel_delta`'dan fazla
+    değişen piksellerin oranı `threshold`'un altındaysa kare statik sayılır. Yavaş kaymalar
+    birikerek eşiği aşar. `max_static > 0` ise en geç bu kadar kapatılmış tespitten sonra
+    dedektör yine çalıştırılır.
+    """
+
+    def __init__(self, threshold: float = 0.005, pixel_delta: int = 12, width: int = 160, max_static: int = 0) -> None:
+        self.threshold = float(threshold)
+        self.pixel_delta = int(pixel_delta)
+        self.width = int(width)
+        self.max_static = int(max_static)
+        self._ref = None
+        self._static_run = 0
+        self.checks = 0
+        self.skipped = 0
+
+    def _thumb(self, frame) -> np.ndarray:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        h, w = gray.shape[:2]
+        size = (self.width, max(1, int(round(h * self.width / w))))
+        return cv2.GaussianBlur(cv2.resize(gray, size, interpolation=cv2.INTER_AREA), (3, 3), 0)
+
+    def should_detect(self, frame) -> bool:
+        """Dedektör çalışmalı mı? False ise önceki tespitler yeniden kullanılabilir."""
+        self.checks += 1
+        thumb = self._thumb(frame)
+        if self._ref is not None and thumb.shape == self._ref.shape:
+            changed = float(np.mean(cv2.absdiff(thumb, self._ref) > self.pixel_delta))
+            if changed < self.threshold and (self.max_static <= 0 or self._static_run < self.max_static):
+                self._static_run += 1
+                self.skipped += 1
+                return False
+        self._ref = thumb
+        self._static_run = 0
+        return True
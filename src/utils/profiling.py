@@ -0,0 +1,252 @@
+from __future__ import annotations
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Tuple
+import cProfile
+import io
+import math
+import os
+import pstats
+import sys
+import threading
+import time
+
+from loguru import logger
+
+
+class LatencyHistogram:
+    """Logaritmik kovalı gecikme histogramı: ekleme O(1), bellek sabit.
+
+    Kovalar 1 µs - 100 sn arasında onluk başına `per_decade` adettir; yüzdelikler kovanın
+    geometrik ortası olarak döner (per_decade=20 için hata ±%6).
+    """
+
+    MIN_S = 1e-6
+    DECADES = 8
+
+    def __init__(self, per_decade: int = 20) -> None:
+        self.per_decade = int(per_decade)
+        self.counts = [0] * (self.DECADES * self.per_decade + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        if seconds > self.MIN_S:
+            i = min(len(self.counts) - 1, int(math.log10(seconds / self.MIN_S) * self.per_decade) + 1)
+        else:
+            i = 0
+        self.counts[i] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        """q (0-100) yüzdeliği, saniye."""
+        if self.count == 0:
+            return 0.0
+        target = q / 100.0 * self.count
+        cum = 0
+        for i, c in enumerate(self.counts):
+            cum += c
+            if cum >= target and c:
+                if i == 0:
+                    return min(self.MIN_S, self.max)
+                mid = self.MIN_S * 10 ** ((i - 0.5) / self.per_decade)
+                return min(mid, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000.0, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000.0, 3),
+            "p95_ms": round(self.percentile(95) * 1000.0, 3),
+            "p99_ms": round(self.percentile(99) * 1000.0, 3),
+            "max_ms": round(self.max * 1000.0, 3),
+            "total_s": round(self.total, 3),
+        }
+
+
+class StageTimers:
+    """Aşama adı -> `LatencyHistogram`. Kullanım: `t = timers.lap("track", t)` süreyi ekleyip şimdiki zamanı döndürür.
+
+    `enabled=False` iken tüm çağrılar ölçüm yapmadan döner.
+    """
+
+    def __init__(self, stages: Iterable[str] = (), enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.hists: Dict[str, LatencyHistogram] = {s: LatencyHistogram() for s in stages}
+
+    def add(self, stage: str, seconds: float, n: int = 1) -> None:
+        """`n` örnek ekle (ör. toplu tespit süresi kare başına bölünerek)."""
+        if not self.enabled:
+            return
+        h = self.hists.get(stage)
+        if h is None:
+            h = self.hists[stage] = LatencyHistogram()
+        for _ in range(n):
+            h.add(seconds / n)
+
+    def lap(self, stage: str, t_start: float) -> float:
+        now = time.perf_counter()
+        if self.enabled:
+            self.add(stage, now - t_start)
+        return now
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {s: h.summary() for s, h in self.hists.items() if h.count}
+
+    def reset(self) -> None:
+        self.hists = {s: LatencyHistogram() for s in self.hists}
+
+    def merge(self, other: "StageTimers") -> None:
+        for s, h in other.hists.items():
+            self.hists.setdefault(s, LatencyHistogram()).merge(h)
+
+    def table(self) -> str:
+        lines = [f"{'aşama':<10} {'n':>7} {'ort ms':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'top sn':>8}"]
+        for s, r in self.summary().items():
+            lines.append(
+                f"{s:<10} {r['count']:>7} {r['mean_ms']:>9.2f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['total_s']:>8.2f}"
+            )
+        return "\n".join(lines)
+
+
+def with_durations(it: Iterable) -> Iterator[Tuple[object, float]]:
+    """Her öğeyi üretme süresiyle (öğe, sn) olarak ver. Üretildiği iş parçacığında (ör. okuyucu)
+    ölçülür; kuyrukta bekleme süreye girmez."""
+    it = iter(it)
+    while True:
+        t = time.perf_counter()
+        try:
+            item = next(it)
+        except StopIteration:
+            return
+        yield item, time.perf_counter() - t
+
+
+def record_durations(it: Iterable[Tuple[object, float]], timers: StageTimers, stage: str) -> Iterator:
+    """`with_durations` çiftlerini aç ve süreleri `stage` olarak kaydet. Tüketen (ana) iş parçacığında
+    çalıştığından `StageTimers` tek iş parçacığından güncellenir."""
+    for item, seconds in it:
+        timers.add(stage, seconds)
+        yield item
+
+
+def parse_frame_range(spec: str) -> Tuple[int, int]:
+    """"100-300" -> (100, 300); "250" -> (250, 250)."""
+    a, _, b = str(spec).partition("-")
+    start = int(a)
+    end = int(b) if b else start
+    if end < start:
+        raise ValueError(f"Geçersiz kare aralığı: {spec}")
+    return start, end
+
+
+class _Sampler:
+    """Ana iş parçacığının yığınını `interval` saniyede bir örnekler (harici paket gerektirmez)."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = float(interval)
+        self.stacks: Counter = Counter()
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+
+class FrameProfiler:
+    """Seçilen kare aralığında profil çıkarır.
+
+    - "cprofile": `<out>.prof` (snakeviz/pstats ile açılır) + `<out>.txt` (kümülatif ilk 30)
+    - "sample": `<out>.folded` (flamegraph.pl / speedscope biçiminde yığın sayıları) + `<out>.txt`
+
+    `on_frame(frame_id)` her karenin başında çağrılır; aralığın sonunda ya da `close()`'da yazılır.
+    """
+
+    def __init__(self, out: str, start: int, end: int, mode: str = "cprofile", interval: float = 0.005) -> None:
+        if mode not in ("cprofile", "sample"):
+            raise ValueError(f"Bilinmeyen profil kipi: {mode}")
+        self.out = out
+        self.start = int(start)
+        self.end = int(end)
+        self.mode = mode
+        self.interval = interval
+        self._prof = None
+        self._done = False
+        if os.path.dirname(out):
+            os.makedirs(os.path.dirname(out), exist_ok=True)
+
+    @property
+    def active(self) -> bool:
+        return self._prof is not None
+
+    def on_frame(self, frame_id: int) -> None:
+        if self._done:
+            return
+        if self._prof is None and frame_id >= self.start:
+            self._begin()
+        elif self._prof is not None and frame_id > self.end:
+            self.close()
+
+    def _begin(self) -> None:
+        if self.mode == "cprofile":
+            self._prof = cProfile.Profile()
+            self._prof.enable()
+        else:
+            self._prof = _Sampler(self.interval)
+            self._prof.start()
+        logger.info(f"Profil başladı ({self.mode}, kare {self.start}-{self.end})")
+
+    def close(self) -> None:
+        if self._prof is None or self._done:
+            return
+        self._done = True
+        if self.mode == "cprofile":
+            self._prof.disable()
+            self._prof.dump_stats(self.out + ".prof")
+            buf = io.StringIO()
+            pstats.Stats(self._prof, stream=buf).sort_stats("cumulative").print_stats(30)
+            report = buf.getvalue()
+            paths = [self.out + ".prof", self.out + ".txt"]
+        else:
+            self._prof.stop()
+            stacks = self._prof.stacks
+            with open(self.out + ".folded", "w") as f:
+                for stack, n in stacks.most_common():
+                    f.write(f"{stack} {n}\n")
+            # Kendi süresi: yığının en üstündeki fonksiyon
+            leaf = Counter()
+            for stack, n in stacks.items():
+                leaf[stack.rsplit(";", 1)[-1]] += n
+            total = sum(leaf.values()) or 1
+            report = "\n".join(f"{n:>6} {100.0 * n / total:5.1f}%  {name}" for name, n in leaf.most_common(30))
+            paths = [self.out + ".folded", self.out + ".txt"]
+        with open(self.out + ".txt", "w") as f:
+            f.write(report)
+        self._prof = None
+        logger.info(f"Profil yazıldı: {', '.join(paths)}")
@@ -0,0 +1,127 @@
+from __future__ import annotations
+from typing import Dict, List, Sequence, Tuple
+import csv
+
+import numpy as np
+
+
+class _Bucket:
+    """Tek bir zaman kovasının çalışan toplamları."""
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.frames = 0
+        self.active_sum = 0
+        self.active_max = 0
+        # active_count tamsayı olduğundan histogramla kesin p95 hesaplanır
+        self.hist = np.zeros(8, dtype=np.int64)
+        self.new_ids = 0
+        self.ended = 0
+        self.dwell_sum = 0.0
+        self.dwell_max = 0.0
+
+    def add_frame(self, active: int) -> None:
+        self.frames += 1
+        self.active_sum += active
+        self.active_max = max(self.active_max, active)
+        if active >= len(self.hist):
+            self.hist = np.concatenate([self.hist, np.zeros(active + 1 - len(self.hist), dtype=np.int64)])
+        self.hist[active] += 1
+
+    def p95(self) -> int:
+        if self.frames == 0:
+            return 0
+        return int(np.searchsorted(np.cumsum(self.hist), 0.95 * self.frames))
+
+
+class MetricsRollup:
+    """Kare metriklerini çevrimiçi olarak sabit genişlikli zaman kovalarında özetler.
+
+    Her kova genişliği (sn) için `<prefix>_<w>s.csv` dosyasına kova kapandıkça bir satır
+    yazılır: ortalama / en büyük / p95 aktif yüz sayısı, yeni ID sayısı, biten izler ve
+    kalma süreleri. İz bazında kalma süreleri `<prefix>_dwell.csv` dosyasına yazılır.
+    Bellek kullanımı kova ve canlı iz sayısıyla sınırlıdır.
+    """
+
+    FIELDS = [
+        "bucket_start", "bucket_end", "frames", "active_mean", "active_max", "active_p95",
+        "new_ids", "ended_tracks", "dwell_mean_s", "dwell_max_s",
+    ]
+
+    def __init__(self, prefix: str, widths: Sequence[float] = (1.0, 60.0), fps: float = 25.0) -> None:
+        self.prefix = prefix
+        self.widths = [float(w) for w in widths]
+        self.fps = float(fps) or 25.0
+        self._files = []
+        self._writers = []
+        for w in self.widths:
+            f = open(f"{prefix}_{w:g}s.csv", "w", newline="")
+            wr = csv.DictWriter(f, fieldnames=self.FIELDS)
+            wr.writeheader()
+            self._files.append(f)
+            self._writers.append(wr)
+        self._dwell_file = open(f"{prefix}_dwell.csv", "w", newline="")
+        self._dwell = csv.writer(self._dwell_file)
+        self._dwell.writerow(["track_id", "birth_s", "end_s", "dwell_s"])
+        self._buckets: List[_Bucket | None] = [None] * len(self.widths)
+        self._births: Dict[int, float] = {}
+
+    def _bucket(self, k: int, t: float) -> _Bucket:
+        idx = int(t // self.widths[k])
+        b = self._buckets[k]
+        if b is None or b.index != idx:
+            if b is not None:
+                self._emit(k, b)
+            b = self._buckets[k] = _Bucket(idx)
+        return b
+
+    def _emit(self, k: int, b: _Bucket) -> None:
+        w = self.widths[k]
+        self._writers[k].writerow({
+            "bucket_start": round(b.index * w, 3),
+            "bucket_end": round((b.index + 1) * w, 3),
+            "frames": b.frames,
+            "active_mean": round(b.active_sum / b.frames, 4) if b.frames else 0.0,
+            "active_max": b.active_max,
+            "active_p95": b.p95(),
+            "new_ids": b.new_ids,
+            "ended_tracks": b.ended,
+            "dwell_mean_s": round(b.dwell_sum / b.ended, 3) if b.ended else 0.0,
+            "dwell_max_s": round(b.dwell_max, 3),
+        })
+
+    def update(self, t: float, active_count: int, events: Sequence[Tuple[str, int, int]] = ()) -> None:
+        """`t` (video zamanı, sn) anındaki kareyi ve takipçinin doğum/ölüm olaylarını ekle."""
+        buckets = [self._bucket(k, t) for k in range(len(self.widths))]
+        for b in buckets:
+            b.add_frame(int(active_count))
+        self._apply_events(t, events, buckets)
+
+    def _apply_events(self, t: float, events, buckets: List[_Bucket]) -> None:
+        for kind, tid, seen_frames in events:
+            if kind == "birth":
+                self._births[tid] = t
+                for b in buckets:
+                    b.new_ids += 1
+            elif kind == "death":
+                dwell = seen_frames / self.fps
+                birth = self._births.pop(tid, t - dwell)
+                self._dwell.writerow([tid, round(birth, 3), round(birth + dwell, 3), round(dwell, 3)])
+                for b in buckets:
+                    b.ended += 1
+                    b.dwell_sum += dwell
+                    b.dwell_max = max(b.dwell_max, dwell)
+
+    def close(self, t: float | None = None, events: Sequence[Tuple[str, int, int]] = ()) -> None:
+        """Son olayları (ör. `pop_events(final=True)`) işle, açık kovaları yaz ve dosyaları kapat."""
+        if events:
+            if t is None:
+                t = 0.0
+            buckets = [b if b is not None else self._bucket(k, t) for k, b in enumerate(self._buckets)]
+            self._apply_events(t, events, buckets)
+        for k, b in enumerate(self._buckets):
+            if b is not None:
+                self._emit(k, b)
+        for f in self._files:
+            f.close()
+        self._dwell_file.close()
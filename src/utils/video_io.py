@@ -1,6 +1,12 @@
 from __future__ import annotations
-from typing import Tuple
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+import queue
+import shutil
+import subprocess
+import threading
+import time
 import cv2
+from loguru import logger
 
 
 def open_video(source: str):
@@ -18,7 +24,288 @@ def get_props(cap) -> Tuple[int, int, float, int]:
     return w, h, fps, total
 
 
-def open_writer(path: str, fps: float, width: int, height: int):
+def _even(v: float) -> int:
+    # yuv420p çift boyut ister
+    return max(2, int(v) // 2 * 2)
+
+
+class FFmpegWriter:
+    """Ham BGR kareleri stdin üzerinden yerel bir `ffmpeg` sürecine aktarır.
+
+    Kodlama (codec/preset/thread) ve ölçekleme (`-vf scale`) ffmpeg tarafında, ayrı
+    süreçte yapılır. Arayüz `cv2.VideoWriter` ile aynıdır: `write(frame)`, `release()`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fps: float,
+        width: int,
+        height: int,
+        codec: str = "libx264",
+        preset: str = "veryfast",
+        threads: int = 0,
+        crf: int = 23,
+        scale: float = 1.0,
+        ffmpeg_bin: str = "ffmpeg",
+    ) -> None:
+        self.width, self.height = int(width), int(height)
+        out_w, out_h = _even(self.width * scale), _even(self.height * scale)
+        cmd = [
+            ffmpeg_bin, "-hide_banner", "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{self.width}x{self.height}", "-r", f"{fps:.6g}",
+            "-i", "-",
+        ]
+        if (out_w, out_h) != (self.width, self.height):
+            cmd += ["-vf", f"scale={out_w}:{out_h}"]
+        cmd += ["-c:v", codec, "-threads", str(int(threads)), "-pix_fmt", "yuv420p"]
+        if codec.startswith(("libx264", "libx265")):
+            cmd += ["-preset", preset, "-crf", str(int(crf))]
+        cmd.append(path)
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def write(self, frame) -> None:
+        try:
+            self._proc.stdin.write(memoryview(frame).cast("B") if frame.flags.c_contiguous else frame.tobytes())
+        except BrokenPipeError:
+            raise RuntimeError(f"ffmpeg kapandı: {self._proc.stderr.read().decode(errors='replace').strip()}")
+
+    def release(self) -> None:
+        if self._proc.stdin and not self._proc.stdin.closed:
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        err = self._proc.stderr.read().decode(errors="replace").strip()
+        if self._proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg hata kodu {self._proc.returncode}: {err}")
+
+
+class _ScaledWriter:
+    """cv2.VideoWriter için çıktı ölçeği: kareler yazmadan önce küçültülür."""
+
+    def __init__(self, writer, size: Tuple[int, int]) -> None:
+        self._writer = writer
+        self._size = size
+
+    def write(self, frame) -> None:
+        self._writer.write(cv2.resize(frame, self._size, interpolation=cv2.INTER_AREA))
+
+    def release(self) -> None:
+        self._writer.release()
+
+
+def open_writer(
+    path: str,
+    fps: float,
+    width: int,
+    height: int,
+    backend: str = "cv2",
+    codec: str = "libx264",
+    preset: str = "veryfast",
+    threads: int = 0,
+    crf: int = 23,
+    scale: float = 1.0,
+):
+    """Video yazıcı aç. `backend`: "cv2" (mp4v), "ffmpeg" ya da "auto" (ffmpeg varsa ffmpeg).
+
+    ffmpeg bulunamazsa uyarı verilip cv2.VideoWriter'a dönülür. `scale` çıktı çözünürlüğünü
+    küçültür; girdi kareleri her zaman kaynak boyutunda verilir.
+    """
+    backend = backend.lower()
+    if backend in ("ffmpeg", "auto"):
+        ffmpeg_bin = shutil.which("ffmpeg")
+        if ffmpeg_bin:
+            return FFmpegWriter(path, fps, width, height, codec, preset, threads, crf, scale, ffmpeg_bin)
+        if backend == "ffmpeg":
+            logger.warning("ffmpeg bulunamadı; cv2.VideoWriter (mp4v) kullanılacak.")
     fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+    if scale != 1.0:
+        size = (_even(width * scale), _even(height * scale))
+        return _ScaledWriter(cv2.VideoWriter(path, fourcc, fps, size), size)
     return cv2.VideoWriter(path, fourcc, fps, (width, height))
 
+
+def read_frames(cap) -> Iterator[Tuple[int, object]]:
+    """Kareleri (frame_id, frame) olarak sırayla üretir; frame_id 1'den başlar."""
+    frame_id = 0
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frame_id += 1
+        yield frame_id, frame
+
+
+def grab_frames(cap, need: Callable[[int], bool]) -> Iterator[Tuple[int, Optional[object]]]:
+    """`read_frames` gibi, ancak `need(frame_id)` yanlışsa kare sadece `grab()` ile atlanır ve None döner.
+
+    `retrieve()` (renk dönüşümü + kopya) yalnızca işlenecek karelerde çağrılır.
+    """
+    frame_id = 0
+    while cap.grab():
+        frame_id += 1
+        if need(frame_id):
+            ok, frame = cap.retrieve()
+            yield frame_id, (frame if ok else None)
+        else:
+            yield frame_id, None
+
+
+def sample_frames(cap, step: int, seek_min_gap: int = 60) -> Iterator[Tuple[int, object]]:
+    """Her `step` karede bir kare üret (frame_id = step, 2*step, ...).
+
+    Kısa aralıklar `grab()` ile geçilir; aralık `seek_min_gap` kareden uzunsa doğrudan
+    konumlanılır (cap.set), böylece aradaki kareler hiç çözülmez.
+    """
+    step = max(1, int(step))
+    pos = 0  # bir sonraki grab() ile gelecek karenin 0 tabanlı indeksi
+    target = step
+    while True:
+        gap = target - 1 - pos
+        if gap >= seek_min_gap:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, target - 1)
+            pos = target - 1
+        else:
+            for _ in range(gap):
+                if not cap.grab():
+                    return
+            pos += gap
+        ok, frame = cap.read()
+        if not ok:
+            return
+        pos += 1
+        yield target, frame
+        target += step
+
+
+_END = object()
+
+
+class ThreadedReader:
+    """Bir kare üretecini arka plan iş parçacığında çalıştırıp sınırlı kuyruğa aktarır.
+
+    Kuyruk dolduğunda okuyucu bekler (backpressure); sıra korunur. `drop_oldest=True`
+    (canlı kaynaklar) ise beklemek yerine kuyruktaki en eski kare atılır ve `dropped` artar.
+    """
+
+    def __init__(self, frames: Iterable, maxsize: int = 8, drop_oldest: bool = False) -> None:
+        self._q: queue.Queue = queue.Queue(maxsize=max(1, int(maxsize)))
+        self._stop = threading.Event()
+        self._error: BaseException | None = None
+        self._drop_oldest = drop_oldest
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, args=(iter(frames),), name="frame-reader", daemon=True)
+        self._thread.start()
+
+    def _put(self, item, drop: bool = False) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._q.put(item, timeout=0 if drop else 0.1)
+                return True
+            except queue.Full:
+                if drop:
+                    try:
+                        self._q.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+                continue
+        return False
+
+    def _run(self, it: Iterator) -> None:
+        try:
+            for item in it:
+                if not self._put(item, drop=self._drop_oldest):
+                    return
+        except BaseException as e:  # hata ana iş parçacığında yeniden fırlatılır
+            self._error = e
+        finally:
+            self._put(_END)  # son işareti kare atmaz, tüketiciyi bekler
+
+    def __iter__(self):
+        while True:
+            item = self._q.get()
+            if item is _END:
+                if self._error is not None:
+                    raise self._error
+                return
+            yield item
+
+    def poll(self):
+        """Beklemeden sıradaki öğe; kuyruk boşsa None, kaynak bittiyse StopIteration."""
+        try:
+            item = self._q.get_nowait()
+        except queue.Empty:
+            return None
+        if item is _END:
+            self._q.put(_END)  # sonraki poll() çağrıları da sonu görsün
+            if self._error is not None:
+                raise self._error
+            raise StopIteration
+        return item
+
+    def qsize(self) -> int:
+        return self._q.qsize()
+
+    def close(self) -> None:
+        self._stop.set()
+        # Okuyucu put() içinde beklemesin diye kuyruğu boşalt
+        while True:
+            try:
+                self._q.get_nowait()
+            except queue.Empty:
+                break
+        self._thread.join()
+
+
+def paced(frames: Iterable[Tuple[int, object]], fps: float) -> Iterator[Tuple[int, object]]:
+    """Dosya kaynağını gerçek zaman hızında üret (canlı kamera / RTSP benzetimi)."""
+    period = 1.0 / (fps or 25.0)
+    t0 = time.perf_counter()
+    for frame_id, frame in frames:
+        wait = t0 + (frame_id - 1) * period - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+        yield frame_id, frame
+
+
+class ThreadedWriter:
+    """`write()` çağrılarını sınırlı kuyruk üzerinden ayrı bir iş parçacığına taşır.
+
+    Kuyruk doluysa `write()` bekler (backpressure); kareler geliş sırasıyla yazılır.
+    """
+
+    def __init__(self, writer, maxsize: int = 8) -> None:
+        self._writer = writer
+        self._q: queue.Queue = queue.Queue(maxsize=max(1, int(maxsize)))
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="frame-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            frame = self._q.get()
+            if frame is _END:
+                return
+            if self._error is not None:
+                continue  # hata sonrası kuyruğu boşaltmaya devam et
+            try:
+                self._writer.write(frame)
+            except BaseException as e:
+                self._error = e
+
+    def write(self, frame) -> None:
+        if self._error is not None:
+            raise self._error
+        self._q.put(frame)
+
+    def qsize(self) -> int:
+        return self._q.qsize()
+
+    def release(self) -> None:
+        self._q.put(_END)
+        self._thread.join()
+        self._writer.release()
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import cv2
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def make_clip():
+    """Her karesi farklı parlaklıkta düz renkli küçük bir mp4 yazan fabrika: `make_clip(path, n)` yolu döndürür."""
+
+    def _make(path, n: int = 40, step: int = 5) -> str:
+        w = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 25, (64, 48))
+        for i in range(n):
+            w.write(np.full((48, 64, 3), i * step, dtype=np.uint8))
+        w.release()
+        return str(path)
+
+    return _make
@@ -0,0 +1,33 @@
+from __future__ import annotations
+from src.utils.adaptive import AdaptiveController
+
+
+def _feed(ctrl, seconds, n):
+    changes = 0
+    for _ in range(n):
+        changes += ctrl.observe(seconds)
+    return changes
+
+
+def test_degrades_skip_then_scale_within_limits():
+    ctrl = AdaptiveController(25.0, max_skip=3, min_scale=0.5, window=5, cooldown=5)
+    _feed(ctrl, 1 / 10.0, 200)  # 10 FPS: hedefin çok altında
+    assert ctrl.frame_skip == 3
+    assert ctrl.scale == 0.5
+
+
+def test_hysteresis_band_holds_settings():
+    ctrl = AdaptiveController(25.0, frame_skip=2, window=5, cooldown=5, hysteresis=0.2)
+    assert _feed(ctrl, 1 / 27.0, 100) == 0
+    assert ctrl.frame_skip == 2 and ctrl.scale == 1.0
+
+
+def test_improves_back_towards_full_quality():
+    ctrl = AdaptiveController(25.0, frame_skip=3, scale=0.5, window=5, cooldown=5)
+    _feed(ctrl, 1 / 100.0, 200)
+    assert ctrl.scale == 1.0 and ctrl.frame_skip == 1
+
+
+def test_should_detect_follows_current_skip():
+    ctrl = AdaptiveController(25.0, frame_skip=3)
+    assert [f for f in range(1, 10) if ctrl.should_detect(f)] == [1, 4, 7]
@@ -0,0 +1,55 @@
+from __future__ import annotations
+import json
+
+from src.utils.clips import EventClipWriter
+
+
+class _ListWriter:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.frames = []
+        self.released = False
+
+    def write(self, frame) -> None:
+        self.frames.append(frame)
+
+    def release(self) -> None:
+        self.released = True
+
+
+def test_event_clips_pre_post_roll(tmp_path):
+    writers = []
+
+    def open_fn(path):
+        writers.append(_ListWriter(path))
+        return writers[-1]
+
+    clips = EventClipWriter(str(tmp_path), fps=10.0, open_fn=open_fn, pre_roll_s=0.3, post_roll_s=0.5)
+    active = set(range(11, 16)) | set(range(18, 20)) | set(range(40, 43))
+    for fid in range(1, 61):
+        clips.push(fid, fid, 1 if fid in active else 0)
+    index = json.load(open(clips.close()))
+
+    # 11-19 arasındaki boşluk son paydan kısa: tek klip; 40-42 ayrı klip
+    assert [w.frames for w in writers] == [list(range(8, 25)), list(range(37, 48))]
+    assert all(w.released for w in writers)
+    assert [(c["start_frame"], c["end_frame"]) for c in index["clips"]] == [(8, 24), (37, 47)]
+    assert index["clips"][0]["start_s"] == 0.7 and index["frames_written"] == 28
+
+
+def test_event_clips_zero_post_roll(tmp_path):
+    writers = []
+
+    def open_fn(path):
+        writers.append(_ListWriter(path))
+        return writers[-1]
+
+    clips = EventClipWriter(str(tmp_path), fps=10.0, open_fn=open_fn, pre_roll_s=0.0, post_roll_s=0.0)
+    active = set(range(1, 121)) - {50, 51}
+    for fid in range(1, 131):
+        clips.push(fid, fid, 1 if fid in active else 0)
+    index = json.load(open(clips.close()))
+
+    # Aktif kareler art arda tek klip; boş kareler yazılmaz
+    assert [(c["start_frame"], c["end_frame"]) for c in index["clips"]] == [(1, 49), (52, 120)]
+    assert index["frames_written"] == 118
@@ -0,0 +1,52 @@
+from __future__ import annotations
+from src.utils.det_cache import DetectionCache
+
+
+def test_cache_roundtrip_and_key(tmp_path):
+    src = tmp_path / "v.bin"
+    src.write_bytes(b"video-bytes")
+    params = {"detector": "retinaface", "score_threshold": 0.5, "min_face_size": 24, "scale": 1.0}
+    cache = DetectionCache(str(tmp_path / "c"), str(src), params)
+    cache.put(3, [(1, 2, 11, 12, 0.9), (20, 20, 40, 40, 0.8)], seconds=0.01)
+    cache.put(6, [])
+    cache.save()
+
+    again = DetectionCache(str(tmp_path / "c"), str(src), params)
+    assert 3 in again and 6 in again and 4 not in again
+    assert again.get(3)[0][:4] == (1, 2, 11, 12)
+    assert again.get(6) == []
+    assert abs(again.det_ms(3) - 10.0) < 1e-3
+
+    # Aynı içerik farklı dosyada: aynı önbellek; farklı ayar: ayrı önbellek
+    copy = tmp_path / "copy.bin"
+    copy.write_bytes(b"video-bytes")
+    assert DetectionCache(str(tmp_path / "c"), str(copy), params).path == cache.path
+    assert DetectionCache(str(tmp_path / "c"), str(src), {**params, "scale": 0.5}).path != cache.path
+
+
+def test_cache_disabled_for_stream_sources(tmp_path):
+    import pytest
+
+    from src.pipeline import PipelineConfig, fill_detection_cache, open_detection_cache
+
+    cfg = PipelineConfig(
+        source="rtsp://kamera/akis",
+        output_video=None,
+        output_metrics_json=None,
+        output_metrics_csv=None,
+        output_heatmap=None,
+        detector="retinaface",
+        tracker="ocsort",
+        score_threshold=0.5,
+        nms_threshold=0.4,
+        min_face_size=24,
+        blur=False,
+        blur_level=15,
+        heatmap=False,
+        frame_skip=1,
+        half_res=False,
+        det_cache_dir=str(tmp_path / "c"),
+    )
+    assert open_detection_cache(cfg, 1.0) is None
+    with pytest.raises(ValueError, match="detections_only"):
+        fill_detection_cache(cfg)
@@ -18,3 +18,21 @@ def test_retinaface_interface():
         x1, y1, x2, y2 = d.to_xyxy()
         assert isinstance(x1, int)
 
+
+def test_detect_batch_matches_detect():
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (120, 160, 3), dtype=np.uint8) for _ in range(3)]
+    det = RetinaFaceDetector(score_threshold=0.1, min_face=10)
+    batch = det.detect_batch(frames)
+    assert len(batch) == len(frames)
+    for f, dets in zip(frames, batch):
+        assert [d.to_xyxy() for d in dets] == [d.to_xyxy() for d in det.detect(f)]
+
+
+def test_detect_array_matches_detect():
+    rng = np.random.default_rng(1)
+    frames = [rng.integers(0, 255, (120, 160, 3), dtype=np.uint8), np.zeros((60, 80, 3), np.uint8)]
+    det = RetinaFaceDetector(score_threshold=0.1, min_face=10)
+    for f, arr in zip(frames, det.detect_batch_array(frames)):
+        assert arr.dtype == np.float32 and arr.shape[1] == 5
+        assert [tuple(r) for r in arr[:, :4].astype(int).tolist()] == [d.to_xyxy() for d in det.detect(f)]
@@ -1,5 +1,8 @@
 from __future__ import annotations
-from src.utils.heatmap import HeatmapAccumulator
+import numpy as np
+import pytest
+
+from src.utils.heatmap import HeatmapAccumulator, HeatmapSnapshots, load_raw, merge_raw
 
 
 def test_heatmap_accumulate():
@@ -9,4 +12,73 @@ def test_heatmap_accumulate():
     img = hm.render()
     assert img.shape == (100, 100)
     assert img.max() > 0.0
+    assert hm.frames == 2
+
+
+def test_heatmap_batched_matches_single_and_stride_shape():
+    boxes = np.array([[10, 10, 20, 20], [10, 10, 20, 20], [60, 30, 80, 50], [-50, 0, -10, 10]])
+    a = HeatmapAccumulator(100, 120, sigma=2.0)
+    b = HeatmapAccumulator(100, 120, sigma=2.0)
+    for box in boxes:
+        a.add_bbox(tuple(box))
+    b.add_bboxes(boxes)
+    np.testing.assert_array_equal(a.map, b.map)
+    assert a.map.sum() == 3.0  # kare dışındaki merkez sayılmaz
+
+    c = HeatmapAccumulator(100, 120, sigma=8.0, stride=4)
+    c.add_bboxes(boxes)
+    assert c.map.shape == (25, 30)
+    img = c.render()
+    assert img.shape == (100, 120) and img.max() == 1.0
+    assert np.unravel_index(img.argmax(), img.shape) == pytest.approx((15, 15), abs=3)
+
+
+def test_heatmap_window_and_decay():
+    win = HeatmapAccumulator(50, 50, sigma=0.0, mode="window", window_s=30.0, interval_s=10.0)
+    dec = HeatmapAccumulator(50, 50, sigma=0.0, mode="decay", interval_s=10.0, half_life_s=10.0)
+    for t in range(0, 60):  # saniyede bir merkez, önce sol üst sonra sağ alt
+        box = (0, 0, 10, 10) if t < 20 else (40, 40, 50, 50)
+        win.add_bbox(box, t=float(t))
+        dec.add_bbox(box, t=float(t))
+    # Pencere yalnızca son 3 aralığı (30-59 sn) içerir
+    assert win.map[5, 5] == 0.0 and win.map[45, 45] == 30.0
+    assert dec.map[5, 5] == pytest.approx(10 * 0.5 ** 5 + 10 * 0.5 ** 4)  # 0. ve 1. aralıklar 5 ve 4 kez yarılandı
+    win.advance(200.0)
+    assert win.map.sum() == 0.0
+
+
+def test_heatmap_snapshots(tmp_path):
+    hm = HeatmapAccumulator(40, 40, sigma=1.0, mode="window", window_s=20.0, interval_s=5.0)
+    snaps = HeatmapSnapshots(str(tmp_path), every_s=10.0)
+    for fid in range(1, 26 * 25):
+        t = fid / 25.0
+        hm.add_bboxes([(10, 10, 20, 20)], t=t)
+        snaps.maybe_write(hm, t)
+    assert snaps.written == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "heatmap_000010s.json", "heatmap_000010s.npy", "heatmap_000010s.png",
+        "heatmap_000020s.json", "heatmap_000020s.npy", "heatmap_000020s.png", "heatmap_latest.png",
+    ]
+    assert np.load(tmp_path / "heatmap_000020s.npy").sum() == 376  # pencere: 5-20 sn arası kareler (125-500)
+
+
+def test_heatmap_raw_roundtrip_and_merge(tmp_path):
+    paths = []
+    for i in range(3):
+        hm = HeatmapAccumulator(60, 80, stride=4)
+        hm.add_bboxes([(8 * i, 8, 8 * i + 16, 24)])
+        hm.add_bboxes([])
+        paths.append(str(tmp_path / f"cam{i}.npy"))
+        hm.save_raw(paths[-1])
+
+    grid, meta = load_raw(paths[0])
+    assert isinstance(grid, np.memmap) and meta["stride"] == 4 and meta["frames"] == 2
+    assert HeatmapAccumulator.from_raw(paths[0]).render().shape == (60, 80)
+
+    total = merge_raw(paths)
+    assert total.frames == 6 and total.map.sum() == 3.0
 
+    other = HeatmapAccumulator(60, 80, stride=2)
+    other.save_raw(str(tmp_path / "other.npy"))
+    with pytest.raises(ValueError):
+        merge_raw(paths + [str(tmp_path / "other.npy")])
@@ -0,0 +1,43 @@
+from __future__ import annotations
+import json
+
+import numpy as np
+
+from src.utils.metrics import MetricsLogger, load_metrics
+
+
+def _fill(m: MetricsLogger, n: int) -> None:
+    for i in range(1, n + 1):
+        m.log(i / 25.0, i, active_count=i % 3, total_ids=i // 2, gate="static" if i % 2 else "motion")
+
+
+def test_streaming_outputs_roundtrip(tmp_path):
+    paths = {
+        "json": str(tmp_path / "m.json"),
+        "jsonl": str(tmp_path / "m.jsonl"),
+        "csv": str(tmp_path / "m.csv"),
+        "npy": str(tmp_path / "cols"),
+    }
+    m1 = MetricsLogger(paths["json"], paths["csv"], extra_fields=["gate"], columnar_path=paths["npy"], chunk_rows=7)
+    m2 = MetricsLogger(paths["jsonl"], None)
+    _fill(m1, 20)
+    _fill(m2, 20)
+    m1.close()
+    m2.close()
+
+    assert len(json.load(open(paths["json"]))) == 20  # hâlâ geçerli JSON dizisi
+    for p in paths.values():
+        cols = load_metrics(p)
+        assert np.array_equal(cols["frame_id"], np.arange(1, 21))
+        assert list(cols["active_count"][:3]) == [1, 2, 0]
+        assert cols["gate"][0] == "static"
+
+
+def test_load_metrics_repairs_truncated_json(tmp_path):
+    path = str(tmp_path / "m.json")
+    m = MetricsLogger(path, None, flush_every=1)
+    _fill(m, 5)
+    m._json._f.flush()
+    # close() çağrılmadan (çökme) okunabilmeli
+    assert list(load_metrics(path)["frame_id"]) == [1, 2, 3, 4, 5]
+    m.close()
@@ -0,0 +1,22 @@
+from __future__ import annotations
+import numpy as np
+
+from src.utils.motion import MotionGate
+
+
+def test_gate_skips_static_and_passes_motion():
+    gate = MotionGate(threshold=0.01)
+    frame = np.full((90, 160, 3), 60, dtype=np.uint8)
+    assert gate.should_detect(frame)  # referans yok
+    assert not gate.should_detect(frame.copy())
+    moved = frame.copy()
+    moved[20:60, 40:80] = 200
+    assert gate.should_detect(moved)
+    assert gate.checks == 3 and gate.skipped == 1
+
+
+def test_gate_forces_detection_after_max_static():
+    gate = MotionGate(threshold=0.01, max_static=2)
+    frame = np.zeros((90, 160, 3), dtype=np.uint8)
+    decisions = [gate.should_detect(frame) for _ in range(6)]
+    assert decisions == [True, False, False, True, False, False]
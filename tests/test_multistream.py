@@ -0,0 +1,39 @@
+from __future__ import annotations
+import json
+import os
+
+from src.multistream import process_streams
+from src.pipeline import PipelineConfig
+
+
+def test_process_streams_outputs_per_stream(tmp_path, make_clip):
+    sources = [make_clip(tmp_path / "a.mp4", 30), make_clip(tmp_path / "b.mp4", 12)]
+    cfg = PipelineConfig(
+        source=sources[0],
+        output_video=None,
+        output_metrics_json=None,
+        output_metrics_csv=None,
+        output_heatmap=None,
+        detector="retinaface",
+        tracker="ocsort",
+        score_threshold=0.5,
+        nms_threshold=0.4,
+        min_face_size=24,
+        blur=False,
+        blur_level=15,
+        heatmap=True,
+        frame_skip=2,
+        half_res=False,
+    )
+    out = tmp_path / "multi"
+    summary = process_streams(cfg, sources, str(out), detector_workers=2, max_inflight=1, queue_size=2, report_every=0)
+
+    assert [s["name"] for s in summary] == ["00_a", "01_b"]
+    assert [s["frames"] for s in summary] == [30, 12]
+    assert [s["detector_calls"] for s in summary] == [15, 6]
+    assert json.load(open(out / "summary.json"))["streams"] == summary
+    for s in summary:
+        d = out / s["name"]
+        assert sorted(os.listdir(d)) == ["heatmap.json", "heatmap.npy", "heatmap.png", "metrics.csv", "metrics.jsonl"]
+        frame_ids = [json.loads(line)["frame_id"] for line in open(d / "metrics.jsonl")]
+        assert frame_ids == list(range(1, s["frames"] + 1))
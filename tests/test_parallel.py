@@ -0,0 +1,69 @@
+from __future__ import annotations
+import numpy as np
+
+from src.parallel import split_segments, stitch_segments
+
+
+def _seg(start, end, rows):
+    return {"start": start, "end": end, "rows": np.asarray(rows, dtype=np.int64).reshape(-1, 6)}
+
+
+def test_split_segments_covers_all_frames():
+    segs = split_segments(100, 3)
+    assert segs[0][0] == 1 and segs[-1][1] == 101
+    assert all(a[1] == b[0] for a, b in zip(segs, segs[1:]))
+
+
+def test_stitch_keeps_ids_across_boundary():
+    # Segment 1: iz 1 (kare 1-10) ve iz 2 (kare 5-10)
+    s1 = [(f, 1, 10, 10, 50, 50) for f in range(1, 11)] + [(f, 2, 100, 100, 140, 140) for f in range(5, 11)]
+    # Segment 2 (başlangıç 11, örtüşme 8-10): yerel ID'ler farklı, kutular aynı yerde; iz 3 yeni
+    s2 = [(f, 7, 12, 12, 52, 52) for f in range(8, 16)] + [(f, 4, 100, 100, 140, 140) for f in range(8, 16)]
+    s2 += [(f, 9, 300, 300, 340, 340) for f in range(12, 16)]
+    m1, m2 = stitch_segments([_seg(1, 11, s1), _seg(11, 16, s2)])
+    assert m2[7] == m1[1]
+    assert m2[4] == m1[2]
+    assert m2[9] not in (m1[1], m1[2])
+
+
+def test_parallel_uses_detection_cache_and_tiles(tmp_path):
+    import dataclasses
+    import json
+
+    from src.parallel import process_video_parallel
+    from src.pipeline import PipelineConfig
+    from src.utils.det_cache import DetectionCache
+    from src.utils.synthetic import write_synthetic_video
+
+    src = str(tmp_path / "syn.mp4")
+    write_synthetic_video(src, frames=40, width=320, height=240, faces=2, face_size=(56, 80), seed=3)
+    cfg = PipelineConfig(
+        source=src,
+        output_video=None,
+        output_metrics_json=str(tmp_path / "a.jsonl"),
+        output_metrics_csv=None,
+        output_heatmap=None,
+        detector="retinaface",
+        tracker="ocsort",
+        score_threshold=0.5,
+        nms_threshold=0.4,
+        min_face_size=24,
+        blur=False,
+        blur_level=15,
+        heatmap=False,
+        frame_skip=2,
+        half_res=False,
+        workers=2,
+        batch=4,
+        tile=True,
+        tile_size=200,
+        det_cache_dir=str(tmp_path / "cache"),
+    )
+    process_video_parallel(cfg)
+    # Süreçlerin yeni tespitleri ana süreçte tek önbelleğe yazılır (karo ayarları anahtarda)
+    params = {"detector": "retinaface", "score_threshold": 0.5, "min_face_size": 24, "scale": 1.0,
+              "tile_size": 200, "tile_overlap": 0.2, "nms_threshold": 0.4}
+    assert len(DetectionCache(cfg.det_cache_dir, src, params)) == 20
+    process_video_parallel(dataclasses.replace(cfg, output_metrics_json=str(tmp_path / "b.jsonl")))
+    rows = lambda p: [(r["frame_id"], r["active_count"], r["total_ids"]) for r in map(json.loads, open(p))]
+    assert rows(tmp_path / "a.jsonl") == rows(tmp_path / "b.jsonl")
@@ -0,0 +1,37 @@
+from __future__ import annotations
+import numpy as np
+import pytest
+
+from src.utils.privacy import ANONYMIZERS, anonymize, gaussian_blur_face
+
+
+def _frame():
+    return np.random.default_rng(0).integers(0, 255, (120, 160, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("mode", list(ANONYMIZERS))
+def test_anonymize_only_touches_boxes(mode):
+    img = _frame()
+    orig = img.copy()
+    boxes = [(10, 10, 50, 60), (40, 40, 90, 100), (-20, 100, 30, 200)]
+    anonymize(img, boxes, mode=mode, level=21)
+    inside = np.zeros(img.shape[:2], dtype=bool)
+    for x1, y1, x2, y2 in boxes:
+        inside[max(0, y1):y2, max(0, x1):x2] = True
+    assert np.array_equal(img[~inside], orig[~inside])
+    assert np.abs(img[inside].astype(int) - orig[inside]).mean() > 10
+
+
+def test_overlapping_boxes_blurred_once():
+    img = _frame()
+    orig = img.copy()
+    anonymize(img, [(10, 10, 60, 60), (30, 30, 80, 80)], mode="gaussian", level=15)
+    # Örtüşen bölge, birleşimin tek seferde bulanıklaştırılmasıyla aynı olmalı (iki kez değil)
+    once = orig.copy()
+    gaussian_blur_face(once, (10, 10, 80, 80), ksize=15)
+    np.testing.assert_array_equal(img[30:60, 30:60], once[30:60, 30:60])
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        anonymize(_frame(), [(0, 0, 10, 10)], mode="swirl")
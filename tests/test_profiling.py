@@ -0,0 +1,92 @@
+from __future__ import annotations
+import numpy as np
+
+from src.utils.profiling import FrameProfiler, LatencyHistogram, StageTimers, parse_frame_range, record_durations, with_durations
+from src.utils.video_io import ThreadedReader
+
+
+def test_histogram_percentiles_within_bucket_error():
+    rng = np.random.default_rng(0)
+    samples = rng.lognormal(mean=np.log(0.01), sigma=0.8, size=5000)
+    h = LatencyHistogram()
+    for s in samples:
+        h.add(float(s))
+    for q in (50, 95, 99):
+        exact = np.percentile(samples, q)
+        assert abs(h.percentile(q) - exact) / exact < 0.15
+    assert h.count == 5000 and np.isclose(h.total, samples.sum())
+
+
+def test_stage_timers_merge_and_split_batches():
+    window = StageTimers(("detect",))
+    window.add("detect", 0.03, n=3)  # 3 karelik toplu çağrı
+    total = StageTimers(("detect",))
+    total.merge(window)
+    window.reset()
+    window.add("detect", 0.01)
+    total.merge(window)
+    r = total.summary()["detect"]
+    assert r["count"] == 4 and abs(r["total_s"] - 0.04) < 1e-9 and abs(r["max_ms"] - 10.0) < 1e-6
+
+
+def test_frame_profiler_writes_only_for_range(tmp_path):
+    assert parse_frame_range("5-8") == (5, 8) and parse_frame_range("7") == (7, 7)
+    out = str(tmp_path / "p")
+    prof = FrameProfiler(out, 5, 8)
+    for fid in range(1, 12):
+        prof.on_frame(fid)
+        assert prof.active == (5 <= fid <= 8)
+        sum(range(1000))
+    prof.close()
+    assert (tmp_path / "p.prof").exists() and "function calls" in (tmp_path / "p.txt").read_text()
+
+
+def test_decode_durations_cross_reader_thread():
+    import time
+
+    def slow():
+        for i in range(5):
+            time.sleep(0.002)
+            yield i
+
+    timers = StageTimers(["decode"])
+    reader = ThreadedReader(with_durations(slow()), maxsize=2)
+    # Okuyucu yalnızca süreyi kareyle taşır; histogram tüketen iş parçacığında güncellenir
+    assert list(record_durations(reader, timers, "decode")) == list(range(5))
+    r = timers.summary()["decode"]
+    assert r["count"] == 5 and r["p50_ms"] >= 1.5
+
+
+def test_stage_report_windows_count_processed_frames(tmp_path):
+    import json
+
+    from src.pipeline import PipelineConfig, process_video
+    from src.utils.synthetic import write_synthetic_video
+
+    src = str(tmp_path / "syn.mp4")
+    write_synthetic_video(src, frames=60, fps=30.0, width=160, height=120, faces=1, face_size=(32, 48), seed=1)
+    cfg = PipelineConfig(
+        source=src,
+        output_video=None,
+        output_metrics_json=str(tmp_path / "m.jsonl"),
+        output_metrics_csv=None,
+        output_heatmap=None,
+        detector="retinaface",
+        tracker="ocsort",
+        score_threshold=0.5,
+        nms_threshold=0.4,
+        min_face_size=24,
+        blur=False,
+        blur_level=15,
+        heatmap=False,
+        frame_skip=1,
+        half_res=False,
+        sample_fps=10.0,
+        stage_report_every=6,
+    )
+    process_video(cfg)
+    events = [e for e in json.load(open(tmp_path / "m.events.json")) if e["event"] == "stage_latency"]
+    # 3 karede bir örnek: 20 işlenen kare; pencere kaynak karesine göre değil işlenen kareye göre (6'şar)
+    windows = [e for e in events if not e.get("final")]
+    assert [e["window_frames"] for e in windows] == [6, 6, 6]
+    assert all(e["stages"]["track"]["count"] == 6 for e in windows)
@@ -0,0 +1,30 @@
+from __future__ import annotations
+import subprocess
+import sys
+
+from src import registry
+from src.detectors.retinaface import RetinaFaceDetector
+from src.pipeline import build_detector, build_tracker
+from src.trackers.base import SimpleSORT
+
+
+class _Dummy(RetinaFaceDetector):
+    name = "dummy"
+
+
+def test_registry_resolves_and_registers(monkeypatch):
+    # Kayıt testten sonra küresel kayıt defterinde kalmasın: dedektör tablosunun kopyası üzerinde çalış
+    monkeypatch.setitem(registry._registry, "detector", dict(registry._registry["detector"]))
+    assert {"retinaface", "mtcnn"} <= set(registry.available("detector"))
+    assert isinstance(build_tracker("sort"), SimpleSORT)
+    registry.register_detector("dummy", _Dummy)
+    det = build_detector("Dummy", 0.4, 30)
+    assert isinstance(det, _Dummy) and det.min_face == 30
+    # Bilinmeyen ad: RetinaFace yedeği
+    assert type(build_detector("yok", 0.5, 24)) is RetinaFaceDetector
+
+
+def test_pipeline_import_is_lazy():
+    code = "import sys, src.pipeline; print(any(m in sys.modules for m in ('scipy', 'src.detectors.mtcnn', 'src.trackers.deepsort')))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "False"
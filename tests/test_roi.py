@@ -0,0 +1,42 @@
+from __future__ import annotations
+import numpy as np
+
+from src.detectors.base import BaseFaceDetector, Detection
+from src.detectors.roi import ROIDetector, merge_rois
+
+
+class _FakeDetector(BaseFaceDetector):
+    """Aldığı görüntünün boyutunu kaydeder, sol üstte sabit bir yüz döndürür."""
+
+    name = "fake"
+
+    def __init__(self) -> None:
+        self.shapes = []
+
+    def detect(self, image):
+        self.shapes.append(image.shape[:2])
+        return [Detection((2, 3, 12, 13), 0.9)]
+
+
+def test_merge_rois_joins_overlaps():
+    out = merge_rois([(0, 0, 10, 10), (5, 5, 20, 20), (50, 50, 60, 60)])
+    assert sorted(out) == [(0, 0, 20, 20), (50, 50, 60, 60)]
+
+
+def test_roi_detector_scans_regions_and_rescans_full_frame():
+    inner = _FakeDetector()
+    roi = ROIDetector(inner, rescan_every=3, pad=0.5)
+    img = np.zeros((200, 300, 3), dtype=np.uint8)
+
+    roi.set_hints([(100, 100, 120, 120)])
+    roi.detect(img)  # ilk çağrı: tam kare
+    assert inner.shapes[-1] == (200, 300)
+
+    dets = roi.detect(img)  # bölge: 10 px pad
+    assert inner.shapes[-1] == (40, 40)
+    assert dets[0].to_xyxy() == (92, 93, 102, 103)
+
+    roi.detect(img)
+    roi.detect(img)  # 3. çağrıdan sonra yeniden tam kare
+    assert inner.shapes[-1] == (200, 300)
+    assert roi.full_scans == 2 and roi.roi_scans == 2
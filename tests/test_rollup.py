@@ -0,0 +1,35 @@
+from __future__ import annotations
+import csv
+
+from src.trackers.base import SimpleSORT
+from src.utils.rollup import MetricsRollup
+
+
+def _rows(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_rollup_buckets_and_dwell(tmp_path):
+    prefix = str(tmp_path / "r")
+    tracker = SimpleSORT(max_age=2)
+    rollup = MetricsRollup(prefix, widths=(1.0, 60.0), fps=10.0)
+    # 0-14. kare: tek yüz; 15-29. kare: iki yüz
+    for fid in range(30):
+        dets = [(10 + fid, 10, 50 + fid, 50, 0.9)]
+        if fid >= 15:
+            dets.append((200, 200, 240, 240, 0.9))
+        tracks = tracker.update(dets)
+        rollup.update(fid / 10.0, len(tracks), tracker.pop_events())
+    rollup.close(2.9, tracker.pop_events(final=True))
+
+    sec = _rows(prefix + "_1s.csv")
+    assert [int(r["frames"]) for r in sec] == [10, 10, 10]
+    assert float(sec[1]["active_mean"]) == 1.5 and int(sec[1]["active_max"]) == 2
+    assert int(sec[2]["active_p95"]) == 2
+    assert sum(int(r["new_ids"]) for r in sec) == 2
+    minute = _rows(prefix + "_60s.csv")
+    assert len(minute) == 1 and int(minute[0]["new_ids"]) == 2 and int(minute[0]["ended_tracks"]) == 2
+
+    dwell = {int(r["track_id"]): float(r["dwell_s"]) for r in _rows(prefix + "_dwell.csv")}
+    assert dwell == {1: 3.0, 2: 1.5}
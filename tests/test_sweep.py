@@ -0,0 +1,56 @@
+from __future__ import annotations
+import dataclasses
+import json
+import os
+
+from src.pipeline import PipelineConfig, process_video
+from src.sweep import SweepResult, expand_grid, pareto_front, run_sweep
+from src.utils.synthetic import write_synthetic_video
+
+
+def test_expand_grid_and_pareto():
+    assert len(expand_grid({"frame_skip": [1, 2, 3], "half_res": [False, True]})) == 6
+    rs = [
+        SweepResult({"a": 1}, fps=10, detect_frames=0, active_mae=0, active_rel=0.0, ids_err=0.0, error=0.0, total_ids=1),
+        SweepResult({"a": 2}, fps=20, detect_frames=0, active_mae=0, active_rel=0.1, ids_err=0.0, error=0.1, total_ids=1),
+        SweepResult({"a": 3}, fps=15, detect_frames=0, active_mae=0, active_rel=0.2, ids_err=0.0, error=0.2, total_ids=1),
+    ]
+    pareto_front(rs)
+    assert [r.pareto for r in rs] == [True, True, False]
+
+
+def test_sweep_replay_matches_pipeline(tmp_path):
+    src = str(tmp_path / "syn.mp4")
+    write_synthetic_video(src, frames=30, width=320, height=240, faces=2, face_size=(56, 80), seed=3)
+    cfg = PipelineConfig(
+        source=src,
+        output_video=None,
+        output_metrics_json=None,
+        output_metrics_csv=None,
+        output_heatmap=None,
+        detector="retinaface",
+        tracker="ocsort",
+        score_threshold=0.5,
+        nms_threshold=0.4,
+        min_face_size=24,
+        blur=False,
+        blur_level=15,
+        heatmap=False,
+        frame_skip=1,
+        half_res=False,
+    )
+    out = str(tmp_path / "sweep")
+    results = run_sweep(cfg, {"frame_skip": [1, 3], "half_res": [False]}, out)
+    assert os.path.exists(os.path.join(out, "sweep.csv"))
+    report = json.load(open(os.path.join(out, "sweep.json")))
+    assert report["frames"] == 30 and len(report["results"]) == 2
+    # frame_skip=1, tam çözünürlük referansın kendisi: hata sıfır
+    assert next(r for r in results if r.params["frame_skip"] == 1).error == 0.0
+
+    # Yeniden oynatılan sayım gerçek metrik işiyle aynı olmalı
+    metrics_path = str(tmp_path / "m.jsonl")
+    process_video(dataclasses.replace(cfg, frame_skip=3, output_metrics_json=metrics_path))
+    rows = [json.loads(line) for line in open(metrics_path)]
+    r3 = next(r for r in results if r.params["frame_skip"] == 3)
+    assert rows[-1]["total_ids"] == r3.total_ids
+    assert r3.detect_frames == 10
@@ -0,0 +1,39 @@
+from __future__ import annotations
+import numpy as np
+
+from src.detectors.base import BaseFaceDetector, Detection
+from src.detectors.tiled import TiledDetector, tile_grid
+from src.utils.boxes import nms
+
+
+class _SquareDetector(BaseFaceDetector):
+    """Görüntüdeki beyaz kareyi (tamamı görünüyorsa) yüz olarak bulur."""
+
+    name = "square"
+
+    def detect(self, image):
+        ys, xs = np.nonzero(image[..., 0] == 255)
+        if not len(xs):
+            return []
+        return [Detection((int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1), 0.9)]
+
+
+def test_nms_suppresses_overlaps():
+    boxes = [(0, 0, 10, 10), (1, 1, 11, 11), (50, 50, 60, 60)]
+    keep = nms(boxes, [0.8, 0.9, 0.7], 0.4)
+    assert list(keep) == [1, 2]
+
+
+def test_tile_grid_covers_frame():
+    tiles = tile_grid(1000, 500, 400, 0.25)
+    assert tiles[0][:2] == (0, 0)
+    assert max(t[2] for t in tiles) == 1000 and max(t[3] for t in tiles) == 500
+    assert all(t[2] - t[0] == 400 for t in tiles)
+
+
+def test_tiled_detector_merges_duplicates_across_tiles():
+    img = np.zeros((300, 600, 3), dtype=np.uint8)
+    img[100:120, 270:290] = 255  # iki karonun örtüşme bölgesinde
+    det = TiledDetector(_SquareDetector(), tile_size=320, overlap=0.25, nms_threshold=0.4)
+    res = det.detect(img)
+    assert [d.to_xyxy() for d in res] == [(270, 100, 290, 120)]
@@ -0,0 +1,151 @@
+from __future__ import annotations
+import numpy as np
+
+from src.trackers.base import SimpleSORT, assign_max_iou
+from src.utils.boxes import iou_matrix
+
+
+def _iou(a, b):
+    """Skaler referans IoU."""
+    ax1, ay1, ax2, ay2 = a
+    bx1, by1, bx2, by2 = b
+    iw = max(0, min(ax2, bx2) - max(ax1, bx1))
+    ih = max(0, min(ay2, by2) - max(ay1, by1))
+    inter = iw * ih
+    area_a = max(0, ax2 - ax1) * max(0, ay2 - ay1)
+    area_b = max(0, bx2 - bx1) * max(0, by2 - by1)
+    return inter / (area_a + area_b - inter + 1e-6)
+
+
+class _ScalarKalman:
+    """Tek iz için skaler referans Kalman filtresi; SimpleSORT'un toplu yolu bununla karşılaştırılır."""
+
+    F = np.eye(8)
+    F[:4, 4:] = np.eye(4)
+    H = np.eye(4, 8)
+    Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.05, 0.05, 0.01, 0.01])
+    R = np.diag([4.0, 4.0, 10.0, 10.0])
+
+    def __init__(self, bbox):
+        self.x = np.zeros(8)
+        self.x[:4] = self._to_z(bbox)
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 1000.0, 1000.0, 1000.0, 1000.0])
+
+    @staticmethod
+    def _to_z(bbox):
+        x1, y1, x2, y2 = bbox
+        return np.array([(x1 + x2) / 2.0, (y1 + y2) / 2.0, float(x2 - x1), float(y2 - y1)])
+
+    @staticmethod
+    def _bbox_of(z):
+        cx, cy = z[0], z[1]
+        w, h = max(z[2], 1.0), max(z[3], 1.0)
+        return (int(round(cx - w / 2)), int(round(cy - h / 2)), int(round(cx + w / 2)), int(round(cy + h / 2)))
+
+    def predict(self):
+        self.x = self.F @ self.x
+        self.x[2:4] = np.maximum(self.x[2:4], 1.0)
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        return self._bbox_of(self.x[:4])
+
+    def update(self, bbox):
+        y = self._to_z(bbox) - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(8) - K @ self.H) @ self.P
+
+    def peek(self, steps=1):
+        return self._bbox_of(self.x[:4] + steps * self.x[4:])
+
+
+def test_iou_matrix_matches_pairwise():
+    a = [(0, 0, 10, 10), (5, 5, 20, 20)]
+    b = [(0, 0, 10, 10), (8, 0, 18, 10), (30, 30, 40, 40)]
+    m = iou_matrix(a, b)
+    assert m.shape == (2, 3)
+    for i, ba in enumerate(a):
+        for j, bb in enumerate(b):
+            assert np.isclose(m[i, j], _iou(ba, bb))
+
+
+def test_assignment_is_global_not_greedy():
+    trk = SimpleSORT(max_age=10, iou_threshold=0.1)
+    first = trk.update([(0, 0, 10, 10, 0.9), (6, 0, 16, 10, 0.9)])
+    ids = [t.track_id for t in first]
+    # Açgözlü eşleme ilk tespiti ikinci ize bağlar ve yeni ID üretirdi
+    second = trk.update([(4, 0, 14, 10, 0.9), (7, 0, 17, 10, 0.9)])
+    assert [t.track_id for t in second] == ids
+
+
+def test_predict_extrapolates_on_skipped_frames():
+    trk = SimpleSORT(max_age=10, iou_threshold=0.3)
+    # Her karede +4 px sağa giden yüz, her 3. karede tespit
+    for f in range(0, 30):
+        box = (100 + 4 * f, 50, 140 + 4 * f, 90, 0.9)
+        tracks = trk.update([box]) if f % 3 == 0 else trk.predict()
+        assert len(tracks) == 1 and tracks[0].track_id == 1
+    x1 = tracks[0].bbox[0]
+    assert abs(x1 - (100 + 4 * 29)) <= 3
+
+
+def test_predict_drops_tracks_not_seen_in_last_detection():
+    trk = SimpleSORT(max_age=10, iou_threshold=0.3)
+    trk.update([(0, 0, 10, 10, 0.9)])
+    trk.update([])
+    assert trk.predict() == []
+
+
+def test_array_path_matches_scalar_kalman():
+    trk = SimpleSORT(max_age=10, iou_threshold=0.3)
+    kf = None
+    for f in range(12):
+        box = (100 + 5 * f, 50 + 2 * f, 140 + 5 * f, 90 + 2 * f)
+        if f % 2 == 0:
+            out = trk.update_array(np.asarray([[*box, 0.8]], dtype=np.float32))
+            assert out.shape == (1, 6) and tuple(out[0, 1:5]) == box
+            if kf is None:
+                kf = _ScalarKalman(box)
+            else:
+                kf.predict()
+                kf.update(box)
+        else:
+            out = trk.predict_array()
+            assert tuple(out[0, 1:5]) == kf.predict()
+        assert out[0, 0] == 1 and out[0, 5] == np.float32(0.8)
+    assert [tuple(b) for b in trk.predicted_boxes(3)] == [kf.peek(3)]
+    assert [(t.track_id, t.bbox) for t in trk.update([(*kf.peek(1), 0.8)])] == [(1, kf.peek(1))]
+
+
+def test_assign_max_iou_matches_hungarian():
+    from scipy.optimize import linear_sum_assignment
+
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        xy = rng.uniform(0, 300, (rng.integers(1, 8), 2))
+        a = np.hstack([xy, xy + rng.uniform(10, 60, xy.shape)])
+        b = a[rng.permutation(len(a))][: rng.integers(1, len(a) + 1)] + rng.normal(0, 8, (1, 4))
+        iou = iou_matrix(a, b)
+        rows, cols = linear_sum_assignment(iou, maximize=True)
+        ok = iou[rows, cols] >= 0.3
+        r2, c2 = assign_max_iou(iou)
+        ok2 = iou[r2, c2] >= 0.3
+        assert sorted(zip(rows[ok], cols[ok])) == sorted(zip(r2[ok2], c2[ok2]))
+
+
+def test_frame_step_keeps_ids_for_sparse_samples():
+    def run(step):
+        trk = SimpleSORT(max_age=2, iou_threshold=0.3)
+        trk.set_frame_step(step)
+        ids = set()
+        for k in range(6):
+            x = 40 * k  # 50 px kutu, örnek başına 40 px: ardışık örneklerde IoU ~0.1
+            ids.update(trk.update_array(np.asarray([[x, 0, x + 50, 50, 0.9]]))[:, 0].astype(int).tolist())
+        return ids, trk.pop_events(final=True)
+
+    ids, events = run(1)
+    assert len(ids) == 6
+    ids, events = run(10)
+    assert ids == {1}
+    # Kalma süresi video karesi cinsinden: 6 örnek x 10 kare
+    assert ("death", 1, 60) in events
@@ -0,0 +1,103 @@
+from __future__ import annotations
+import shutil
+import time
+
+import numpy as np
+import pytest
+
+from src.utils.video_io import (
+    FFmpegWriter,
+    ThreadedReader,
+    ThreadedWriter,
+    grab_frames,
+    open_video,
+    open_writer,
+    read_frames,
+    sample_frames,
+)
+
+
+class _ListWriter:
+    def __init__(self) -> None:
+        self.frames = []
+        self.released = False
+
+    def write(self, frame) -> None:
+        self.frames.append(frame)
+
+    def release(self) -> None:
+        self.released = True
+
+
+def test_threaded_reader_keeps_order():
+    reader = ThreadedReader(((i, i * 2) for i in range(100)), maxsize=2)
+    items = list(reader)
+    reader.close()
+    assert items == [(i, i * 2) for i in range(100)]
+
+
+def test_threaded_writer_keeps_order():
+    inner = _ListWriter()
+    writer = ThreadedWriter(inner, maxsize=2)
+    for i in range(50):
+        writer.write(i)
+    writer.release()
+    assert inner.frames == list(range(50))
+    assert inner.released
+
+
+def test_grab_and_sample_frames_match_full_decode(tmp_path, make_clip):
+    src = make_clip(tmp_path / "c.mp4")
+    full = dict(read_frames(open_video(src)))
+    grabbed = list(grab_frames(open_video(src), lambda fid: fid % 4 == 0))
+    assert [fid for fid, _ in grabbed] == list(range(1, 41))
+    for fid, frame in grabbed:
+        if fid % 4:
+            assert frame is None
+        else:
+            np.testing.assert_array_equal(frame, full[fid])
+    for gap in (60, 1):  # grab ile atlama / doğrudan konumlanma
+        sampled = list(sample_frames(open_video(src), 7, seek_min_gap=gap))
+        assert [fid for fid, _ in sampled] == [7, 14, 21, 28, 35]
+        for fid, frame in sampled:
+            np.testing.assert_array_equal(frame, full[fid])
+
+
+def test_open_writer_scale_and_ffmpeg_fallback(tmp_path, monkeypatch):
+    monkeypatch.setattr(shutil, "which", lambda name: None)
+    path = str(tmp_path / "o.mp4")
+    writer = open_writer(path, 25.0, 64, 48, backend="ffmpeg", scale=0.5)  # ffmpeg yok -> cv2
+    for i in range(5):
+        writer.write(np.full((48, 64, 3), i * 40, dtype=np.uint8))
+    writer.release()
+    frames = [f for _, f in read_frames(open_video(path))]
+    assert len(frames) == 5 and frames[0].shape == (24, 32, 3)
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg yok")
+def test_ffmpeg_writer_roundtrip(tmp_path):
+    path = str(tmp_path / "f.mp4")
+    writer = FFmpegWriter(path, 25.0, 64, 48, preset="ultrafast", scale=0.5)
+    for i in range(10):
+        writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+    writer.release()
+    frames = [f for _, f in read_frames(open_video(path))]
+    assert len(frames) == 10 and frames[0].shape == (24, 32, 3)
+
+
+def test_threaded_reader_drop_oldest_and_poll():
+    reader = ThreadedReader(((i, i) for i in range(20)), maxsize=3, drop_oldest=True)
+    deadline = time.perf_counter() + 5
+    while reader.dropped < 17 and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    items = []
+    while True:
+        try:
+            item = reader.poll()
+        except StopIteration:
+            break
+        if item is not None:
+            items.append(item)
+    reader.close()
+    # Okuyucu hiç beklemediği için yalnızca en yeni kareler kalır
+    assert items == [(i, i) for i in range(17, 20)] and reader.dropped == 17